@@ -0,0 +1,153 @@
+"""Benchmark des routes de données : asyncpg vs psycopg2 (DB_DRIVER).
+
+Lance l'API avec uvicorn pour chaque pilote, cache de réponses désactivé,
+puis envoie des requêtes GET /covid/{country} concurrentes. La base doit
+être accessible (variables DB_* ou DATABASE_URL) et contenir les données de
+l'ETL.
+
+Usage : python benchmarks/bench_api_drivers.py --requests 2000 \
+            --concurrency 1 16 64 256
+"""
+import argparse
+import asyncio
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import quote
+
+import httpx
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database.Database import connect  # noqa: E402
+
+USER = {
+    "username": "bench_drivers",
+    "email": "bench_drivers@bench.local",
+    "password": "Bench123456",
+}
+
+
+def start_api(driver, port):
+    # Sans cache de réponses : les requêtes répétées seraient servies par
+    # le cache et le benchmark ne mesurerait plus les pilotes
+    env = {**os.environ, "DB_DRIVER": driver, "RESPONSE_CACHE_SIZE": "0"}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "ws.covid_api:app",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=env)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"L'API ({driver}) n'a pas démarré")
+
+
+def login(base_url):
+    httpx.post(f"{base_url}/api/user", json=USER)
+    response = httpx.post(f"{base_url}/api/login", data={
+        "username": USER["username"], "password": USER["password"]})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def _worker(port, request, count, latencies, errors):
+    """Client HTTP/1.1 minimal sur une connexion keep-alive.
+
+    httpx est trop coûteux en CPU à forte concurrence : sur une petite
+    machine c'est le client qui saturerait en premier.
+    """
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(count):
+        start = time.perf_counter()
+        writer.write(request)
+        status_line = await reader.readline()
+        length = 0
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if b" 200 " not in status_line:
+            errors.append(status_line)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(port, headers, country, requests, concurrency):
+    """Envoie requests requêtes réparties sur concurrency connexions."""
+    request = (
+        f"GET /covid/{quote(country)} HTTP/1.1\r\n"
+        "Host: 127.0.0.1\r\n"
+        + "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        + "\r\n").encode()
+    latencies, errors = [], []
+    counts = [requests // concurrency + (i < requests % concurrency)
+              for i in range(concurrency)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(_worker(port, request, count, latencies, errors)
+                           for count in counts if count))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+",
+                        default=[1, 16, 64, 256])
+    parser.add_argument("--country", default="France")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--drivers", nargs="+",
+                        default=["asyncpg", "psycopg2"])
+    args = parser.parse_args()
+
+    print(f"{'pilote':<10} {'concurrence':>11} {'req/s':>9} "
+          f"{'p50 (ms)':>9} {'p99 (ms)':>9} {'erreurs':>8}")
+    for driver in args.drivers:
+        process = start_api(driver, args.port)
+        try:
+            base_url = f"http://127.0.0.1:{args.port}"
+            headers = login(base_url)
+            # Préchauffage (pools, caches du serveur)
+            asyncio.run(run_load(args.port, headers, args.country, 100, 8))
+            for concurrency in args.concurrency:
+                result = asyncio.run(run_load(
+                    args.port, headers, args.country, args.requests,
+                    concurrency))
+                print(f"{driver:<10} {concurrency:>11} "
+                      f"{result['rps']:>9.0f} {result['p50_ms']:>9.1f} "
+                      f"{result['p99_ms']:>9.1f} {result['errors']:>8}",
+                      flush=True)
+        finally:
+            process.terminate()
+            process.wait()
+
+    with connect() as connection, connection.cursor() as cursor:
+        cursor.execute("DELETE FROM t_users WHERE username = %s",
+                       (USER["username"],))
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Benchmark de l'imputation : apply ligne par ligne vs version vectorisée.
+
+Usage : python benchmarks/bench_imputation.py --rows 1000000
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from mspr1.imputation import impute  # noqa: E402
+
+
+CONTINENTS = ['Africa', 'Asia', 'Europe', 'North America',
+              'South America', 'Australia/Oceania']
+
+
+def synthetic_frame(rows, seed=42):
+    """Génère un jeu de données au format worldometer avec des trous."""
+    rng = np.random.default_rng(seed)
+    total_deaths = rng.integers(0, 50_000, rows).astype(float)
+    total_recovered = rng.integers(0, 1_000_000, rows).astype(float)
+    active_cases = rng.integers(0, 200_000, rows).astype(float)
+    total_cases = total_deaths + total_recovered + active_cases
+
+    missing = rng.random(rows)
+    # TotalDeaths et TotalRecovered ne manquent jamais sur la même ligne,
+    # sinon l'ancienne version échoue sur int(round(nan))
+    total_deaths[missing < 0.1] = np.nan
+    total_recovered[(missing >= 0.1) & (missing < 0.2)] = np.nan
+    active_cases[rng.random(rows) < 0.05] = np.nan
+
+    serious = rng.integers(0, 5_000, rows).astype(float)
+    serious[rng.random(rows) < 0.3] = np.nan
+    tests = rng.integers(0, 10_000_000, rows).astype(float)
+    tests[rng.random(rows) < 0.1] = np.nan
+    population = rng.integers(1_000, 100_000_000, rows).astype(float)
+    who_region = rng.choice(['Europe', 'Africa', 'Americas', None], rows)
+
+    return pd.DataFrame({
+        'Continent': rng.choice(CONTINENTS, rows),
+        'WHO Region': who_region,
+        'Country/Region': [f"Country {i}" for i in range(rows)],
+        'Population': population,
+        'TotalCases': total_cases,
+        'TotalDeaths': total_deaths,
+        'TotalRecovered': total_recovered,
+        'ActiveCases': active_cases,
+        'Serious,Critical': serious,
+        'TotalTests': tests,
+    })
+
+
+def legacy_impute(df):
+    """Ancienne implémentation de covid_mspr1.py (référence)."""
+    def fill_missing_total_deaths(row):
+        if pd.isnull(row['TotalDeaths']):
+            return int(
+                round(row['TotalCases'] - (
+                    row['TotalRecovered'] + row['ActiveCases'])))
+        return row['TotalDeaths']
+
+    def fill_missing_total_recovered(row):
+        if pd.isnull(row['TotalRecovered']):
+            return int(round(row['TotalCases'] - (
+                row['TotalDeaths'] + row['ActiveCases'])))
+        return row['TotalRecovered']
+
+    df['WHO Region'] = df['WHO Region'].fillna("Non classé")
+    europe_df = df[df['Continent'] == 'Europe']
+    df['ActiveCases'] = df['ActiveCases'].fillna(
+        europe_df['ActiveCases'].median())
+    df['TotalDeaths'] = df.apply(fill_missing_total_deaths, axis=1)
+    df['TotalRecovered'] = df.apply(fill_missing_total_recovered, axis=1)
+    df['NewTotalCases'] = (
+        df['TotalDeaths'] + df['TotalRecovered'] + df['ActiveCases']
+    )
+    df = df.drop(columns=['TotalCases'])
+    df['Serious,Critical'] = df.groupby('Continent')['Serious,Critical'] \
+                               .transform(lambda x: x.fillna(x.median()))
+    df['TotalTests'] = df.groupby('Continent')['TotalTests'] \
+                         .transform(lambda x: x.fillna(x.median()))
+    for column in df.columns:
+        if df[column].dtype == 'float64':
+            df[column] = df[column].fillna(0).astype(int)
+    return df
+
+
+def timed(function, df):
+    start = time.perf_counter()
+    result = function(df.copy())
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows)
+    print(f"Jeu synthétique : {len(df)} lignes")
+
+    vectorized, vectorized_time = timed(impute, df)
+    print(f"Vectorisé        : {vectorized_time:.3f}s")
+
+    legacy, legacy_time = timed(legacy_impute, df)
+    print(f"Ligne par ligne  : {legacy_time:.3f}s")
+
+    pd.testing.assert_frame_equal(vectorized, legacy)
+    print("Résultats identiques")
+    print(f"Accélération     : x{legacy_time / vectorized_time:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Benchmark de la sérialisation et de la compression des réponses.
+
+Lit toutes les entrées (comme GET /covid avec limit=1000) puis mesure :
+- le temps d'encodage JSON : jsonable_encoder + json.dumps (encodeur par
+  défaut de FastAPI) contre orjson (ws.services.json_response.dumps) ;
+- les octets envoyés et le temps de compression pour chaque encodage
+  (aucun, gzip, brotli), pour la page JSON et l'export NDJSON.
+
+La base doit être accessible (variables DB_* ou DATABASE_URL) et contenir
+les données de l'ETL.
+
+Usage : python benchmarks/bench_serialization.py --repeat 200
+"""
+import argparse
+import gzip
+import json
+import pathlib
+import sys
+import time
+
+import brotli
+from fastapi.encoders import jsonable_encoder
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from database.Database import connect  # noqa: E402
+from ws.services.covid_repository import SELECT_ENTRIES  # noqa: E402
+from ws.services.export import ndjson_chunk  # noqa: E402
+from ws.services.json_response import dumps  # noqa: E402
+
+
+def load_rows():
+    with connect() as connection, connection.cursor() as cursor:
+        cursor.execute(SELECT_ENTRIES + " ORDER BY country")
+        rows = [dict(row) for row in cursor.fetchall()]
+    connection.close()
+    return rows
+
+
+def timed(function, repeat):
+    """Durée médiane d'un appel, en millisecondes, et son résultat."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2] * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = load_rows()
+    page = {"data": rows, "next": None}
+    print(f"📊 {len(rows)} entrées\n")
+
+    encoders = {
+        "page jsonable_encoder+json": lambda: json.dumps(
+            jsonable_encoder(page)).encode(),
+        "page orjson": lambda: dumps(page),
+        "ndjson json.dumps": lambda: "".join(
+            json.dumps(row, ensure_ascii=False) + "\n"
+            for row in rows).encode(),
+        "ndjson orjson": lambda: ndjson_chunk(rows),
+    }
+    print(f"{'encodage':<28} {'ms':>8} {'octets':>9}")
+    bodies = {}
+    for name, encode in encoders.items():
+        duration, body = timed(encode, args.repeat)
+        bodies[name.split()[0]] = body
+        print(f"{name:<28} {duration:>8.3f} {len(body):>9}")
+
+    compressors = {
+        "aucune": lambda body: body,
+        "gzip 6": lambda body: gzip.compress(body, 6),
+        "gzip 9": lambda body: gzip.compress(body, 9),
+        "brotli 5": lambda body: brotli.compress(body, quality=5),
+        "brotli 11": lambda body: brotli.compress(body, quality=11),
+    }
+    print(f"\n{'réponse':<8} {'compression':<12} {'ms':>8} {'octets':>9}")
+    for name, body in bodies.items():
+        for compression, compress in compressors.items():
+            duration, compressed = timed(
+                lambda: compress(body), max(args.repeat // 10, 5))
+            print(f"{name:<8} {compression:<12} {duration:>8.3f} "
+                  f"{len(compressed):>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,129 @@
 import psycopg2
 import os
+import threading
 from psycopg2.extras import DictCursor
 from dotenv import load_dotenv
 
+from database.notifications import SELECT_VERSION
+from database.pool import ConnectionPool, PoolTimeout
+from database.replicas import replica_is_current, replica_router
+
 load_dotenv()
 
+# Pools du processus : None pour le primaire, le DSN pour un réplica
+_pools = {}
+_pool_lock = threading.Lock()
+
+
+def connect(dsn=None):
+    """Ouvre une nouvelle connexion PostgreSQL, hors pool : au primaire, ou
+    au réplica dsn."""
+    if dsn is not None:
+        return psycopg2.connect(dsn, cursor_factory=DictCursor)
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return psycopg2.connect(database_url, cursor_factory=DictCursor, sslmode='require')
+    return psycopg2.connect(
+        dbname=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        cursor_factory=DictCursor
+    )
+
+
+def get_pool(dsn=None):
+    """Pool de connexions du processus au primaire (ou au réplica dsn),
+    créé à la première utilisation.
+
+    Réglages : DB_POOL_MIN, DB_POOL_MAX, DB_POOL_TIMEOUT (attente d'une
+    connexion libre), DB_POOL_MAX_LIFETIME (recyclage) et
+    DB_POOL_PING_AFTER (inactivité avant vérification), en secondes.
+    """
+    with _pool_lock:
+        if dsn not in _pools:
+            _pools[dsn] = ConnectionPool(
+                lambda: connect(dsn),
+                min_size=int(os.getenv("DB_POOL_MIN", 1)),
+                max_size=int(os.getenv("DB_POOL_MAX", 10)),
+                timeout=float(os.getenv("DB_POOL_TIMEOUT", 30)),
+                max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+                ping_after=float(os.getenv("DB_POOL_PING_AFTER", 10)),
+            )
+        return _pools[dsn]
+
+
+def close_pool():
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.closeall()
+
 
 class Database:
-    def __init__(self):
-        database_url = os.getenv("DATABASE_URL")
-        if database_url:
-            self.connection = psycopg2.connect(database_url, cursor_factory=DictCursor, sslmode='require')
-        else:
-            self.connection = psycopg2.connect(
-            dbname=os.getenv("DB_NAME"),
-            user=os.getenv("DB_USER"),
-            password=os.getenv("DB_PASSWORD"),
-            host=os.getenv("DB_HOST"),
-            port=os.getenv("DB_PORT"),
-            cursor_factory=DictCursor
-        )
+    """Connexion empruntée au pool du processus et rendue par close().
+
+    Avec readonly=True la connexion vient d'un réplica en lecture
+    (DATABASE_REPLICA_URLS), choisi en tourniquet parmi ceux qui répondent
+    et ont rejoué au moins min_version : la version des données déjà vue
+    par l'API, pour ne jamais relire des données plus anciennes (lecture de
+    ses propres écritures). Sinon la connexion vient du primaire, comme
+    pour les écritures. replica est le nom du réplica utilisé, ou None.
+    """
+
+    def __init__(self, readonly=False, min_version=None):
+        self.replica = None
+        if readonly:
+            router = replica_router()
+            for name, dsn in router.candidates():
+                if self._use_replica(router, name, dsn, min_version):
+                    return
+            router.record(None)
+        self.pool = get_pool()
+        self.connection = self.pool.getconn()
+
+    def _use_replica(self, router, name, dsn, min_version):
+        try:
+            pool = get_pool(dsn)
+            connection = pool.getconn()
+        except PoolTimeout:
+            # Réplica saturé mais en bonne santé
+            return False
+        except psycopg2.Error:
+            router.eject(name)
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(SELECT_VERSION)
+                version = cursor.fetchone()[0]
+        except psycopg2.Error:
+            pool.putconn(connection)
+            router.eject(name)
+            return False
+        if not replica_is_current(version, min_version):
+            pool.putconn(connection)
+            router.record(name, "lagging")
+            return False
+        router.record(name)
+        self.pool, self.connection, self.replica = pool, connection, name
+        return True
 
     def get_cursor(self):
         return self.connection.cursor()
 
     def close(self):
-        self.connection.close()
+        if self.connection is not None:
+            self.pool.putconn(self.connection)
+            self.connection = None
 
     def __enter__(self):
         return self.get_cursor()
 
     def __exit__(self, exc_type, exc_value, traceback):
         if exc_type is None:
-            self.connection.commit() 
+            self.connection.commit()
         else:
             self.connection.rollback()
         self.close()
@@ -0,0 +1,136 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import asyncpg
+from dotenv import load_dotenv
+
+from database.notifications import SELECT_VERSION
+from database.replicas import replica_is_current, replica_router
+
+load_dotenv()
+
+# Pools du processus : None pour le primaire, le DSN pour un réplica
+_pools = {}
+_pool_loop = None
+
+# Erreurs d'un réplica injoignable ou indisponible
+REPLICA_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.PostgresError,
+                  asyncpg.InterfaceError)
+
+
+def connect_kwargs(dsn=None):
+    """Paramètres de connexion au primaire, ou au réplica dsn."""
+    if dsn is not None:
+        return {"dsn": dsn}
+    database_url = os.getenv("DATABASE_URL")
+    if database_url:
+        return {"dsn": database_url, "ssl": "require"}
+    return {
+        "database": os.getenv("DB_NAME"),
+        "user": os.getenv("DB_USER"),
+        "password": os.getenv("DB_PASSWORD"),
+        "host": os.getenv("DB_HOST"),
+        "port": int(os.getenv("DB_PORT", 5432)),
+    }
+
+
+async def get_async_pool(dsn=None):
+    """Pool asyncpg du processus vers le primaire (ou le réplica dsn), créé
+    à la première utilisation.
+
+    Mêmes réglages que le pool psycopg2 (DB_POOL_MIN, DB_POOL_MAX,
+    DB_POOL_MAX_LIFETIME). Les pools sont liés à la boucle d'évènements qui
+    les a créés : si la boucle change (TestClient sans bloc with), de
+    nouveaux pools sont ouverts.
+    """
+    global _pool_loop
+    loop = asyncio.get_running_loop()
+    if _pool_loop is not loop:
+        _pools.clear()
+        _pool_loop = loop
+    if dsn not in _pools:
+        _pools[dsn] = await asyncpg.create_pool(
+            min_size=int(os.getenv("DB_POOL_MIN", 1)),
+            max_size=int(os.getenv("DB_POOL_MAX", 10)),
+            max_inactive_connection_lifetime=float(
+                os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+            **connect_kwargs(dsn),
+        )
+    return _pools[dsn]
+
+
+async def _replica_connection(router, name, dsn, min_version):
+    """(pool, connexion) du réplica s'il répond et est à jour, sinon
+    None."""
+    try:
+        pool = await get_async_pool(dsn)
+        connection = await pool.acquire()
+    except REPLICA_ERRORS:
+        router.eject(name)
+        return None
+    try:
+        version = await connection.fetchval(SELECT_VERSION)
+    except REPLICA_ERRORS:
+        await pool.release(connection)
+        router.eject(name)
+        return None
+    if not replica_is_current(version, min_version):
+        await pool.release(connection)
+        router.record(name, "lagging")
+        return None
+    router.record(name)
+    return pool, connection
+
+
+@asynccontextmanager
+async def acquire(readonly=False, min_version=None):
+    """Connexion asyncpg empruntée au pool et rendue en fin de bloc.
+
+    Même routage que Database : avec readonly=True, un réplica qui répond
+    et a rejoué au moins min_version, choisi en tourniquet ; sinon le
+    primaire.
+    """
+    found = None
+    if readonly:
+        router = replica_router()
+        for name, dsn in router.candidates():
+            found = await _replica_connection(router, name, dsn, min_version)
+            if found is not None:
+                break
+        else:
+            router.record(None)
+    if found is None:
+        pool = await get_async_pool()
+        found = pool, await pool.acquire()
+    pool, connection = found
+    try:
+        yield connection
+    finally:
+        await pool.release(connection)
+
+
+async def close_async_pool():
+    global _pool_loop
+    # Les pools d'une autre boucle (fermée) sont seulement oubliés
+    pools = list(_pools.values()) \
+        if _pool_loop is asyncio.get_running_loop() else []
+    _pools.clear()
+    _pool_loop = None
+    for pool in pools:
+        await pool.close()
+
+
+def async_pool_stats():
+    """Statistiques du pool asyncpg du primaire, ou None s'il n'est pas
+    ouvert."""
+    pool = _pools.get(None)
+    if pool is None:
+        return None
+    return {
+        "min_size": pool.get_min_size(),
+        "max_size": pool.get_max_size(),
+        "size": pool.get_size(),
+        "idle": pool.get_idle_size(),
+        "in_use": pool.get_size() - pool.get_idle_size(),
+    }
@@ -0,0 +1,39 @@
+# Canal LISTEN/NOTIFY signalant une modification des données COVID. La
+# charge utile est "<version>:<pays>", le pays étant vide quand tout a pu
+# changer (chargement de l'ETL).
+CHANGES_CHANNEL = "covid_changes"
+
+SELECT_VERSION = "SELECT version FROM dataset_version"
+
+
+def bump_version_query(country, source=""):
+    """Requête qui incrémente la version des données (ETag de l'API) et
+    notifie les processus de l'API.
+
+    country est l'expression SQL du pays notifié et source une clause FROM
+    facultative : sans ligne dans source, rien n'est incrémenté. La ligne de
+    dataset_version reste verrouillée jusqu'au commit : les versions sont
+    notifiées dans l'ordre.
+    """
+    return f"""
+        UPDATE dataset_version SET version = version + 1{source}
+        RETURNING version,
+                  pg_notify('{CHANGES_CHANNEL}', version || ':' || {country})
+    """
+
+
+NOTIFY_CHANGES_ASYNCPG = bump_version_query("$1::text")
+
+
+def notify_changes(cursor, country=""):
+    """Incrémente la version des données et notifie les processus de l'API
+    au commit de la transaction. Renvoie la nouvelle version."""
+    cursor.execute(bump_version_query("%s"), (country,))
+    return cursor.fetchone()[0]
+
+
+def parse_notification(payload):
+    """(version, pays) d'une notification ; pays vaut None quand tout a pu
+    changer."""
+    version, _, country = payload.partition(":")
+    return int(version), country or None
@@ -0,0 +1,183 @@
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import PoolError
+
+
+class PoolTimeout(PoolError):
+    """Aucune connexion libérée dans le délai imparti."""
+
+
+class ConnectionPool:
+    """Pool de connexions partagé par tous les threads du processus.
+
+    psycopg2.pool ferme les connexions rendues au-delà de minconn, ce qui
+    revient à se reconnecter à chaque requête sous charge. Ici toutes les
+    connexions rendues sont gardées (jusqu'à max_size) et :
+
+    - une connexion restée inactive plus de ping_after secondes est
+      vérifiée par un SELECT 1 avant d'être prêtée ;
+    - une connexion ouverte depuis plus de max_lifetime secondes est
+      fermée et remplacée ;
+    - quand les max_size connexions sont prêtées, getconn() attend qu'une
+      connexion soit rendue, au plus timeout secondes (PoolTimeout).
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=30.0,
+                 max_lifetime=1800.0, ping_after=10.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError("Il faut 0 <= min_size <= max_size et "
+                             "max_size >= 1")
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_after = ping_after
+
+        self._condition = threading.Condition()
+        # Connexions libres : (connexion, ouverte à, rendue à), la plus
+        # récemment rendue en dernier
+        self._idle = []
+        # Date d'ouverture des connexions prêtées, par id()
+        self._opened_at = {}
+        self._size = 0
+        self._closed = False
+        self._counters = dict.fromkeys(
+            ["checkouts", "created", "recycled", "discarded", "waits",
+             "timeouts"], 0)
+
+        for _ in range(min_size):
+            self._size += 1
+            connection, opened_at = self._open()
+            self._idle.append((connection, opened_at, time.monotonic()))
+
+    def _open(self):
+        """Ouvre une connexion pour une place déjà comptée dans _size."""
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters["created"] += 1
+        return connection, time.monotonic()
+
+    def _discard(self, connection, counter="discarded"):
+        try:
+            connection.close()
+        except psycopg2.Error:
+            pass
+        with self._condition:
+            self._size -= 1
+            self._counters[counter] += 1
+            self._condition.notify()
+
+    def _healthy(self, connection, returned_at):
+        if connection.closed:
+            return False
+        status = connection.info.transaction_status
+        if status != extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if time.monotonic() - returned_at < self.ping_after:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1;")
+            connection.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _take(self, deadline):
+        """Réserve une place : une connexion libre, ou None s'il faut en
+        ouvrir une nouvelle."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise PoolError("Le pool de connexions est fermé")
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Aucune connexion libre après {self.timeout:g}s "
+                        f"({self.max_size} connexions prêtées)")
+                self._counters["waits"] += 1
+                self._condition.wait(remaining)
+
+    def getconn(self):
+        """Prête une connexion vérifiée (à rendre avec putconn())."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            entry = self._take(deadline)
+            if entry is None:
+                connection, opened_at = self._open()
+            else:
+                connection, opened_at, returned_at = entry
+                if time.monotonic() - opened_at > self.max_lifetime:
+                    self._discard(connection, "recycled")
+                    continue
+                if not self._healthy(connection, returned_at):
+                    self._discard(connection)
+                    continue
+
+            with self._condition:
+                self._opened_at[id(connection)] = opened_at
+                self._counters["checkouts"] += 1
+            return connection
+
+    def putconn(self, connection):
+        """Rend une connexion au pool, après rollback si besoin."""
+        with self._condition:
+            opened_at = self._opened_at.pop(id(connection), None)
+        if opened_at is None:
+            raise PoolError("Connexion inconnue du pool")
+
+        if not connection.closed:
+            status = connection.info.transaction_status
+            if status in (extensions.TRANSACTION_STATUS_INTRANS,
+                          extensions.TRANSACTION_STATUS_INERROR):
+                try:
+                    connection.rollback()
+                except psycopg2.Error:
+                    pass
+
+        if connection.closed or self._closed \
+                or connection.info.transaction_status \
+                != extensions.TRANSACTION_STATUS_IDLE:
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, opened_at, time.monotonic()))
+            self._condition.notify()
+
+    def closeall(self):
+        """Ferme les connexions libres ; les connexions prêtées seront
+        fermées à leur retour."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for connection, _, _ in idle:
+            self._discard(connection)
+
+    def stats(self):
+        """Statistiques du pool pour la supervision."""
+        with self._condition:
+            return {
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": len(self._opened_at),
+                **self._counters,
+            }
@@ -0,0 +1,122 @@
+import re
+import threading
+import time
+import weakref
+
+import psycopg2
+import psycopg2.errors
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+_NAME = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+def _parameter_count(query):
+    return max((int(n) for n in re.findall(r"\$(\d+)", query)), default=0)
+
+
+class PreparedStatements:
+    """Registre des requêtes fréquentes de l'API.
+
+    Avec psycopg2, chaque requête est préparée (PREPARE) à sa première
+    exécution sur une connexion, puis exécutée par EXECUTE : PostgreSQL
+    n'analyse et ne planifie plus le texte de la requête à chaque appel.
+    asyncpg prépare déjà les requêtes et les garde en cache par connexion :
+    seuls les appels et leur durée sont comptés (run_async()).
+
+    Les requêtes utilisent les paramètres $1, $2... Une nouvelle connexion
+    (reconnexion, recyclage par le pool) est inconnue du registre : les
+    requêtes y sont préparées à nouveau.
+    """
+
+    def __init__(self):
+        self._queries = {}
+        # Noms des requêtes préparées sur chaque connexion psycopg2
+        self._prepared = weakref.WeakKeyDictionary()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _register(self, name, query):
+        with self._lock:
+            if name not in self._queries:
+                if not _NAME.fullmatch(name):
+                    raise ValueError(f"Nom de requête invalide : {name!r}")
+                self._queries[name] = (query, _parameter_count(query))
+                self._stats[name] = {"calls": 0, "prepares": 0,
+                                     "total_ms": 0.0}
+            elif self._queries[name][0] != query:
+                raise ValueError(f"Requête {name!r} déjà enregistrée")
+            return self._queries[name][1]
+
+    def _record(self, name, seconds, prepared=False):
+        with self._lock:
+            stats = self._stats[name]
+            stats["calls"] += 1
+            stats["prepares"] += prepared
+            stats["total_ms"] += seconds * 1000
+
+    def _prepare(self, cursor, name, query):
+        """Prépare la requête sur la connexion du curseur si besoin ;
+        renvoie True si elle vient d'être préparée."""
+        with self._lock:
+            names = self._prepared.setdefault(cursor.connection, set())
+            if name in names:
+                return False
+        cursor.execute(f"PREPARE {name} AS {query}")
+        with self._lock:
+            names.add(name)
+        return True
+
+    def execute(self, cursor, name, query, args=()):
+        """Exécute query sous le nom name sur un curseur psycopg2.
+
+        Si le serveur ne connaît plus la requête (DEALLOCATE, DISCARD ALL),
+        elle est préparée à nouveau et réexécutée quand aucune transaction
+        n'était ouverte ; sinon l'erreur remonte, la transaction étant
+        interrompue, et la requête sera préparée à l'appel suivant.
+        """
+        count = self._register(name, query)
+        placeholders = ", ".join(["%s"] * count)
+        statement = f"EXECUTE {name} ({placeholders})" if count \
+            else f"EXECUTE {name}"
+        connection = cursor.connection
+        retry = (connection.autocommit or connection.info.transaction_status
+                 == TRANSACTION_STATUS_IDLE)
+
+        start = time.perf_counter()
+        prepared = self._prepare(cursor, name, query)
+        try:
+            cursor.execute(statement, args)
+        except psycopg2.errors.InvalidSqlStatementName:
+            # Seule cette requête est oubliée : les autres restent préparées
+            with self._lock:
+                self._prepared.get(connection, set()).discard(name)
+            if not retry:
+                raise
+            if not connection.autocommit:
+                connection.rollback()
+            prepared = self._prepare(cursor, name, query)
+            cursor.execute(statement, args)
+        self._record(name, time.perf_counter() - start, prepared)
+
+    async def run_async(self, name, call, query, *args):
+        """Appelle call(query, *args) (fetch, fetchrow... d'asyncpg) en
+        comptant l'appel et sa durée sous le nom name."""
+        self._register(name, query)
+        start = time.perf_counter()
+        result = await call(query, *args)
+        self._record(name, time.perf_counter() - start)
+        return result
+
+    def stats(self):
+        """Appels, préparations et durées (ms) de chaque requête."""
+        with self._lock:
+            return {
+                name: {**stats,
+                       "total_ms": round(stats["total_ms"], 3),
+                       "mean_ms": round(stats["total_ms"] / stats["calls"], 3)
+                       if stats["calls"] else None}
+                for name, stats in self._stats.items()}
+
+
+# Registre du processus
+prepared_statements = PreparedStatements()
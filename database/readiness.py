@@ -0,0 +1,56 @@
+import os
+import time
+
+import psycopg2
+
+
+DEFAULT_TIMEOUT = 30.0
+INITIAL_DELAY = 0.05
+MAX_DELAY = 2.0
+
+
+def ready_timeout():
+    """Délai maximal d'attente de PostgreSQL (DB_READY_TIMEOUT, en s)."""
+    return float(os.getenv("DB_READY_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+def wait_for_postgres(connect, timeout=None, initial_delay=INITIAL_DELAY,
+                      max_delay=MAX_DELAY):
+    """Attend que PostgreSQL réponde et renvoie la connexion obtenue.
+
+    connect est la fabrique de connexion (une classe Database) : chaque
+    tentative ouvre une connexion et exécute SELECT 1. Entre deux échecs
+    l'attente double, de initial_delay jusqu'à max_delay, sans dépasser le
+    délai global. La connexion qui a répondu est renvoyée pour être
+    réutilisée ; psycopg2.OperationalError est levée une fois le délai
+    dépassé.
+    """
+    timeout = ready_timeout() if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    delay = initial_delay
+    attempt = 0
+
+    while True:
+        attempt += 1
+        try:
+            db = connect()
+            try:
+                with db.connection.cursor() as cursor:
+                    cursor.execute("SELECT 1;")
+                db.connection.commit()
+            except psycopg2.Error:
+                db.close()
+                raise
+            print(f"✅ PostgreSQL prêt (tentative {attempt})", flush=True)
+            return db
+        except psycopg2.OperationalError as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise psycopg2.OperationalError(
+                    f"PostgreSQL inaccessible après {timeout:g}s "
+                    f"({attempt} tentatives) : {e}") from e
+            print(f"🟡 PostgreSQL pas encore prêt (tentative {attempt}), "
+                  f"nouvel essai dans {min(delay, remaining):.2f}s",
+                  flush=True)
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_delay)
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def replica_dsns():
+    """DSN des réplicas en lecture : DATABASE_REPLICA_URLS, séparés par des
+    virgules (aucun par défaut)."""
+    return [dsn.strip() for dsn in os.getenv("DATABASE_REPLICA_URLS",
+                                             "").split(",") if dsn.strip()]
+
+
+class ReplicaRouter:
+    """Choix du réplica des lectures : tourniquet sur les réplicas en bonne
+    santé.
+
+    Un réplica injoignable est écarté pendant retry_after secondes. Un
+    réplica en retard (version des données rejouée inférieure à celle déjà
+    vue par l'API) n'est pas écarté : la lecture passe au suivant, puis au
+    primaire. Les réplicas sont nommés replica0, replica1... dans les
+    statistiques, pour ne pas exposer les DSN (mots de passe).
+    """
+
+    def __init__(self, dsns, retry_after=30.0):
+        self.replicas = [(f"replica{i}", dsn) for i, dsn in enumerate(dsns)]
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._next = 0
+        self._ejected_until = {}
+        self._counters = {
+            name: dict.fromkeys(["reads", "failures", "lagging"], 0)
+            for name, _ in self.replicas}
+        self._primary_reads = 0
+
+    def candidates(self):
+        """(nom, DSN) des réplicas à essayer, dans l'ordre du tourniquet,
+        sans ceux qui sont écartés."""
+        with self._lock:
+            if not self.replicas:
+                return []
+            start = self._next
+            self._next = (start + 1) % len(self.replicas)
+            now = time.monotonic()
+            ordered = self.replicas[start:] + self.replicas[:start]
+            return [(name, dsn) for name, dsn in ordered
+                    if self._ejected_until.get(name, 0) <= now]
+
+    def eject(self, name):
+        """Écarte un réplica injoignable pendant retry_after secondes."""
+        with self._lock:
+            self._ejected_until[name] = time.monotonic() + self.retry_after
+            self._counters[name]["failures"] += 1
+
+    def record(self, name, counter="reads"):
+        """Compte une lecture servie par name, ou un retard ; name None :
+        lecture servie par le primaire."""
+        with self._lock:
+            if name is None:
+                self._primary_reads += 1
+            else:
+                self._counters[name][counter] += 1
+
+    def stats(self):
+        """Statistiques des réplicas pour la supervision."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "primary_reads": self._primary_reads,
+                "replicas": [
+                    {"name": name,
+                     "ejected": self._ejected_until.get(name, 0) > now,
+                     **self._counters[name]}
+                    for name, _ in self.replicas],
+            }
+
+
+def replica_router():
+    """Routeur du processus, créé à la première utilisation
+    (DATABASE_REPLICA_URLS, DB_REPLICA_RETRY_AFTER en secondes)."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ReplicaRouter(
+                replica_dsns(),
+                retry_after=float(os.getenv("DB_REPLICA_RETRY_AFTER", 30)))
+        return _router
+
+
+def replica_is_current(version, min_version):
+    """Vrai si le réplica a rejoué au moins min_version (None : pas
+    d'exigence)."""
+    return min_version is None or (version is not None
+                                   and version >= min_version)
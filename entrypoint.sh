@@ -2,7 +2,7 @@
 set -e
 
 echo "Lancement du script ETL"
-if python mspr1/covid_mspr1.py; then
+if python mspr1/covid_mspr1.py --incremental --metrics --metrics-table; then
     echo "Script ETL exécuté avec succès"
 else
     echo "Script ETL not ok" >&2
@@ -1,6 +1,7 @@
 import React, { useMemo } from "react";
 import { Pie } from "react-chartjs-2";
 import { useTranslation } from "react-i18next";
+import { CovidAggregateGroup } from "../../types/CovidAggregate";
 
 import {
 	Chart as ChartJS,
@@ -14,37 +15,20 @@ import {
 
 ChartJS.register(ArcElement, Tooltip, Legend, Title);
 
-interface CovidDataPieChart {
-	country: string;
-	total_cases: number;
-	continent: string;
-}
-
 interface CovidContinentPieChartProps {
-	data: CovidDataPieChart[];
+	// Totaux par continent, calculés par l'API (GET /covid/aggregate)
+	groups: CovidAggregateGroup[];
 }
 
 const CovidContinentPieChart: React.FC<CovidContinentPieChartProps> = ({
-	data,
+	groups,
 }) => {
 	const { t } = useTranslation();
 
 	const regionData = useMemo(() => {
-		console.log("Continent PieChart - raw data:", data);
-
-		const totals: Record<string, number> = {};
-
-		data.forEach((entry) => {
-			if (entry.continent && entry.total_cases > 0) {
-				const continent = entry.continent.trim();
-				totals[continent] = (totals[continent] || 0) + entry.total_cases;
-			}
-		});
-
-		console.log("Continent PieChart - grouped totals:", totals);
-
-		const continents = Object.keys(totals);
-		const values = Object.values(totals);
+		const withCases = groups.filter((group) => group.total_cases > 0);
+		const continents = withCases.map((group) => group.name);
+		const values = withCases.map((group) => group.total_cases);
 
 		const backgroundColors = [
 			"#3b82f6",
@@ -74,7 +58,7 @@ const CovidContinentPieChart: React.FC<CovidContinentPieChartProps> = ({
 				},
 			],
 		};
-	}, [data, t]);
+	}, [groups, t]);
 
 	const pieOptions: ChartOptions<"pie"> = {
 		responsive: true,
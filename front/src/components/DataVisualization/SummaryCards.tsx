@@ -1,16 +1,13 @@
 import React from "react";
 import { useTranslation } from "react-i18next";
-
-interface CovidData {
-	total_cases: number;
-	total_recovered: number;
-}
+import { CovidAggregateTotals } from "../../types/CovidAggregate";
 
 interface SummaryCardsProps {
-	data: CovidData[];
+	// Totaux de tous les pays, calculés par l'API (GET /covid/aggregate)
+	total: CovidAggregateTotals | null;
 }
 
-const SummaryCards: React.FC<SummaryCardsProps> = ({ data }) => {
+const SummaryCards: React.FC<SummaryCardsProps> = ({ total }) => {
 	const { t } = useTranslation();
 
 	return (
@@ -22,7 +19,7 @@ const SummaryCards: React.FC<SummaryCardsProps> = ({ data }) => {
 							<small className="text-muted">
 								{t("data_visualization.card_total_countries")}
 							</small>
-							<h4 className="mb-0">{data.length}</h4>
+							<h4 className="mb-0">{total?.countries ?? 0}</h4>
 						</div>
 						<span style={{ fontSize: "2rem" }}>
 							<img src="./icons/globe.svg" alt="" />
@@ -38,7 +35,7 @@ const SummaryCards: React.FC<SummaryCardsProps> = ({ data }) => {
 								{t("data_visualization.card_global_cases")}
 							</small>
 							<h4 className="mb-0">
-								{data.reduce((s, c) => s + c.total_cases, 0).toLocaleString()}
+								{(total?.total_cases ?? 0).toLocaleString()}
 							</h4>
 						</div>
 						<span className="display-5">🦠</span>
@@ -53,9 +50,7 @@ const SummaryCards: React.FC<SummaryCardsProps> = ({ data }) => {
 								{t("data_visualization.card_global_recovered")}
 							</small>
 							<h4 className="mb-0">
-								{data
-									.reduce((s, c) => s + c.total_recovered, 0)
-									.toLocaleString()}
+								{(total?.total_recovered ?? 0).toLocaleString()}
 							</h4>
 						</div>
 						<span style={{ fontSize: "2rem" }}>
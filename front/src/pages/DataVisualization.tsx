@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
-import { getCountries } from "../services/api";
+import { getAggregates, getCountries } from "../services/api";
+import CovidAggregate from "../types/CovidAggregate";
 import SummaryCards from "../components/DataVisualization/SummaryCards";
 import BarChartTopCases from "../components/DataVisualization/BarChartTopCases";
 import ScatterPlotTestsCases from "../components/DataVisualization/ScatterPlotTestsCases";
@@ -19,6 +20,7 @@ interface CovidData {
 
 const DataVisualization: React.FC = () => {
 	const [data, setData] = useState<CovidData[]>([]);
+	const [aggregates, setAggregates] = useState<CovidAggregate | null>(null);
 	const [loading, setLoading] = useState(true);
 	const [error, setError] = useState<string | null>(null);
 
@@ -26,10 +28,14 @@ const DataVisualization: React.FC = () => {
 		try {
 			setLoading(true);
 			setError(null);
-			const res = await getCountries();
+			const [res, continents] = await Promise.all([
+				getCountries(),
+				getAggregates("continent"),
+			]);
 			console.log("API data format:", res.data);
 
 			setData(res.data ?? []);
+			setAggregates(continents);
 		} catch (err) {
 			setError("Failed to fetch COVID-19 data.");
 			console.error(err);
@@ -62,10 +68,10 @@ const DataVisualization: React.FC = () => {
 
 	return (
 		<div className="container py-5">
-			<SummaryCards data={data} />
+			<SummaryCards total={aggregates?.total ?? null} />
 			<BarChartTopCases data={data} />
 			<ScatterPlotTestsCases data={data} />
-			<CovidContinentPieChart data={data} />
+			<CovidContinentPieChart groups={aggregates?.groups ?? []} />
 		</div>
 	);
 };
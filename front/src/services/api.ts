@@ -1,6 +1,7 @@
 import axios from "axios";
 import CountryInput from "../types/CountryInput";
 import CountryInputPredict from "../types/CountryInputPredict";
+import CovidAggregate from "../types/CovidAggregate";
 
 const API_URL = "https://covid-app.fly.dev";
 
@@ -52,8 +53,29 @@ export const loginUser = async (username: string, password: string) => {
 };
 
 // Countries API
+// GET /covid est paginé : on suit le curseur "next" jusqu'à la dernière page
 export const getCountries = async () => {
-	const response = await api.get("/covid");
+	const data = [];
+	let after: string | null = null;
+	do {
+		const params: { limit: number; after?: string } = { limit: 1000 };
+		if (after) {
+			params.after = after;
+		}
+		const response = await api.get("/covid", { params });
+		data.push(...response.data.data);
+		after = response.data.next;
+	} while (after);
+	return { data };
+};
+
+// Totaux et taux par continent ou région OMS, calculés par l'API
+export const getAggregates = async (
+	groupBy: CovidAggregate["group_by"] = "continent"
+): Promise<CovidAggregate> => {
+	const response = await api.get("/covid/aggregate", {
+		params: { group_by: groupBy },
+	});
 	return response.data;
 };
 
@@ -0,0 +1,25 @@
+// Réponse de GET /covid/aggregate : totaux et taux calculés par l'API
+export interface CovidAggregateTotals {
+	countries: number;
+	population: number;
+	total_cases: number;
+	total_deaths: number;
+	total_recovered: number;
+	serious_critical: number;
+	total_tests: number;
+	case_fatality_rate: number | null;
+	tests_per_million: number | null;
+	recovery_ratio: number | null;
+}
+
+export interface CovidAggregateGroup extends CovidAggregateTotals {
+	name: string;
+}
+
+interface CovidAggregate {
+	group_by: "continent" | "who_region";
+	groups: CovidAggregateGroup[];
+	total: CovidAggregateTotals | null;
+}
+
+export default CovidAggregate;
@@ -6,9 +6,14 @@ import os
 load_dotenv()
 
 class Database:
-    def __init__(self):
+    def __init__(self, connection=None):
+        # Connexion déjà ouverte (sonde de disponibilité) : elle est
+        # réutilisée et n'est pas fermée à la sortie du bloc with
+        self.owns_connection = connection is None
         database_url = os.getenv("DATABASE_URL")
-        if database_url:
+        if connection is not None:
+            self.connection = connection
+        elif database_url:
             self.connection = psycopg2.connect(database_url, cursor_factory=DictCursor)
         else:
             self.connection = psycopg2.connect(
@@ -34,4 +39,5 @@ class Database:
             self.connection.commit()
         else:
             self.connection.rollback()
-        self.close()
+        if self.owns_connection:
+            self.close()
@@ -0,0 +1,101 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mspr1.Database import Database
+from mspr1.bulk_loader import bulk_load
+from mspr1.columnar_cache import read_cache, write_cache
+from mspr1.incremental import file_hash, incremental_load, source_unchanged
+
+
+def is_batch_input(path):
+    """Vrai si path désigne un dossier ou un motif glob."""
+    return bool(path) and (os.path.isdir(path)
+                           or any(char in path for char in "*?["))
+
+
+def expand_inputs(path):
+    """Liste triée des fichiers CSV désignés par un dossier ou un glob."""
+    if os.path.isdir(path):
+        path = os.path.join(path, "*.csv")
+    return sorted(p for p in glob.glob(path) if os.path.isfile(p))
+
+
+def _transform_file(path, key=None, use_cache=True):
+    """Exécuté dans un processus du pool.
+
+    Avec le cache, seule la clé est renvoyée au processus principal qui
+    relit le cache en mémoire projetée : le DataFrame n'est pas sérialisé
+    entre les processus.
+    """
+    # Import local pour éviter un import circulaire avec covid_mspr1
+    from mspr1.covid_mspr1 import extract, transform
+    if not use_cache:
+        return transform(extract(path))
+
+    key = key or file_hash(path)
+    if read_cache(key) is None:
+        write_cache(transform(extract(path)), key)
+    return key
+
+
+def run_batch(path, workers=None, incremental=False, use_cache=True,
+              connection=None):
+    """Transforme en parallèle tous les fichiers de path et les charge.
+
+    Les fichiers sont nettoyés par un pool de processus et chargés un par
+    un, dans l'ordre alphabétique, sur une seule connexion. Chaque fichier
+    est commité séparément : une erreur sur un fichier est signalée sans
+    interrompre le reste du lot.
+    """
+    from mspr1.covid_mspr1 import create_tables
+
+    paths = expand_inputs(path)
+    if not paths:
+        print(f"⚠️ Aucun fichier trouvé pour {path}", flush=True)
+        return {"loaded": [], "skipped": [], "failed": {}}
+
+    start = time.perf_counter()
+    loaded, skipped, failed = [], [], {}
+
+    with Database(connection) as cursor:
+        create_tables(cursor)
+        cursor.connection.commit()
+
+        hashes = {}
+        if incremental:
+            for source in paths:
+                hashes[source] = file_hash(source)
+                if source_unchanged(cursor, source, hashes[source]):
+                    skipped.append(source)
+            paths = [source for source in paths if source not in skipped]
+
+        print(f"📂 {len(paths)} fichier(s) à traiter avec "
+              f"{workers or os.cpu_count()} processus", flush=True)
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(source, pool.submit(_transform_file, source,
+                                            hashes.get(source), use_cache))
+                       for source in paths]
+
+            for source, future in futures:
+                try:
+                    result = future.result()
+                    df = read_cache(result) if use_cache else result
+                    if incremental:
+                        incremental_load(cursor, [df], source, hashes[source])
+                    else:
+                        bulk_load(cursor, df)
+                    cursor.connection.commit()
+                    loaded.append(source)
+                except Exception as e:
+                    cursor.connection.rollback()
+                    failed[source] = str(e)
+                    print(f"❌ Échec pour {source} : {e}", flush=True)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Lot terminé en {elapsed:.2f}s : {len(loaded)} chargé(s), "
+          f"{len(skipped)} inchangé(s), {len(failed)} en échec", flush=True)
+
+    return {"loaded": loaded, "skipped": skipped, "failed": failed}
@@ -0,0 +1,185 @@
+import io
+import time
+
+from database.notifications import notify_changes
+from mspr1.instrumentation import stage
+
+
+# Colonnes du DataFrame nettoyé, dans l'ordre de la table de staging
+STAGING_COLUMNS = [
+    "continent",
+    "who_region",
+    "country",
+    "population",
+    "total_tests",
+    "new_total_cases",
+    "total_deaths",
+    "total_recovered",
+    "serious_critical",
+    "active_cases",
+]
+
+
+def create_staging(cursor):
+    """Crée la table temporaire qui reçoit les données à charger."""
+    # Elle peut exister si plusieurs chargements partagent une transaction
+    cursor.execute("DROP TABLE IF EXISTS pg_temp.staging_worldometer;")
+    cursor.execute("""
+        CREATE TEMP TABLE staging_worldometer (
+            row_number BIGINT NOT NULL,
+            continent VARCHAR(100),
+            who_region VARCHAR(100),
+            country VARCHAR(100),
+            population BIGINT,
+            total_tests BIGINT,
+            total_cases BIGINT,
+            total_deaths BIGINT,
+            total_recovered BIGINT,
+            serious_critical BIGINT,
+            active_cases BIGINT,
+            row_hash BIGINT
+        ) ON COMMIT DROP;
+    """)
+
+
+def copy_to_staging(cursor, df, start=0):
+    """Envoie le DataFrame dans la table temporaire avec COPY FROM STDIN.
+
+    start est le numéro de la première ligne, pour garder une numérotation
+    continue quand les données arrivent par morceaux. La colonne row_hash
+    est copiée si elle est présente (chargement incrémental).
+    """
+    columns = STAGING_COLUMNS + (["row_hash"] if "row_hash" in df else [])
+    with stage("load.copy", rows=len(df)):
+        staging = df[columns].copy()
+        # Le numéro de ligne permet de garder la première occurrence d'un
+        # pays, comme le faisait l'insertion ligne par ligne
+        # (ON CONFLICT DO NOTHING)
+        staging.insert(0, "row_number", range(start, start + len(staging)))
+
+        buffer = io.StringIO()
+        staging.to_csv(buffer, header=False, index=False)
+        buffer.seek(0)
+
+        target_columns = ["row_number"] + [
+            "total_cases" if column == "new_total_cases" else column
+            for column in columns
+        ]
+        cursor.copy_expert(
+            f"COPY staging_worldometer ({', '.join(target_columns)}) "
+            "FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def stage_chunks(cursor, chunks):
+    """Crée la table temporaire, y copie chaque morceau et renvoie le
+    nombre de lignes copiées."""
+    create_staging(cursor)
+    rows = 0
+    for chunk in chunks:
+        copy_to_staging(cursor, chunk, start=rows)
+        rows += len(chunk)
+    return rows
+
+
+def merge_staging(cursor):
+    """Alimente les tables finales à partir de la table temporaire."""
+    with stage("load.countries") as measure:
+        cursor.execute("""
+            INSERT INTO countries (country, continent, who_region, population)
+            SELECT DISTINCT ON (country)
+                   country, continent, who_region, population
+            FROM staging_worldometer
+            ORDER BY country, row_number
+            ON CONFLICT (country) DO UPDATE
+            SET continent = EXCLUDED.continent,
+                who_region = EXCLUDED.who_region,
+                population = EXCLUDED.population;
+        """)
+        measure["rows"] = countries_count = cursor.rowcount
+
+    with stage("load.health_statistics") as measure:
+        cursor.execute("""
+            INSERT INTO health_statistics
+            (country_id, total_cases, total_deaths,
+             total_recovered, serious_critical)
+            SELECT DISTINCT ON (s.country) c.id, s.total_cases, s.total_deaths,
+                   s.total_recovered, s.serious_critical
+            FROM staging_worldometer s
+            JOIN countries c ON c.country = s.country
+            ORDER BY s.country, s.row_number
+            ON CONFLICT (country_id) DO UPDATE
+            SET total_cases = EXCLUDED.total_cases,
+                total_deaths = EXCLUDED.total_deaths,
+                total_recovered = EXCLUDED.total_recovered,
+                serious_critical = EXCLUDED.serious_critical;
+        """)
+        measure["rows"] = health_count = cursor.rowcount
+
+    with stage("load.testing_statistics") as measure:
+        cursor.execute("""
+            INSERT INTO testing_statistics (country_id, total_tests)
+            SELECT DISTINCT ON (s.country) c.id, s.total_tests
+            FROM staging_worldometer s
+            JOIN countries c ON c.country = s.country
+            ORDER BY s.country, s.row_number
+            ON CONFLICT (country_id) DO UPDATE
+            SET total_tests = EXCLUDED.total_tests;
+        """)
+        measure["rows"] = testing_count = cursor.rowcount
+
+    # Les caches de l'API sont invalidés au commit
+    notify_changes(cursor)
+
+    return {
+        "countries": countries_count,
+        "health_statistics": health_count,
+        "testing_statistics": testing_count,
+    }
+
+
+def report(stats, rows, start):
+    """Affiche et renvoie le débit du chargement commencé à start."""
+    elapsed = time.perf_counter() - start
+    rows_per_second = rows / elapsed if elapsed > 0 else float("inf")
+
+    print(f"✅ Chargement bulk : {rows} lignes en {elapsed:.3f}s "
+          f"({rows_per_second:.0f} lignes/s)", flush=True)
+
+    return {
+        "rows": rows,
+        "seconds": elapsed,
+        "rows_per_second": rows_per_second,
+        **stats,
+    }
+
+
+def bulk_load(cursor, df):
+    """Charge le DataFrame nettoyé en quelques requêtes ensemblistes.
+
+    Le DataFrame est copié dans une table temporaire, puis les tables
+    countries, health_statistics et testing_statistics sont alimentées par
+    des INSERT ... SELECT (worldometer suit par trigger). Tout se fait dans
+    la transaction du curseur : le commit est laissé à l'appelant
+    (Database).
+    """
+    start = time.perf_counter()
+
+    create_staging(cursor)
+    copy_to_staging(cursor, df)
+    stats = merge_staging(cursor)
+
+    return report(stats, len(df), start)
+
+
+def bulk_load_chunks(cursor, chunks):
+    """Même chargement que bulk_load() pour des DataFrames par morceaux.
+
+    Chaque morceau est envoyé dans la table temporaire dès qu'il est prêt,
+    la fusion vers les tables finales se fait une seule fois à la fin.
+    """
+    start = time.perf_counter()
+
+    rows = stage_chunks(cursor, chunks)
+    stats = merge_staging(cursor)
+
+    return report(stats, rows, start)
@@ -0,0 +1,87 @@
+import json
+import os
+import pathlib
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+# À incrémenter quand le nettoyage change : les caches existants sont ignorés
+CACHE_VERSION = 2
+DEFAULT_CACHE_DIR = "data/cache"
+
+
+def cache_dir(directory=None):
+    return pathlib.Path(
+        directory or os.getenv("ETL_CACHE_DIR", DEFAULT_CACHE_DIR))
+
+
+def write_cache(df, key, directory=None):
+    """Écrit le DataFrame nettoyé en fichiers .npy, une colonne par fichier.
+
+    key est l'empreinte du fichier source. Les colonnes texte sont stockées
+    en catégories (codes entiers + liste des valeurs dans meta.json) pour
+    que toutes les colonnes puissent être projetées en mémoire.
+    """
+    target = cache_dir(directory) / key
+    if read_cache(key, directory) is not None:
+        return target
+
+    tmp = target.with_name(f".{key}.{os.getpid()}.tmp")
+    tmp.mkdir(parents=True, exist_ok=True)
+
+    meta = {"version": CACHE_VERSION, "rows": len(df), "columns": []}
+    for position, name in enumerate(df.columns):
+        column = df[name]
+        filename = f"{position}.npy"
+        if pd.api.types.is_numeric_dtype(column.dtype):
+            np.save(tmp / filename, column.to_numpy())
+            meta["columns"].append({"name": name, "file": filename})
+        else:
+            categorical = column.astype("category")
+            np.save(tmp / filename, categorical.cat.codes.to_numpy())
+            meta["columns"].append({
+                "name": name,
+                "file": filename,
+                "categories": categorical.cat.categories.tolist(),
+            })
+
+    with open(tmp / "meta.json", "w") as f:
+        json.dump(meta, f)
+
+    # Cache écrit par une version précédente du nettoyage
+    shutil.rmtree(target, ignore_errors=True)
+    try:
+        os.replace(tmp, target)
+    except OSError:
+        # Un autre processus a écrit le même cache entre-temps
+        shutil.rmtree(tmp, ignore_errors=True)
+    return target
+
+
+def read_cache(key, directory=None):
+    """Relit un cache écrit par write_cache(), ou None s'il n'existe pas.
+
+    Les colonnes numériques sont projetées en mémoire (lecture seule) et
+    ne sont pas copiées.
+    """
+    source = cache_dir(directory) / key
+    try:
+        with open(source / "meta.json") as f:
+            meta = json.load(f)
+    except FileNotFoundError:
+        return None
+    if meta.get("version") != CACHE_VERSION:
+        return None
+
+    columns = {}
+    for column in meta["columns"]:
+        # np.asarray donne une vue ndarray du fichier projeté, sans copie
+        values = np.asarray(
+            np.load(source / column["file"], mmap_mode="r"))
+        if "categories" in column:
+            values = pd.Categorical.from_codes(values, column["categories"])
+        columns[column["name"]] = values
+
+    return pd.DataFrame(columns, copy=False)
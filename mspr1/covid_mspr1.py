@@ -1,273 +1,72 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import missingno as mno
-from sklearn.model_selection import train_test_split
-from Database import Database
-
+import argparse
+import contextlib
+import os
+import pathlib
+import sys
 
+import numpy as np
+import pandas as pd
 import psycopg2
-import time
-from sklearn.model_selection import train_test_split
 from dotenv import load_dotenv
 
-load_dotenv(override=True)
-
-
-df = pd.read_csv('data/worldometer_data_raw.csv')
-
-df.head()
-
-df.info()
-
-df.columns
-
-df = df[['Continent',
-         'WHO Region',
-         'Country/Region',
-         'Population',
-         'TotalCases',
-         'NewCases',
-         'TotalDeaths',
-         'NewDeaths',
-         'TotalRecovered',
-         'NewRecovered',
-         'ActiveCases',
-         'Serious,Critical',
-         'Tot Cases/1M pop',
-         'Deaths/1M pop',
-         'TotalTests',
-         'Tests/1M pop']]
-
-mno.matrix(df, figsize=(15, 5))
-
-plt.figure(figsize=(10, 7))
-sns.heatmap(
-    df.select_dtypes('number').corr(),
-    annot=True,
-    fmt=".1f",
-    cmap="coolwarm")
-
-# plt.figure(figsize=(19, 9))
-# sns.boxplot(data=df, palette='Accent')
-# plt.title("Données Statistiques du dataset d'origine sans nettoyage")
-# plt.show()
-
-# df.boxplot(column=['Population'],
-# figsize=(9, 5))
-# plt.title("Données Statistiques de la colonne Population")
-# plt.show()
-
-# valid_columns = df[['NewCases',
-# 'NewDeaths',
-# 'NewRecovered']].dropna(axis=1,
-# how='all').columns
-# df.boxplot(column=valid_columns, figsize=(9, 5))
-
-# df.boxplot(column=['NewCases', 'NewDeaths', 'NewRecovered'], figsize=(9, 5))
-# plt.title("Données Statistiques sur les nouveax morts, cas et sauvées")
-# plt.show()
-
-# df.boxplot(column=['TotalDeaths'], figsize=(9,5))
-# plt.title("Données Statistiques de la colonne TotalDeaths")
-# plt.show()
-
-# df.boxplot(column=['TotalRecovered',
-# 'ActiveCases',
-# 'TotalCases',
-# 'Tests/1M pop'],
-# figsize=(9,5))
-# plt.title("Données Statistiques de la colonne Population")
-# plt.show()
-
-# df.boxplot(column=['TotalTests'], figsize=(9,5))
-# plt.title("Données Statistiques de la colonne TotalDeaths")
-# plt.show()
-
-# df.boxplot(column=['Tests/1M pop'], figsize=(9,5))
-# plt.title("Données Statistiques de la colonne TotalDeaths")
-# plt.show()
-
-# df.boxplot(column=['Serious,Critical'], figsize=(9,5))
-# plt.title("Données Statistiques de la colonne TotalDeaths")
-# plt.show()
-
-# df.boxplot(column=['Deaths/1M pop'], figsize=(9,5))
-# plt.title("Données Statistiques sur le nombre de morts/ 1M de population")
-# plt.show()
-
-# df.boxplot(column=['Tot Cases/1M pop'], figsize=(9,5))
-# plt.title("Données Statistiques sur ")
-# plt.show()
-
-# df.boxplot(column=['Tests/1M pop'], figsize=(9,5))
-# plt.title("Données Statistiques de la colonne Population")
-# plt.show()
-
-df.describe()
-
-df.isna().sum()
-
-mno.matrix(df, figsize=(15, 5))
-
-df.isna().sum()
-
-mno.matrix(df, figsize=(15, 5))
-
-mask_population = df['Population'].isnull() | (df['Population'] == '')
-mask_continent = df['Continent'].isnull() | (df['Continent'] == '')
-
-ligne_suspecte = df[mask_population & mask_continent]
-
-print("Ligne suspecte avec les colonnes Population et Continent vides:")
-ligne_suspecte
-
-df = df[df['Country/Region'] != 'Diamond Princess']
-
-mno.matrix(df, figsize=(15, 5))
-
-df.isna().sum()
-
-df.drop_duplicates(inplace=True)
-
-df.duplicated()
-
-df['NewTotalCases'] = (
-    df['TotalDeaths'] + df['TotalRecovered'] + df['ActiveCases']
-)
-df
-
-plt.figure(figsize=(10, 7))
-sns.heatmap(
-    df.select_dtypes('number').corr(),
-    annot=True,
-    fmt=".1f",
-    cmap="coolwarm"
-    )
-
-df = df.drop(columns=["Tot Cases/1M pop",
-                      "Deaths/1M pop",
-                      "NewRecovered",
-                      "NewCases",
-                      "Tests/1M pop",
-                      "NewDeaths"],
-             errors='ignore')
-
-df.head()
-
-mno.matrix(df, figsize=(15, 5))
-
-plt.figure(figsize=(10, 7))
-sns.heatmap(
-    df.select_dtypes('number').corr(),
-    annot=True,
-    fmt=".2f",
-    cmap="coolwarm"
-    )
-
-mno.matrix(df, figsize=(15, 9))
-
-df['WHO Region'] = df['WHO Region'].fillna("Non classé")
-
-df.sample(20)
-
-null_active_cases = df[df['ActiveCases'].isnull()]
-null_active_cases
-
-europe_df = df[df['Continent'] == 'Europe']
-
-europe_active_cases_median = europe_df['ActiveCases'].median()
-
-df['ActiveCases'] = df['ActiveCases'].fillna(europe_active_cases_median)
-
-nan_count_after = df['ActiveCases'].isnull().sum()
-
-selected_rows = df.iloc[[9, 11, 29, 40]]
-selected_rows
-
-
-def fill_missing_total_deaths(row):
-    if pd.isnull(row['TotalDeaths']):
-        return int(
-            round(row['TotalCases'] - (
-                row['TotalRecovered'] + row['ActiveCases'])))
-    return row['TotalDeaths']
-
-
-missing_total_deaths_before = df['TotalDeaths'].isnull().sum()
-
-df['TotalDeaths'] = df.apply(fill_missing_total_deaths, axis=1)
-
-missing_total_deaths_after = df['TotalDeaths'].isnull().sum()
-
-print(f"Number of missing 'TotalDeaths' values before filling: "
-      f"{missing_total_deaths_before}")
-print(f"Number of missing 'TotalDeaths' values after filling: "
-      f"{missing_total_deaths_after}")
-
-
-def fill_missing_total_recovered(row):
-    if pd.isnull(row['TotalRecovered']):
-        return int(round(row['TotalCases'] - (
-            row['TotalDeaths'] + row['ActiveCases'])))
-    return row['TotalRecovered']
-
-
-missing_total_deaths_before = df['TotalRecovered'].isnull().sum()
-
-df['TotalRecovered'] = df.apply(fill_missing_total_recovered, axis=1)
-
-missing_total_deaths_after = df['TotalRecovered'].isnull().sum()
-
-selected_rows = df.iloc[[9, 11, 29, 40]]
-selected_rows
-
-df['NewTotalCases'] = (
-    df['TotalDeaths'] + df['TotalRecovered'] + df['ActiveCases']
-)
-df
-
-mno.matrix(df, figsize=(15, 5))
-
-if df['NewTotalCases'].equals(df['TotalCases']):
-    print("Les colonnes sont identiques")
-else:
-    print("Les colonnes sont différentes")
-
-    differences_count = (df['NewTotalCases'] != df['TotalCases']).sum()
-    print(f"Nombre de différences trouvées : {differences_count}")
-
-    print("\nExemples de différences :")
-    diff_rows = df[
-        df['NewTotalCases'] != df['TotalCases']
-        ][['NewTotalCases', 'TotalCases']]
-    print(diff_rows.head())
-
-df = df.drop(columns=['TotalCases'])
-df
-
-df['Serious,Critical'] = df.groupby('Continent')['Serious,Critical'] \
-                             .transform(lambda x: x.fillna(x.median()))
-df['TotalTests'] = df.groupby('Continent')['TotalTests'] \
-                     .transform(lambda x: x.fillna(x.median()))
-
-mno.matrix(df, figsize=(15, 5))
-
-plt.figure(figsize=(8, 7))
-sns.heatmap(
-    df.select_dtypes('number').corr(),
-    annot=True,
-    fmt=".2f",
-    cmap="coolwarm"
-    )
-
-for column in df.columns:
-    if df[column].dtype == 'float64':
-        df[column] = df[column].fillna(0).astype(int)
+# Exécution directe (python mspr1/covid_mspr1.py) : on ajoute la racine du
+# projet au path pour pouvoir importer le package mspr1
+if __package__ in (None, ""):
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent))
+
+from database.notifications import notify_changes  # noqa: E402
+from database.readiness import wait_for_postgres  # noqa: E402
+from mspr1.Database import Database  # noqa: E402
+from mspr1.batch import is_batch_input, run_batch  # noqa: E402
+from mspr1.bulk_loader import bulk_load, bulk_load_chunks  # noqa: E402
+from mspr1.columnar_cache import read_cache, write_cache  # noqa: E402
+from mspr1.dtype_policy import compact_dtypes  # noqa: E402
+from mspr1.imputation import MedianInputs, impute  # noqa: E402
+from mspr1.incremental import (  # noqa: E402
+    file_hash, incremental_load, source_unchanged)
+from mspr1.instrumentation import (  # noqa: E402
+    save_metrics, stage, start_run, timed, write_json_lines)
+
+
+DEFAULT_RAW_PATH = "data/worldometer_data_raw.csv"
+DEFAULT_PROFILE_DIR = "reports/etl_profile"
+DEFAULT_CHUNKSIZE = 100_000
+
+RAW_COLUMNS = ['Continent',
+               'WHO Region',
+               'Country/Region',
+               'Population',
+               'TotalCases',
+               'NewCases',
+               'TotalDeaths',
+               'NewDeaths',
+               'TotalRecovered',
+               'NewRecovered',
+               'ActiveCases',
+               'Serious,Critical',
+               'Tot Cases/1M pop',
+               'Deaths/1M pop',
+               'TotalTests',
+               'Tests/1M pop']
+
+TEXT_COLUMNS = ['Continent', 'WHO Region', 'Country/Region']
+
+# Types fixés pour la lecture par morceaux : sans ça, une colonne peut être
+# lue en entier dans un morceau et en flottant dans un autre
+RAW_DTYPES = {
+    column: (str if column in TEXT_COLUMNS else 'float64')
+    for column in RAW_COLUMNS
+}
 
-df.info()
+# Colonnes peu renseignées ou redondantes avec les totaux
+DROPPED_COLUMNS = ["Tot Cases/1M pop",
+                   "Deaths/1M pop",
+                   "NewRecovered",
+                   "NewCases",
+                   "Tests/1M pop",
+                   "NewDeaths"]
 
-columns_mapping = {
+COLUMNS_MAPPING = {
     "Country/Region": "country",
     "WHO Region": "who_region",
     "NewTotalCases": "new_total_cases",
@@ -279,158 +78,864 @@ columns_mapping = {
     "Continent": "continent",
     "ActiveCases": "active_cases"
 }
-df = df.rename(columns=columns_mapping)
-df
 
-df = df.drop_duplicates()
 
-df.head()
-
-sns.heatmap(df.select_dtypes('number').corr(), annot=True, cmap="coolwarm")
-
-X = df
-X_train, X_test = train_test_split(
-    X,
-    test_size=0.2,
-    random_state=42
-)
+def _raw_path(path=None):
+    return path or os.getenv("DATA_RAW_PATH", DEFAULT_RAW_PATH)
+
+
+def extract(path=None):
+    """Lit le fichier brut et ne garde que les colonnes utiles."""
+    with stage("extract") as measure:
+        df = pd.read_csv(_raw_path(path))
+        measure["rows"] = len(df)
+    return df[RAW_COLUMNS]
+
+
+def extract_chunks(path=None, chunksize=DEFAULT_CHUNKSIZE,
+                   stage_name="extract"):
+    """Lit le fichier brut par morceaux de chunksize lignes."""
+    reader = pd.read_csv(_raw_path(path),
+                         usecols=RAW_COLUMNS,
+                         dtype=RAW_DTYPES,
+                         chunksize=chunksize)
+    for chunk in timed(stage_name, reader):
+        yield chunk[RAW_COLUMNS]
+
+
+def _filter_rows(df):
+    # Diamond Princess est un navire : ni population ni continent
+    return df[df['Country/Region'] != 'Diamond Princess'].copy()
+
+
+def _no_hashes():
+    return np.empty(0, dtype=np.uint64)
+
+
+def _drop_seen_duplicates(df, seen):
+    """drop_duplicates() qui se souvient des lignes des morceaux précédents.
+
+    seen est le tableau trié des empreintes (uint64, 8 octets par ligne
+    unique) des lignes déjà rencontrées ; renvoie le morceau sans doublons
+    et seen complété.
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    # Première occurrence de chaque empreinte du morceau...
+    unique, first = np.unique(hashes, return_index=True)
+    # ... absente des morceaux précédents
+    unseen = ~np.isin(unique, seen, assume_unique=True)
+    unique = unique[unseen]
+    keep = np.zeros(len(hashes), dtype=bool)
+    keep[first[unseen]] = True
+    return df[keep], np.insert(seen, np.searchsorted(seen, unique), unique)
+
+
+def transform(df):
+    """Nettoie les données brutes et renvoie le DataFrame prêt à charger."""
+    with stage("clean", rows=len(df)):
+        df = _filter_rows(df)
+        df = df.drop_duplicates()
+        df = df.drop(columns=DROPPED_COLUMNS, errors='ignore')
+
+    missing_total_deaths_before = df['TotalDeaths'].isnull().sum()
+    with stage("impute", rows=len(df)):
+        df = impute(df)
+    missing_total_deaths_after = df['TotalDeaths'].isnull().sum()
+
+    print(f"Number of missing 'TotalDeaths' values before filling: "
+          f"{missing_total_deaths_before}")
+    print(f"Number of missing 'TotalDeaths' values after filling: "
+          f"{missing_total_deaths_after}")
+
+    with stage("dedupe") as measure:
+        df = df.rename(columns=COLUMNS_MAPPING)
+        df = df.drop_duplicates()
+        measure["rows"] = len(df)
+
+    with stage("compact_dtypes", rows=len(df)):
+        return compact_dtypes(df, report=True)
+
+
+def transform_cached(path=None, key=None):
+    """transform(extract(path)) en passant par le cache colonne par colonne.
+
+    Le cache est identifié par l'empreinte du fichier source (key, calculée
+    si besoin). Le DataFrame renvoyé a des colonnes texte en catégories et
+    des colonnes numériques projetées en mémoire depuis le cache.
+    """
+    path = _raw_path(path)
+    key = key or file_hash(path)
+
+    with stage("cache.read"):
+        df = read_cache(key)
+    if df is None:
+        df = transform(extract(path))
+        with stage("cache.write", rows=len(df)):
+            write_cache(df, key)
+        with stage("cache.read"):
+            df = read_cache(key)
+    return df
+
+
+def compute_streaming_medians(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Première lecture du fichier : seules les valeurs utiles aux
+    médianes sont gardées, réduites à chaque morceau."""
+    seen = _no_hashes()
+    inputs = MedianInputs()
+    for chunk in extract_chunks(path, chunksize, "medians.extract"):
+        chunk, seen = _drop_seen_duplicates(_filter_rows(chunk), seen)
+        inputs.add(chunk)
+    del seen
+    with stage("medians"):
+        return inputs.medians()
+
+
+def transform_chunks(path=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Version par morceaux de extract() + transform().
+
+    Les médianes sont calculées sur tout le fichier lors d'une première
+    lecture ; la concaténation des morceaux produits a les mêmes valeurs que
+    transform(extract(path)). Les types compacts sont choisis par morceau.
+    """
+    medians = compute_streaming_medians(path, chunksize)
+    raw_seen = _no_hashes()
+    clean_seen = _no_hashes()
+
+    for chunk in extract_chunks(path, chunksize):
+        with stage("clean", rows=len(chunk)):
+            chunk, raw_seen = _drop_seen_duplicates(_filter_rows(chunk),
+                                                    raw_seen)
+            chunk = chunk.drop(columns=DROPPED_COLUMNS, errors='ignore')
+        with stage("impute", rows=len(chunk)):
+            chunk = impute(chunk, medians)
+        with stage("dedupe") as measure:
+            chunk = chunk.rename(columns=COLUMNS_MAPPING)
+            chunk, clean_seen = _drop_seen_duplicates(chunk, clean_seen)
+            measure["rows"] = len(chunk)
+        if len(chunk):
+            with stage("compact_dtypes", rows=len(chunk)):
+                chunk = compact_dtypes(chunk)
+            yield chunk
+
+
+def profile_report(raw_df, clean_df, output_dir=DEFAULT_PROFILE_DIR):
+    """Exploration des données (graphiques et statistiques).
+
+    Les bibliothèques de visualisation sont importées ici seulement pour ne
+    pas ralentir l'ETL lancé au démarrage du conteneur.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import missingno as mno
+    import seaborn as sns
+    from sklearn.model_selection import train_test_split
+
+    output_dir = pathlib.Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print(raw_df.describe())
+    print(raw_df.isna().sum())
+
+    mask_population = raw_df['Population'].isnull() \
+        | (raw_df['Population'] == '')
+    mask_continent = raw_df['Continent'].isnull() \
+        | (raw_df['Continent'] == '')
+    print("Ligne suspecte avec les colonnes Population et Continent vides:")
+    print(raw_df[mask_population & mask_continent])
+
+    for name, frame in (("raw", raw_df), ("clean", clean_df)):
+        mno.matrix(frame, figsize=(15, 5))
+        plt.savefig(output_dir / f"missing_{name}.png")
+        plt.close("all")
+
+        plt.figure(figsize=(10, 7))
+        sns.heatmap(
+            frame.select_dtypes('number').corr(),
+            annot=True,
+            fmt=".2f",
+            cmap="coolwarm")
+        plt.savefig(output_dir / f"correlation_{name}.png")
+        plt.close("all")
+
+    print(clean_df.sample(min(20, len(clean_df))))
+    clean_df.info()
+
+    X_train, X_test = train_test_split(
+        clean_df,
+        test_size=0.2,
+        random_state=42
+    )
+    print(f"Taille de X_train: {X_train.shape}")
+    print(f"Taille de X_test: {X_test.shape}")
+    print(f"📊 Rapport d'exploration enregistré dans {output_dir}")
 
-print(f"Taille de X_train: {X_train.shape}")
-print(f"Taille de X_test: {X_test.shape}")
 
+def checkpostgres(timeout=None):
+    """Attend PostgreSQL et renvoie une connexion prête pour le chargement.
 
-def checkpostgres(max_retries=5):
+    Lève psycopg2.OperationalError si la base ne répond pas avant
+    DB_READY_TIMEOUT secondes.
+    """
     print("🔍 Vérification de la connexion à PostgreSQL...", flush=True)
+    return wait_for_postgres(Database, timeout).connection
+
+
+def create_tables(cursor):
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS t_users (
+        id SERIAL PRIMARY KEY,
+        username VARCHAR(50) NOT NULL UNIQUE,
+        email VARCHAR(100) NOT NULL UNIQUE,
+        password_hash TEXT NOT NULL,
+        date_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    # Modèle de lecture de l'API : une ligne par pays, tenue à jour par des
+    # triggers sur les tables normalisées (voir create_read_model). Les
+    # statistiques sont vides tant qu'elles n'existent pas pour le pays.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS worldometer (
+        id SERIAL PRIMARY KEY,
+        continent VARCHAR(100) NOT NULL,
+        who_region VARCHAR(100) NOT NULL,
+        country VARCHAR(100) NOT NULL,
+        population INT NOT NULL,
+        total_tests INT,
+        total_cases INT,
+        total_deaths INT,
+        total_recovered INT,
+        serious_critical INT
+    );
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS countries (
+        id SERIAL PRIMARY KEY,
+        country VARCHAR(100) NOT NULL UNIQUE,
+        continent VARCHAR(100) NOT NULL,
+        who_region VARCHAR(100) NOT NULL,
+        population INT NOT NULL
+    );
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS health_statistics (
+        id SERIAL PRIMARY KEY,
+        country_id INT NOT NULL UNIQUE,
+        total_cases INT NOT NULL,
+        total_deaths INT NOT NULL,
+        total_recovered INT NOT NULL,
+        serious_critical INT NOT NULL,
+        CONSTRAINT fk_health_country FOREIGN KEY (country_id) REFERENCES countries(id)
+            ON DELETE CASCADE
+    );
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS testing_statistics (
+        id SERIAL PRIMARY KEY,
+        country_id INT NOT NULL UNIQUE,
+        total_tests INT NOT NULL,
+        CONSTRAINT fk_testing_country FOREIGN KEY (country_id) REFERENCES countries(id)
+            ON DELETE CASCADE
+    );
+    """)
+
+    migrate_cascade_deletes(cursor)
+    create_read_model(cursor)
+    create_region_totals(cursor)
+
+    # État du chargement incrémental : empreinte du dernier fichier chargé
+    # et de la dernière ligne écrite pour chaque pays
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS etl_runs (
+        source VARCHAR(255) PRIMARY KEY,
+        file_hash CHAR(64) NOT NULL,
+        loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS etl_row_hashes (
+        country VARCHAR(100) PRIMARY KEY,
+        row_hash BIGINT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    # Version des données (ETag de l'API), incrémentée à chaque écriture.
+    # Elle démarre à l'horodatage de création en microsecondes pour qu'une
+    # base recréée ne réutilise pas les ETag déjà connus des clients.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS dataset_version (
+        id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+        version BIGINT NOT NULL
+    );
+    INSERT INTO dataset_version (version)
+    VALUES ((extract(epoch FROM clock_timestamp()) * 1000000)::BIGINT)
+    ON CONFLICT (id) DO NOTHING;
+    """)
+
+    # Mesures par étape de chaque exécution (--metrics-table), pour Grafana
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS etl_metrics (
+        id SERIAL PRIMARY KEY,
+        run_id CHAR(32) NOT NULL,
+        started_at TIMESTAMPTZ NOT NULL,
+        position INT NOT NULL,
+        stage VARCHAR(50) NOT NULL,
+        calls INT NOT NULL,
+        rows BIGINT,
+        wall_seconds DOUBLE PRECISION NOT NULL,
+        cpu_seconds DOUBLE PRECISION NOT NULL,
+        peak_rss_mb DOUBLE PRECISION
+    );
+    """)
+
+
+# Clés étrangères des statistiques vers countries, en ON DELETE CASCADE
+CASCADE_FOREIGN_KEYS = {
+    "health_statistics": "fk_health_country",
+    "testing_statistics": "fk_testing_country",
+}
 
-    for attempt in range(max_retries):
-        print(f"🟡 Tentative {attempt + 1}/{max_retries}...", flush=True)
-        try:
-            with Database() as cursor:
-                pass
-            print("Connexion PostgreSQL réussie !", flush=True)
-            return True
-        except psycopg2.OperationalError as e:
-            print(f"⚠️ PostgreSQL inaccessible : {e}", flush=True)
-            time.sleep(5)
-
-    print("PostgreSQL inaccessible après plusieurs tentatives.", flush=True)
-    return False
 
+def migrate_cascade_deletes(cursor):
+    """Passe en ON DELETE CASCADE les clés étrangères des bases créées avant.
 
+    Sans effet si les contraintes sont déjà en cascade.
+    """
+    for table, constraint in CASCADE_FOREIGN_KEYS.items():
+        cursor.execute("""
+            SELECT confdeltype FROM pg_constraint
+            WHERE conname = %s AND conrelid = %s::regclass;
+        """, (constraint, table))
+        row = cursor.fetchone()
+        if row is not None and row[0] == "c":
+            continue
+        cursor.execute(f"""
+            ALTER TABLE {table}
+            DROP CONSTRAINT IF EXISTS {constraint},
+            ADD CONSTRAINT {constraint} FOREIGN KEY (country_id)
+                REFERENCES countries(id) ON DELETE CASCADE;
+        """)
+        print(f"🔧 Migration : {table}.{constraint} en ON DELETE CASCADE")
+
+
+# Ligne de worldometer d'un pays, reconstruite depuis les tables normalisées
+READ_MODEL_SELECT = """
+    SELECT c.continent, c.who_region, c.country, c.population,
+           t.total_tests, h.total_cases, h.total_deaths,
+           h.total_recovered, h.serious_critical
+    FROM countries c
+    LEFT JOIN health_statistics h ON c.id = h.country_id
+    LEFT JOIN testing_statistics t ON c.id = t.country_id
+"""
+
+# Tables de transition des triggers par instruction, selon l'évènement
+TRANSITION_TABLES = {
+    "INSERT": "NEW TABLE AS new_rows",
+    "UPDATE": "OLD TABLE AS old_rows NEW TABLE AS new_rows",
+    "DELETE": "OLD TABLE AS old_rows",
+}
 
-if __name__ == "__main__":
-    # Vérifier la connexion
-    checkpostgres()
+READ_MODEL_COLUMNS = ("continent, who_region, country, population, "
+                      "total_tests, total_cases, total_deaths, "
+                      "total_recovered, serious_critical")
+
+
+def create_read_model(cursor):
+    """Fait de worldometer le modèle de lecture des tables normalisées.
+
+    Chaque écriture sur countries, health_statistics ou testing_statistics
+    (API ou ETL) recalcule les lignes des pays concernés par un trigger par
+    instruction. Les
+    bases créées avant sont migrées : statistiques sans NOT NULL, contenu
+    reconstruit et index unique sur le pays.
+    """
+    cursor.execute("""
+        ALTER TABLE worldometer
+            ALTER COLUMN total_tests DROP NOT NULL,
+            ALTER COLUMN total_cases DROP NOT NULL,
+            ALTER COLUMN total_deaths DROP NOT NULL,
+            ALTER COLUMN total_recovered DROP NOT NULL,
+            ALTER COLUMN serious_critical DROP NOT NULL;
+    """)
+
+    cursor.execute("SELECT to_regclass('worldometer_country_key');")
+    if cursor.fetchone()[0] is None:
+        cursor.execute("TRUNCATE worldometer;")
+        cursor.execute(f"INSERT INTO worldometer ({READ_MODEL_COLUMNS}) "
+                       f"{READ_MODEL_SELECT};")
+        cursor.execute("CREATE UNIQUE INDEX worldometer_country_key "
+                       "ON worldometer (country);")
+        print("🔧 Migration : worldometer reconstruit depuis les tables "
+              "normalisées")
+
+    # Filtres de GET /covid, avec le pays pour la pagination par clé
+    cursor.execute("""
+        DROP INDEX IF EXISTS idx_countries_continent_country;
+        DROP INDEX IF EXISTS idx_countries_who_region_country;
+        CREATE INDEX IF NOT EXISTS idx_worldometer_continent_country
+            ON worldometer (continent, country);
+        CREATE INDEX IF NOT EXISTS idx_worldometer_who_region_country
+            ON worldometer (who_region, country);
+    """)
+
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION sync_worldometer() RETURNS trigger AS $$
+        DECLARE
+            changed_ids INT[];
+        BEGIN
+            IF TG_TABLE_NAME = 'countries' THEN
+                IF TG_OP = 'DELETE' THEN
+                    DELETE FROM worldometer
+                    WHERE country IN (SELECT country FROM old_rows);
+                    RETURN NULL;
+                END IF;
+                IF TG_OP = 'UPDATE' THEN
+                    DELETE FROM worldometer WHERE country IN (
+                        SELECT o.country FROM old_rows o
+                        JOIN new_rows n USING (id)
+                        WHERE o.country <> n.country);
+                END IF;
+                SELECT array_agg(id) INTO changed_ids FROM new_rows;
+            ELSIF TG_OP = 'INSERT' THEN
+                SELECT array_agg(country_id) INTO changed_ids FROM new_rows;
+            ELSIF TG_OP = 'UPDATE' THEN
+                SELECT array_agg(country_id) INTO changed_ids FROM (
+                    SELECT country_id FROM old_rows
+                    UNION SELECT country_id FROM new_rows) AS changed;
+            ELSE
+                SELECT array_agg(country_id) INTO changed_ids FROM old_rows;
+            END IF;
+
+            INSERT INTO worldometer ({READ_MODEL_COLUMNS})
+            {READ_MODEL_SELECT} WHERE c.id = ANY(changed_ids)
+            ON CONFLICT (country) DO UPDATE
+            SET continent = EXCLUDED.continent,
+                who_region = EXCLUDED.who_region,
+                population = EXCLUDED.population,
+                total_tests = EXCLUDED.total_tests,
+                total_cases = EXCLUDED.total_cases,
+                total_deaths = EXCLUDED.total_deaths,
+                total_recovered = EXCLUDED.total_recovered,
+                serious_critical = EXCLUDED.serious_critical;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Un trigger par instruction et par évènement (une table de transition
+    # n'est permise que pour un seul) : un chargement de N lignes réécrit
+    # worldometer en une instruction, et non N
+    for table in ("countries", "health_statistics", "testing_statistics"):
+        cursor.execute(f"DROP TRIGGER IF EXISTS sync_worldometer ON {table};")
+        for event, referencing in TRANSITION_TABLES.items():
+            cursor.execute(f"""
+                CREATE OR REPLACE TRIGGER sync_worldometer_{event.lower()}
+                AFTER {event} ON {table}
+                REFERENCING {referencing}
+                FOR EACH STATEMENT EXECUTE FUNCTION sync_worldometer();
+            """)
+
+
+# Regroupements de region_totals ; "all" est le total de tous les pays
+REGION_GROUPS = ("continent", "who_region")
+REGION_TOTAL_COLUMNS = ["population", "total_cases", "total_deaths",
+                        "total_recovered", "serious_critical", "total_tests"]
+
+
+# Groupe (group_by, group_value) d'une ligne de GROUP BY GROUPING SETS
+REGION_GROUPING = """
+    CASE WHEN GROUPING(continent) = 0 THEN 'continent'
+         WHEN GROUPING(who_region) = 0 THEN 'who_region'
+         ELSE 'all' END,
+    COALESCE(continent, who_region, '')"""
+
+# Lignes modifiées par l'instruction, avec leur signe, selon l'opération
+REGION_CHANGES = {
+    "INSERT": "SELECT 1 AS sign, * FROM new_rows",
+    "UPDATE": "SELECT -1 AS sign, * FROM old_rows "
+              "UNION ALL SELECT 1, * FROM new_rows",
+    "DELETE": "SELECT -1 AS sign, * FROM old_rows",
+}
 
-    # Exemple: charger un dataframe pandas ici
-    # df = pd.read_csv("ton_fichier.csv")  # ou autre méthode de chargement
 
-    # Création des tables
-    with Database() as cursor:
-        
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS t_users (
-            id SERIAL PRIMARY KEY,
-            username VARCHAR(50) NOT NULL UNIQUE,
-            email VARCHAR(100) NOT NULL UNIQUE,
-            password_hash TEXT NOT NULL,
-            date_created TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+def _region_deltas_sql(changes):
+    """Applique aux totaux la différence de toutes les lignes modifiées par
+    une instruction : un GROUP BY, puis une seule mise à jour par groupe."""
+    deltas = ", ".join(f"sum(sign * COALESCE({column}, 0)) AS {column}"
+                       for column in REGION_TOTAL_COLUMNS)
+    unchanged = " AND ".join(f"{column} = 0"
+                             for column in ["countries"]
+                             + REGION_TOTAL_COLUMNS)
+    updates = ",\n".join(
+        f"                    {column} = region_totals.{column} "
+        f"+ EXCLUDED.{column}" for column in REGION_TOTAL_COLUMNS)
+    return f"""
+                WITH deltas AS (
+                    SELECT {REGION_GROUPING},
+                           sum(sign) AS countries, {deltas}
+                    FROM ({changes}) AS changes
+                    GROUP BY GROUPING SETS ((continent), (who_region), ())
+                ), upserted AS (
+                    INSERT INTO region_totals
+                    SELECT * FROM deltas WHERE NOT ({unchanged})
+                    ON CONFLICT (group_by, group_value) DO UPDATE
+                    SET countries = region_totals.countries
+                                    + EXCLUDED.countries,
+{updates}
+                    RETURNING group_by, group_value, countries
+                )
+                SELECT array_agg(group_by), array_agg(group_value)
+                INTO emptied_by, emptied_value
+                FROM upserted WHERE countries = 0;"""
+
+
+def create_region_totals(cursor):
+    """Totaux par continent, par région OMS et global (GET /covid/aggregate).
+
+    Des triggers par instruction sur worldometer regroupent les lignes
+    modifiées (tables de transition) et appliquent leur différence une fois
+    par groupe touché : les totaux suivent les écritures de l'API et de
+    l'ETL sans relire les pays, et un chargement de N lignes ne met pas à
+    jour N fois les mêmes groupes. À la création de la table, les totaux
+    sont calculés depuis worldometer (GROUPING SETS).
+    """
+    cursor.execute("SELECT to_regclass('region_totals');")
+    created = cursor.fetchone()[0] is None
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS region_totals (
+            group_by VARCHAR(20) NOT NULL,
+            group_value VARCHAR(100) NOT NULL,
+            countries INT NOT NULL,
+            population BIGINT NOT NULL,
+            total_cases BIGINT NOT NULL,
+            total_deaths BIGINT NOT NULL,
+            total_recovered BIGINT NOT NULL,
+            serious_critical BIGINT NOT NULL,
+            total_tests BIGINT NOT NULL,
+            PRIMARY KEY (group_by, group_value)
         );
+    """)
+
+    sums = ", ".join(f"COALESCE(sum({column}), 0)"
+                     for column in REGION_TOTAL_COLUMNS)
+    if created:
+        cursor.execute(f"""
+            INSERT INTO region_totals
+            SELECT {REGION_GROUPING}, count(*), {sums}
+            FROM worldometer
+            GROUP BY GROUPING SETS ((continent), (who_region), ())
+            HAVING count(*) > 0;
         """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS worldometer (
-            id SERIAL PRIMARY KEY, 
-            continent VARCHAR(100) NOT NULL,
-            who_region VARCHAR(100) NOT NULL,
-            country VARCHAR(100) NOT NULL,
-            population INT NOT NULL,
-            total_tests INT NOT NULL,
-            total_cases INT NOT NULL,
-            total_deaths INT NOT NULL,
-            total_recovered INT NOT NULL,
-            serious_critical INT NOT NULL
-        );
+    # Ancien trigger ligne par ligne
+    cursor.execute("""
+        DROP TRIGGER IF EXISTS sync_region_totals ON worldometer;
+        DROP FUNCTION IF EXISTS add_region_totals(worldometer, INT);
+    """)
+
+    cursor.execute(f"""
+        CREATE OR REPLACE FUNCTION sync_region_totals() RETURNS trigger AS $$
+        DECLARE
+            emptied_by VARCHAR[];
+            emptied_value VARCHAR[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {_region_deltas_sql(REGION_CHANGES["INSERT"])}
+            ELSIF TG_OP = 'UPDATE' THEN
+                {_region_deltas_sql(REGION_CHANGES["UPDATE"])}
+            ELSE
+                {_region_deltas_sql(REGION_CHANGES["DELETE"])}
+            END IF;
+
+            -- Seuls les groupes touchés et devenus vides sont supprimés
+            DELETE FROM region_totals
+            WHERE (group_by, group_value) IN (
+                SELECT * FROM unnest(emptied_by, emptied_value))
+              AND countries = 0;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    for event, referencing in TRANSITION_TABLES.items():
+        cursor.execute(f"""
+            CREATE OR REPLACE TRIGGER sync_region_totals_{event.lower()}
+            AFTER {event} ON worldometer
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION sync_region_totals();
         """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS countries (
-            id SERIAL PRIMARY KEY, 
-            country VARCHAR(100) NOT NULL UNIQUE, 
-            continent VARCHAR(100) NOT NULL,
-            who_region VARCHAR(100) NOT NULL,
-            population INT NOT NULL
-        );
-        """)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS health_statistics (
-            id SERIAL PRIMARY KEY,
-            country_id INT NOT NULL UNIQUE,
-            total_cases INT NOT NULL,
-            total_deaths INT NOT NULL,
-            total_recovered INT NOT NULL,
-            serious_critical INT NOT NULL,
-            CONSTRAINT fk_health_country FOREIGN KEY (country_id) REFERENCES countries(id)
-        );
-        """)
+def load_rows(cursor, df):
+    """Insertion ligne par ligne (ancien mode de chargement).
+
+    Seuls les pays absents de la base sont insérés.
+    """
+    with stage("load.rows", rows=len(df)):
+        _insert_rows(cursor, df)
+    notify_changes(cursor)
 
-        cursor.execute("""
-        CREATE TABLE IF NOT EXISTS testing_statistics (
-            id SERIAL PRIMARY KEY,
-            country_id INT NOT NULL UNIQUE,
-            total_tests INT NOT NULL,
-            CONSTRAINT fk_testing_country FOREIGN KEY (country_id) REFERENCES countries(id)
-        );
-        """)
 
+def _insert_rows(cursor, df):
+    for index, row in df.iterrows():
+        try:
+            country = row['country']
+            continent = row['continent']
+            who_region = row['who_region']
+            population = int(row['population'])
+            total_tests = int(row['total_tests'])
+            total_cases = int(row['new_total_cases'])
+            total_deaths = int(row['total_deaths'])
+            total_recovered = int(row['total_recovered'])
+            serious_critical = int(row['serious_critical'])
+
+            cursor.execute("""
+                INSERT INTO countries (country, continent, who_region, population)
+                VALUES (%s, %s, %s, %s)
+                ON CONFLICT (country) DO NOTHING
+                RETURNING id;
+            """, (country, continent, who_region, population))
+
+            country_id_row = cursor.fetchone()
+            if country_id_row is None:
+                # Pays déjà présent : on ne le réécrit pas (relance de l'ETL)
+                continue
+            country_id = country_id_row[0]
+
+            cursor.execute("""
+                INSERT INTO health_statistics (country_id, total_cases, total_deaths, total_recovered, serious_critical)
+                VALUES (%s, %s, %s, %s, %s);
+            """, (country_id, total_cases, total_deaths, total_recovered, serious_critical))
+
+            cursor.execute("""
+                INSERT INTO testing_statistics (country_id, total_tests)
+                VALUES (%s, %s);
+            """, (country_id, total_tests))
+
+            print(f"Insertion réussie pour {country}")
+
+        except psycopg2.Error as e:
+            print(f"Erreur lors de l'insertion pour {country}: {e}")
+
+
+def load(df, bulk=False, connection=None):
+    """Crée les tables si besoin puis charge le DataFrame nettoyé.
+
+    connection est une connexion déjà ouverte à réutiliser (sinon une
+    connexion est ouverte par transaction).
+    """
+    with stage("create_tables"), Database(connection) as cursor:
+        create_tables(cursor)
     print("✅ Tables créées avec succès.")
 
+    with Database(connection) as cursor:
+        if bulk:
+            return bulk_load(cursor, df)
+        load_rows(cursor, df)
+
+
+def load_chunks(chunks, bulk=False, connection=None):
+    """Comme load(), en consommant les morceaux au fur et à mesure."""
+    with stage("create_tables"), Database(connection) as cursor:
+        create_tables(cursor)
+    print("✅ Tables créées avec succès.")
+
+    with Database(connection) as cursor:
+        if bulk:
+            return bulk_load_chunks(cursor, chunks)
+        for chunk in chunks:
+            load_rows(cursor, chunk)
+
+
+def run_incremental(path=None, chunksize=None, force=False,
+                    use_cache=True, connection=None):
+    """Chargement incrémental : seuls les pays modifiés sont écrits, et rien
+    ne l'est si le fichier source n'a pas changé depuis le dernier run."""
+    path = _raw_path(path)
+    source_file_hash = file_hash(path)
+
+    with stage("create_tables"), Database(connection) as cursor:
+        create_tables(cursor)
+        if not force and source_unchanged(cursor, path, source_file_hash):
+            print("⏭️ Fichier source inchangé, chargement ignoré.",
+                  flush=True)
+            return None
+
+    if chunksize:
+        chunks = transform_chunks(path, chunksize)
+    elif use_cache:
+        chunks = [transform_cached(path, source_file_hash)]
+    else:
+        chunks = [transform(extract(path))]
+
+    with Database(connection) as cursor:
+        return incremental_load(cursor, chunks, path, source_file_hash)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="ETL des données COVID")
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Fichier CSV brut (par défaut DATA_RAW_PATH ou "
+             f"{DEFAULT_RAW_PATH}), ou dossier / motif glob pour traiter "
+             "plusieurs fichiers en parallèle")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Nombre de processus pour un lot de fichiers "
+             "(par défaut le nombre de CPU)")
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Charge les données via COPY et des INSERT ensemblistes")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="N'écrit que les pays modifiés depuis le dernier chargement "
+             "(ignoré si le fichier source est inchangé)")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Avec --incremental, recharge même si le fichier est inchangé")
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Lit et charge le fichier par morceaux de N lignes "
+             "(mémoire bornée)")
+    parser.add_argument(
+        "--profile-report",
+        nargs="?",
+        const=DEFAULT_PROFILE_DIR,
+        default=None,
+        metavar="DIR",
+        help="Génère les graphiques d'exploration dans DIR "
+             f"(par défaut {DEFAULT_PROFILE_DIR})")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ne lit ni n'écrit le cache du jeu nettoyé "
+             "(ETL_CACHE_DIR, par défaut data/cache)")
+    parser.add_argument(
+        "--skip-load",
+        action="store_true",
+        help="N'exécute que l'extraction et la transformation")
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="FILE",
+        help="Écrit les mesures de chaque étape (temps, CPU, mémoire, "
+             "lignes) en JSON lines dans FILE (par défaut la sortie "
+             "standard)")
+    parser.add_argument(
+        "--metrics-table",
+        action="store_true",
+        help="Enregistre aussi les mesures dans la table etl_metrics")
+    args = parser.parse_args(argv)
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers doit être au moins 1")
+    if is_batch_input(args.input) and (args.chunksize
+                                       or args.profile_report
+                                       or args.skip_load):
+        parser.error("--chunksize, --profile-report et --skip-load ne sont "
+                     "pas disponibles pour un lot de fichiers")
+    if args.incremental and args.profile_report:
+        parser.error("--profile-report n'est pas disponible avec "
+                     "--incremental")
+    if args.chunksize and args.profile_report:
+        parser.error("--profile-report a besoin de tout le jeu de données, "
+                     "il n'est pas disponible avec --chunksize")
+    return args
+
+
+def report_metrics(args):
+    """Écrit les mesures de l'exécution selon --metrics et --metrics-table."""
+    if args.metrics == "-":
+        write_json_lines(sys.stdout)
+    elif args.metrics:
+        with open(args.metrics, "a") as f:
+            write_json_lines(f)
+
+    if args.metrics_table:
+        try:
+            with Database() as cursor:
+                create_tables(cursor)
+                save_metrics(cursor)
+        except psycopg2.Error as e:
+            print(f"⚠️ Mesures non enregistrées : {e}", flush=True)
+
+
+def _check_connection():
+    with stage("connect"):
+        return contextlib.closing(checkpostgres())
+
+
+def run(args):
+    """Exécute l'ETL selon les options de la ligne de commande."""
+    if is_batch_input(args.input):
+        with _check_connection() as connection:
+            summary = run_batch(args.input, args.workers, args.incremental,
+                                use_cache=not args.no_cache,
+                                connection=connection)
+        if summary["failed"]:
+            sys.exit(1)
+        return None
+
+    if args.incremental and not args.skip_load:
+        with _check_connection() as connection:
+            run_incremental(args.input, args.chunksize, args.force,
+                            use_cache=not args.no_cache,
+                            connection=connection)
+        return None
+
+    if args.chunksize:
+        chunks = transform_chunks(args.input, args.chunksize)
+        if args.skip_load:
+            rows = sum(len(chunk) for chunk in chunks)
+            print(f"✅ {rows} lignes transformées par morceaux")
+            return None
+        with _check_connection() as connection:
+            load_chunks(chunks, bulk=args.bulk, connection=connection)
+        return None
+
+    if args.profile_report:
+        raw_df = extract(args.input)
+        df = transform(raw_df)
+        profile_report(raw_df, df, args.profile_report)
+    elif args.no_cache:
+        df = transform(extract(args.input))
+    else:
+        df = transform_cached(args.input)
+
+    if args.skip_load:
+        return df
+
+    # Vérifier la connexion
+    with _check_connection() as connection:
+        load(df, bulk=args.bulk, connection=connection)
+    return df
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_dotenv(override=True)
 
-    with Database() as cursor:
-        for index, row in df.iterrows():
-            try:
-                country = row['country']
-                continent = row['continent']
-                who_region = row['who_region']
-                population = int(row['population'])
-                total_tests = int(row['total_tests'])
-                total_cases = int(row['new_total_cases'])
-                total_deaths = int(row['total_deaths'])
-                total_recovered = int(row['total_recovered'])
-                serious_critical = int(row['serious_critical'])
-                active_cases = int(row['active_cases'])  # optionnel
-
-                cursor.execute("""
-                    INSERT INTO countries (country, continent, who_region, population)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (country) DO NOTHING
-                    RETURNING id;
-                """, (country, continent, who_region, population))
-
-                country_id_row = cursor.fetchone()
-                if country_id_row is None:
-                    cursor.execute("SELECT id FROM countries WHERE country = %s;", (country,))
-                    country_id_row = cursor.fetchone()
-                country_id = country_id_row[0]
-
-                cursor.execute("""
-                    INSERT INTO health_statistics (country_id, total_cases, total_deaths, total_recovered, serious_critical)
-                    VALUES (%s, %s, %s, %s, %s);
-                """, (country_id, total_cases, total_deaths, total_recovered, serious_critical))
-
-                cursor.execute("""
-                    INSERT INTO testing_statistics (country_id, total_tests)
-                    VALUES (%s, %s);
-                """, (country_id, total_tests))
-
-                cursor.execute("""
-                    INSERT INTO worldometer (continent, who_region, country, population, total_tests, total_cases, total_deaths, total_recovered, serious_critical)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
-                """, (continent, who_region, country, population, total_tests, total_cases, total_deaths, total_recovered, serious_critical))
-
-                print(f"Insertion réussie pour {country}")
-
-            except psycopg2.Error as e:
-                print(f"Erreur lors de l'insertion pour {country}: {e}")
-    
\ No newline at end of file
+    start_run()
+    try:
+        return run(args)
+    finally:
+        report_metrics(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+
+# Colonnes texte à faible cardinalité (pays répétés d'un jour à l'autre)
+CATEGORY_COLUMNS = ["continent", "who_region", "country"]
+
+# Colonnes chargées dans des colonnes INT (int4) du schéma PostgreSQL
+INT_COLUMNS = [
+    "population",
+    "total_deaths",
+    "total_recovered",
+    "serious_critical",
+    "total_tests",
+    "new_total_cases",
+]
+
+PG_INT = np.iinfo(np.int32)
+
+
+def check_int_overflow(df):
+    """Vérifie que les colonnes destinées à un INT PostgreSQL y tiennent."""
+    for column in INT_COLUMNS:
+        if column not in df or df[column].empty:
+            continue
+        low, high = df[column].min(), df[column].max()
+        if low < PG_INT.min or high > PG_INT.max:
+            raise ValueError(
+                f"La colonne '{column}' dépasse la capacité d'un INT "
+                f"PostgreSQL (valeurs entre {low} et {high})")
+
+
+def memory_usage(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def compact_dtypes(df, report=False):
+    """Applique les types les plus compacts au DataFrame nettoyé.
+
+    Les colonnes texte passent en catégories et les compteurs dans le plus
+    petit type entier qui contient leurs valeurs.
+    """
+    check_int_overflow(df)
+    before = memory_usage(df) if report else None
+
+    for column in df.columns:
+        if column in CATEGORY_COLUMNS:
+            df[column] = df[column].astype("category")
+        elif pd.api.types.is_integer_dtype(df[column].dtype):
+            df[column] = pd.to_numeric(df[column], downcast="integer")
+
+    if report:
+        after = memory_usage(df)
+        print(f"💾 Mémoire du DataFrame : {before / 1024:.1f} Kio -> "
+              f"{after / 1024:.1f} Kio ({after / before:.0%})", flush=True)
+    return df
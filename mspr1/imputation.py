@@ -0,0 +1,104 @@
+import numpy as np
+import pandas as pd
+
+
+# Colonnes complétées par la médiane de leur continent
+CONTINENT_MEDIAN_COLUMNS = ['Serious,Critical', 'TotalTests']
+
+# Colonnes nécessaires au calcul des médianes
+MEDIAN_INPUT_COLUMNS = ['Continent', 'ActiveCases'] + CONTINENT_MEDIAN_COLUMNS
+
+
+def compute_medians(df):
+    """Calcule les médianes utilisées pour compléter les valeurs manquantes.
+
+    Elles sont séparées de impute() pour pouvoir être calculées une seule
+    fois sur tout le jeu de données puis réutilisées sur des sous-ensembles.
+    """
+    europe_active_cases = df.loc[df['Continent'] == 'Europe', 'ActiveCases']
+    return {
+        "europe_active_cases": europe_active_cases.median(),
+        "continent": df.groupby('Continent')[CONTINENT_MEDIAN_COLUMNS]
+                       .median(),
+    }
+
+
+class MedianInputs:
+    """Valeurs nécessaires à compute_medians(), accumulées par morceaux.
+
+    Chaque morceau est réduit aux valeurs renseignées, rangées par
+    continent et par colonne dans des tableaux numpy (ActiveCases : Europe
+    seulement) ; medians() donne le résultat de compute_medians() sur la
+    concaténation des morceaux.
+    """
+
+    def __init__(self):
+        self._europe_active_cases = []
+        # (continent, colonne) -> tableaux des valeurs de chaque morceau
+        self._continent = {}
+
+    def add(self, df):
+        europe_active_cases = df.loc[df['Continent'] == 'Europe',
+                                     'ActiveCases']
+        self._europe_active_cases.append(
+            europe_active_cases.dropna().to_numpy('float64'))
+        for continent, group in df.groupby('Continent'):
+            for column in CONTINENT_MEDIAN_COLUMNS:
+                self._continent.setdefault((continent, column), []).append(
+                    group[column].dropna().to_numpy('float64'))
+
+    def medians(self):
+        continents = sorted({continent for continent, _ in self._continent})
+        continent = pd.DataFrame(
+            [[_median(self._continent[(name, column)])
+              for column in CONTINENT_MEDIAN_COLUMNS]
+             for name in continents],
+            index=pd.Index(continents, name='Continent'),
+            columns=CONTINENT_MEDIAN_COLUMNS)
+        return {
+            "europe_active_cases": _median(self._europe_active_cases),
+            "continent": continent,
+        }
+
+
+def _median(parts):
+    values = np.concatenate(parts) if parts else np.empty(0)
+    return float(np.median(values)) if len(values) else np.nan
+
+
+def impute(df, medians=None):
+    """Complète les valeurs manquantes avec des opérations vectorisées.
+
+    Reproduit le nettoyage historique (apply ligne par ligne et
+    groupby().transform(lambda ...)) avec des expressions sur les colonnes.
+    """
+    if medians is None:
+        medians = compute_medians(df)
+
+    df['WHO Region'] = df['WHO Region'].fillna("Non classé")
+    df['ActiveCases'] = df['ActiveCases'].fillna(
+        medians["europe_active_cases"])
+
+    # Les totaux manquants se déduisent des autres :
+    # TotalCases = TotalDeaths + TotalRecovered + ActiveCases
+    df['TotalDeaths'] = df['TotalDeaths'].fillna(
+        (df['TotalCases']
+         - (df['TotalRecovered'] + df['ActiveCases'])).round())
+    df['TotalRecovered'] = df['TotalRecovered'].fillna(
+        (df['TotalCases']
+         - (df['TotalDeaths'] + df['ActiveCases'])).round())
+
+    df['NewTotalCases'] = (
+        df['TotalDeaths'] + df['TotalRecovered'] + df['ActiveCases']
+    )
+    df = df.drop(columns=['TotalCases'])
+
+    continent_medians = medians["continent"]
+    for column in CONTINENT_MEDIAN_COLUMNS:
+        df[column] = df[column].fillna(
+            df['Continent'].map(continent_medians[column]))
+
+    float_columns = df.select_dtypes('float64').columns
+    df[float_columns] = df[float_columns].fillna(0).astype(int)
+
+    return df
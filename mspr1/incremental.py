@@ -0,0 +1,110 @@
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+from mspr1.bulk_loader import (
+    STAGING_COLUMNS, merge_staging, report, stage_chunks)
+from mspr1.instrumentation import stage
+
+
+TEXT_COLUMNS = ["continent", "who_region", "country"]
+
+
+def file_hash(path, block_size=1024 * 1024):
+    """Empreinte SHA-256 du fichier source, lu par blocs."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def source_key(path):
+    return os.path.normpath(path)
+
+
+def row_hashes(df):
+    """Empreinte 64 bits de chaque ligne nettoyée.
+
+    Les colonnes sont ramenées à des types fixes avant le calcul pour que
+    l'empreinte ne dépende pas du type choisi lors du nettoyage.
+    """
+    canonical = df[STAGING_COLUMNS].astype({
+        column: (str if column in TEXT_COLUMNS else "int64")
+        for column in STAGING_COLUMNS
+    })
+    hashes = pd.util.hash_pandas_object(canonical, index=False)
+    # BIGINT côté PostgreSQL : on réinterprète l'uint64 en int64
+    return hashes.to_numpy().view("int64")
+
+
+def source_unchanged(cursor, path, source_file_hash):
+    """Vrai si le fichier a déjà été chargé avec ce contenu."""
+    cursor.execute("""
+        SELECT 1 FROM etl_runs WHERE source = %s AND file_hash = %s;
+    """, (source_key(path), source_file_hash))
+    return cursor.fetchone() is not None
+
+
+def _drop_unchanged_rows(cursor):
+    """Ne garde dans la table temporaire que les pays à écrire."""
+    # Un pays présent plusieurs fois : seule la première ligne est chargée
+    cursor.execute("""
+        DELETE FROM staging_worldometer s
+        USING staging_worldometer earlier
+        WHERE earlier.country = s.country
+          AND earlier.row_number < s.row_number;
+    """)
+    # Un pays supprimé depuis (via l'API) est rechargé même s'il n'a pas
+    # changé dans le fichier
+    cursor.execute("""
+        DELETE FROM staging_worldometer s
+        USING etl_row_hashes h, countries c
+        WHERE h.country = s.country
+          AND h.row_hash = s.row_hash
+          AND c.country = s.country;
+    """)
+    cursor.execute("SELECT count(*) FROM staging_worldometer;")
+    return cursor.fetchone()[0]
+
+
+def _save_state(cursor, path, source_file_hash):
+    cursor.execute("""
+        INSERT INTO etl_row_hashes (country, row_hash)
+        SELECT country, row_hash FROM staging_worldometer
+        ON CONFLICT (country) DO UPDATE
+        SET row_hash = EXCLUDED.row_hash,
+            updated_at = CURRENT_TIMESTAMP;
+    """)
+    cursor.execute("""
+        INSERT INTO etl_runs (source, file_hash)
+        VALUES (%s, %s)
+        ON CONFLICT (source) DO UPDATE
+        SET file_hash = EXCLUDED.file_hash,
+            loaded_at = CURRENT_TIMESTAMP;
+    """, (source_key(path), source_file_hash))
+
+
+def incremental_load(cursor, chunks, path, source_file_hash):
+    """Charge uniquement les pays dont la ligne nettoyée a changé.
+
+    chunks est une liste (ou un générateur) de DataFrames nettoyés. Les
+    empreintes des lignes et du fichier sont enregistrées dans la même
+    transaction que les données.
+    """
+    start = time.perf_counter()
+
+    rows = stage_chunks(
+        cursor,
+        (chunk.assign(row_hash=row_hashes(chunk)) for chunk in chunks))
+    with stage("load.diff") as measure:
+        measure["rows"] = changed = _drop_unchanged_rows(cursor)
+    stats = merge_staging(cursor)
+    with stage("load.state", rows=changed):
+        _save_state(cursor, path, source_file_hash)
+
+    print(f"🔁 Chargement incrémental : {changed} pays modifiés "
+          f"sur {rows} lignes", flush=True)
+    return {**report(stats, rows, start), "changed": changed}
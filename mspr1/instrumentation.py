@@ -0,0 +1,127 @@
+import contextlib
+import datetime
+import json
+import sys
+import time
+import uuid
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+# Mesures de l'exécution en cours, par étape, dans l'ordre de première
+# apparition. Une étape exécutée plusieurs fois (un appel par morceau) est
+# cumulée.
+_run = {"id": None, "started_at": None, "stages": {}}
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente du processus depuis son lancement, en Mio."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en Kio sous Linux, en octets sous macOS
+    if sys.platform == "darwin":
+        peak /= 1024
+    return round(peak / 1024, 1)
+
+
+def start_run():
+    """Démarre une nouvelle exécution et oublie les mesures précédentes."""
+    _run["id"] = uuid.uuid4().hex
+    _run["started_at"] = datetime.datetime.now(datetime.timezone.utc)
+    _run["stages"] = {}
+    return _run["id"]
+
+
+def _record(name, wall, cpu, rows):
+    record = _run["stages"].setdefault(name, {
+        "stage": name,
+        "calls": 0,
+        "rows": None,
+        "wall_seconds": 0.0,
+        "cpu_seconds": 0.0,
+        "peak_rss_mb": None,
+    })
+    record["calls"] += 1
+    record["wall_seconds"] += wall
+    record["cpu_seconds"] += cpu
+    if rows is not None:
+        record["rows"] = (record["rows"] or 0) + int(rows)
+    record["peak_rss_mb"] = peak_rss_mb()
+
+
+@contextlib.contextmanager
+def stage(name, rows=None):
+    """Mesure le bloc : temps réel, temps CPU, pic de mémoire et lignes.
+
+    Le dictionnaire renvoyé permet de renseigner le nombre de lignes quand
+    il n'est connu qu'à la fin du bloc :
+
+        with stage("extract") as measure:
+            df = extract()
+            measure["rows"] = len(df)
+    """
+    measure = {"rows": rows}
+    wall, cpu = time.perf_counter(), time.process_time()
+    try:
+        yield measure
+    finally:
+        _record(name,
+                time.perf_counter() - wall,
+                time.process_time() - cpu,
+                measure["rows"])
+
+
+def timed(name, iterable):
+    """Mesure le temps passé à produire chaque élément de iterable.
+
+    Seule la production des éléments est comptée, pas le traitement qu'en
+    fait l'appelant. Le nombre de lignes est la somme des len() produits.
+    """
+    iterator = iter(iterable)
+    while True:
+        with stage(name) as measure:
+            item = next(iterator, None)
+            if item is not None:
+                measure["rows"] = len(item)
+        if item is None:
+            return
+        yield item
+
+
+def records():
+    """Mesures de l'exécution en cours, une par étape."""
+    return [
+        {"run_id": _run["id"],
+         **record,
+         "wall_seconds": round(record["wall_seconds"], 4),
+         "cpu_seconds": round(record["cpu_seconds"], 4)}
+        for record in _run["stages"].values()
+    ]
+
+
+def write_json_lines(stream):
+    """Écrit une ligne JSON par étape mesurée."""
+    for record in records():
+        stream.write(json.dumps(record) + "\n")
+    stream.flush()
+
+
+def save_metrics(cursor):
+    """Enregistre les mesures dans etl_metrics (lue par Grafana)."""
+    rows = [
+        (record["run_id"], _run["started_at"], position, record["stage"],
+         record["calls"], record["rows"], record["wall_seconds"],
+         record["cpu_seconds"], record["peak_rss_mb"])
+        for position, record in enumerate(records())
+    ]
+    cursor.executemany("""
+        INSERT INTO etl_metrics (run_id, started_at, position, stage, calls,
+                                 rows, wall_seconds, cpu_seconds,
+                                 peak_rss_mb)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s);
+    """, rows)
+    return len(rows)
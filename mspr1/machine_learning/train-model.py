@@ -1,4 +1,3 @@
-import pandas as pd
 import os
 import joblib
 from sklearn.linear_model import LinearRegression
@@ -6,9 +5,18 @@ from sklearn.ensemble import RandomForestRegressor
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+import sys
+import pathlib
 
-# Charger les données nettoyées
-df = pd.read_csv("data/data-migration/worldometer_data_clean.csv")
+# Lancé comme script depuis la racine du projet : on rend le package mspr1
+# importable pour réutiliser le nettoyage de l'ETL
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+from mspr1.covid_mspr1 import transform_cached  # noqa: E402
+
+# Charger les données nettoyées depuis le cache colonne par colonne de l'ETL
+# (il est construit à partir du fichier brut s'il n'existe pas encore)
+df = transform_cached()
 
 
 # On s'en servira pour voir les features d'importance
@@ -1,6 +1,5 @@
 import os
 import joblib
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import missingno as msno
@@ -20,9 +19,17 @@ from sklearn.base import clone
 from scipy.stats import uniform, randint
 import xgboost as xgb
 from xgboost import XGBRegressor
+import sys
+import pathlib
 
-# === Lecture des données ===
-df = pd.read_csv('data/data-migration/worldometer_data_clean.csv')
+# Lancé comme script depuis la racine du projet : on rend le package mspr1
+# importable pour réutiliser le nettoyage de l'ETL
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[2]))
+
+from mspr1.covid_mspr1 import transform_cached  # noqa: E402
+
+# === Lecture des données (cache colonne par colonne de l'ETL) ===
+df = transform_cached()
 
 # === Exploration rapide ===
 msno.matrix(df)
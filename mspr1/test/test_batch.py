@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+from mspr1.Database import Database
+from mspr1.batch import expand_inputs, is_batch_input, run_batch
+from mspr1.covid_mspr1 import create_tables, parse_args
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+# Valeur refusée par une contrainte ajoutée au schéma de test
+REJECTED_DEATHS = 123456789
+
+
+@pytest.fixture
+def connection():
+    """Connexion sur un schéma jetable : run_batch() commite chaque
+    fichier, le schéma est supprimé à la fin du test."""
+    db = Database()
+    with db.connection.cursor() as cursor:
+        cursor.execute("CREATE SCHEMA batch_test; "
+                       "SET search_path TO batch_test")
+    db.connection.commit()
+    yield db.connection
+    db.connection.rollback()
+    with db.connection.cursor() as cursor:
+        cursor.execute("DROP SCHEMA batch_test CASCADE")
+    db.connection.commit()
+    db.close()
+
+
+class TestBatchInputs:
+    @pytest.mark.etl
+    def test_directory_and_glob_are_batch_inputs(self, tmp_path):
+        assert is_batch_input(str(tmp_path))
+        assert is_batch_input("data/*.csv")
+        assert not is_batch_input("data/worldometer_data_raw.csv")
+        assert not is_batch_input(None)
+
+    @pytest.mark.etl
+    def test_expand_inputs_lists_csv_files_in_order(self, tmp_path):
+        for name in ["2020-08-02.csv", "2020-08-01.csv", "notes.txt"]:
+            (tmp_path / name).write_text("")
+        (tmp_path / "archive.csv").mkdir()
+
+        expected = [str(tmp_path / "2020-08-01.csv"),
+                    str(tmp_path / "2020-08-02.csv")]
+
+        assert expand_inputs(str(tmp_path)) == expected
+        assert expand_inputs(str(tmp_path / "2020-*.csv")) == expected
+
+
+class TestRunBatch:
+    @pytest.mark.etl
+    def test_failed_files_are_rolled_back_without_stopping_the_batch(
+            self, connection, tmp_path, monkeypatch):
+        monkeypatch.setenv("ETL_CACHE_DIR", str(tmp_path / "cache"))
+        raw = pd.read_csv(RAW_CSV)
+        good = raw.head(20)
+        good.to_csv(tmp_path / "2-good.csv", index=False)
+        (tmp_path / "3-malformed.csv").write_text("pays;cas\nFrance;12\n")
+        # Pays écrits, puis statistiques refusées par la base : les pays
+        # doivent disparaître avec le rollback
+        raw.iloc[20:25].assign(
+            **{"Country/Region": [f"Badland {i}" for i in range(5)],
+               "TotalDeaths": REJECTED_DEATHS}
+        ).to_csv(tmp_path / "1-rejected.csv", index=False)
+        with connection.cursor() as cursor:
+            create_tables(cursor)
+            cursor.execute(f"""
+                ALTER TABLE health_statistics ADD CONSTRAINT test_rejected
+                CHECK (total_deaths <> {REJECTED_DEATHS})
+            """)
+        connection.commit()
+
+        result = run_batch(str(tmp_path), workers=2, connection=connection)
+
+        assert result["loaded"] == [str(tmp_path / "2-good.csv")]
+        assert sorted(result["failed"]) == [str(tmp_path / "1-rejected.csv"),
+                                            str(tmp_path / "3-malformed.csv")]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT country FROM countries ORDER BY country")
+            countries = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT count(*) FROM worldometer")
+            assert cursor.fetchone()[0] == len(countries)
+        assert countries == sorted(good["Country/Region"])
+
+
+class TestBatchArguments:
+    @pytest.mark.etl
+    @pytest.mark.parametrize("workers", ["0", "-2"])
+    def test_workers_below_one_are_rejected(self, workers):
+        with pytest.raises(SystemExit):
+            parse_args(["--workers", workers])
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from mspr1.Database import Database
+from mspr1.bulk_loader import bulk_load
+from mspr1.covid_mspr1 import create_tables, extract, load_rows, transform
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+
+# Contenu des tables sans les identifiants, qui dépendent de l'ordre
+# d'insertion
+TABLES_QUERY = """
+    SELECT c.country, c.continent, c.who_region, c.population,
+           h.total_cases, h.total_deaths, h.total_recovered,
+           h.serious_critical, t.total_tests,
+           w.continent, w.who_region, w.population, w.total_tests,
+           w.total_cases, w.total_deaths, w.total_recovered,
+           w.serious_critical
+    FROM countries c
+    JOIN health_statistics h ON h.country_id = c.id
+    JOIN testing_statistics t ON t.country_id = c.id
+    JOIN worldometer w ON w.country = c.country
+    ORDER BY c.country
+"""
+
+
+@pytest.fixture
+def cursor():
+    """Curseur dans une transaction jamais commitée."""
+    db = Database()
+    cursor = db.get_cursor()
+    yield cursor
+    db.connection.rollback()
+    cursor.close()
+    db.close()
+
+
+def load_into(cursor, schema, load, df):
+    """Charge df avec load dans un schéma jetable et renvoie les tables."""
+    cursor.execute(f"CREATE SCHEMA {schema}; "
+                   f"SET LOCAL search_path TO {schema}")
+    create_tables(cursor)
+    load(cursor, df)
+    cursor.execute(TABLES_QUERY)
+    rows = [tuple(row) for row in cursor.fetchall()]
+    cursor.execute("SELECT count(*) FROM worldometer")
+    assert cursor.fetchone()[0] == len(rows)
+    return rows
+
+
+class TestBulkLoad:
+    @pytest.mark.etl
+    def test_bulk_load_matches_row_by_row_load(self, cursor):
+        df = transform(extract(RAW_CSV))
+        # Pays en double : la première occurrence l'emporte dans les deux
+        # modes
+        duplicate = df[df["country"] == "France"].assign(population=1)
+        assert len(duplicate) == 1
+        df = pd.concat([df, duplicate], ignore_index=True)
+
+        rows = load_into(cursor, "load_rows_test", load_rows, df)
+        bulk = load_into(cursor, "bulk_load_test", bulk_load, df)
+
+        assert bulk == rows
+        assert len(rows) == df["country"].nunique()
+        assert ("France", 1) not in {(row[0], row[3]) for row in rows}
@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mspr1.columnar_cache import read_cache, write_cache
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({
+        "continent": ["Europe", "Asia", None],
+        "country": ["France", "Japan", "Nowhere"],
+        "population": np.array([67, 126, 1], dtype="int64"),
+        "total_tests": np.array([10, 20, 30], dtype="int32"),
+    })
+
+
+class TestColumnarCache:
+    @pytest.mark.etl
+    def test_round_trip_keeps_values_and_numeric_types(self, df, tmp_path):
+        write_cache(df, "abc", tmp_path)
+
+        cached = read_cache("abc", tmp_path)
+
+        pd.testing.assert_frame_equal(
+            cached, df.astype({"continent": "category",
+                               "country": "category"}))
+
+    @pytest.mark.etl
+    def test_numeric_columns_are_memory_mapped(self, df, tmp_path):
+        write_cache(df, "abc", tmp_path)
+
+        values = read_cache("abc", tmp_path)["population"].to_numpy()
+
+        bases = [values]
+        while isinstance(bases[-1].base, np.ndarray):
+            bases.append(bases[-1].base)
+        assert any(isinstance(base, np.memmap) for base in bases)
+        assert not bases[0].flags.writeable
+
+    @pytest.mark.etl
+    def test_missing_or_outdated_cache_is_ignored(self, df, tmp_path):
+        assert read_cache("abc", tmp_path) is None
+
+        target = write_cache(df, "abc", tmp_path)
+        meta = json.loads((target / "meta.json").read_text())
+        meta["version"] = -1
+        (target / "meta.json").write_text(json.dumps(meta))
+
+        assert read_cache("abc", tmp_path) is None
+
+    @pytest.mark.etl
+    def test_outdated_cache_is_rewritten(self, df, tmp_path):
+        target = write_cache(df, "abc", tmp_path)
+        meta = json.loads((target / "meta.json").read_text())
+        meta["version"] = -1
+        (target / "meta.json").write_text(json.dumps(meta))
+
+        write_cache(df, "abc", tmp_path)
+
+        assert read_cache("abc", tmp_path) is not None
@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from mspr1.covid_mspr1 import extract, transform
+from mspr1.dtype_policy import compact_dtypes
+
+
+class TestDtypePolicy:
+    @pytest.mark.etl
+    def test_text_columns_become_categories_and_counts_shrink(self):
+        df = pd.DataFrame({
+            "continent": ["Europe", "Europe", "Asia"],
+            "who_region": ["Europe", "Europe", "EMRO"],
+            "country": ["France", "France", "Japan"],
+            "population": [67_000_000, 67_000_000, 126_000_000],
+            "serious_critical": [1, 200, 3],
+            "active_cases": [0, 1, 2],
+        })
+
+        result = compact_dtypes(df)
+
+        assert isinstance(result["continent"].dtype, pd.CategoricalDtype)
+        assert isinstance(result["country"].dtype, pd.CategoricalDtype)
+        assert result["population"].dtype == "int32"
+        assert result["serious_critical"].dtype == "int16"
+        assert result["active_cases"].dtype == "int8"
+
+    @pytest.mark.etl
+    def test_values_too_large_for_postgres_int_are_rejected(self):
+        df = pd.DataFrame({"country": ["Bigland"],
+                           "total_tests": [2**31]})
+
+        with pytest.raises(ValueError, match="total_tests"):
+            compact_dtypes(df)
+
+    @pytest.mark.etl
+    def test_cleaned_dataset_uses_less_memory(self, capsys):
+        raw = extract("data/worldometer_data_raw.csv")
+
+        df = transform(raw)
+
+        assert "Mémoire du DataFrame" in capsys.readouterr().out
+        wide = df.astype({column: "int64"
+                          for column in df.select_dtypes("integer")})
+        wide = wide.astype({column: str
+                            for column in df.select_dtypes("category")})
+        assert df.memory_usage(deep=True).sum() \
+            < wide.memory_usage(deep=True).sum() / 2
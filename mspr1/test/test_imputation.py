@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mspr1.covid_mspr1 import extract, transform
+from mspr1.imputation import compute_medians, impute
+
+CLEAN_CSV = "data/data-migration/worldometer_data_clean.csv"
+
+
+class TestImputation:
+    @pytest.mark.etl
+    def test_transform_matches_clean_dataset(self):
+        """Le nettoyage du fichier brut redonne le jeu nettoyé de référence."""
+        df = transform(extract("data/worldometer_data_raw.csv"))
+        expected = pd.read_csv(CLEAN_CSV)
+
+        pd.testing.assert_frame_equal(
+            df.reset_index(drop=True), expected.astype(df.dtypes.to_dict()))
+
+    @pytest.mark.etl
+    def test_impute_fills_totals_and_continent_medians(self):
+        df = pd.DataFrame({
+            'Continent': ['Europe', 'Europe', 'Asia', 'Asia'],
+            'WHO Region': ['Europe', None, 'EMRO', 'EMRO'],
+            'Population': [100.0, 200.0, 300.0, np.nan],
+            'TotalCases': [100.0, 60.0, 30.0, 40.0],
+            'TotalDeaths': [np.nan, 10.0, 5.0, 4.0],
+            'TotalRecovered': [70.0, np.nan, 20.0, 30.0],
+            'ActiveCases': [20.0, 10.0, np.nan, 6.0],
+            'Serious,Critical': [1.0, 3.0, np.nan, 8.0],
+            'TotalTests': [np.nan, 50.0, 70.0, 90.0],
+        })
+
+        result = impute(df)
+
+        assert result['WHO Region'].tolist() == [
+            'Europe', 'Non classé', 'EMRO', 'EMRO']
+        # Médiane des cas actifs en Europe : (20 + 10) / 2
+        assert result['ActiveCases'].tolist() == [20, 10, 15, 6]
+        assert result['TotalDeaths'].tolist() == [10, 10, 5, 4]
+        assert result['TotalRecovered'].tolist() == [70, 40, 20, 30]
+        assert result['NewTotalCases'].tolist() == [100, 60, 40, 40]
+        assert result['Serious,Critical'].tolist() == [1, 3, 8, 8]
+        assert result['TotalTests'].tolist() == [50, 50, 70, 90]
+        assert result['Population'].tolist() == [100, 200, 300, 0]
+        assert 'TotalCases' not in result.columns
+
+    @pytest.mark.etl
+    def test_impute_uses_given_medians(self):
+        """Des médianes calculées ailleurs sont utilisées telles quelles."""
+        reference = pd.DataFrame({
+            'Continent': ['Europe', 'Asia'],
+            'ActiveCases': [100.0, 1.0],
+            'Serious,Critical': [7.0, 9.0],
+            'TotalTests': [11.0, 13.0],
+        })
+        df = pd.DataFrame({
+            'Continent': ['Europe', 'Asia'],
+            'WHO Region': ['Europe', 'EMRO'],
+            'Population': [1.0, 2.0],
+            'TotalCases': [200.0, 10.0],
+            'TotalDeaths': [10.0, 1.0],
+            'TotalRecovered': [90.0, 8.0],
+            'ActiveCases': [np.nan, 1.0],
+            'Serious,Critical': [np.nan, np.nan],
+            'TotalTests': [np.nan, np.nan],
+        })
+
+        result = impute(df, compute_medians(reference))
+
+        assert result['ActiveCases'].tolist() == [100, 1]
+        assert result['Serious,Critical'].tolist() == [7, 9]
+        assert result['TotalTests'].tolist() == [11, 13]
@@ -0,0 +1,67 @@
+import pytest
+
+from mspr1.Database import Database
+from mspr1.covid_mspr1 import create_tables, extract, transform
+from mspr1.incremental import incremental_load, source_unchanged
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+
+
+@pytest.fixture
+def cursor():
+    """Curseur dans un schéma jetable : rien n'est jamais commité."""
+    db = Database()
+    cursor = db.get_cursor()
+    cursor.execute("CREATE SCHEMA etl_test; SET LOCAL search_path TO etl_test")
+    create_tables(cursor)
+    yield cursor
+    db.connection.rollback()
+    cursor.close()
+    db.close()
+
+
+def count(cursor, table):
+    cursor.execute(f"SELECT count(*) FROM {table}")
+    return cursor.fetchone()[0]
+
+
+class TestIncrementalLoad:
+    @pytest.mark.etl
+    def test_second_run_writes_nothing(self, cursor):
+        df = transform(extract(RAW_CSV))
+
+        first = incremental_load(cursor, [df], RAW_CSV, "hash-1")
+        second = incremental_load(cursor, [df], RAW_CSV, "hash-2")
+
+        assert first["changed"] == len(df)
+        assert second["changed"] == 0
+        assert count(cursor, "countries") == len(df)
+        assert count(cursor, "worldometer") == len(df)
+
+    @pytest.mark.etl
+    def test_only_changed_countries_are_written(self, cursor):
+        df = transform(extract(RAW_CSV))
+        incremental_load(cursor, [df], RAW_CSV, "hash-1")
+
+        changed = df.copy()
+        changed.loc[changed["country"] == "France", "total_tests"] = 42
+        result = incremental_load(cursor, [changed], RAW_CSV, "hash-2")
+
+        assert result["changed"] == 1
+        cursor.execute("""
+            SELECT t.total_tests FROM testing_statistics t
+            JOIN countries c ON c.id = t.country_id
+            WHERE c.country = 'France'
+        """)
+        assert cursor.fetchone()[0] == 42
+        assert count(cursor, "worldometer") == len(df)
+
+    @pytest.mark.etl
+    def test_source_hash_is_recorded(self, cursor):
+        df = transform(extract(RAW_CSV))
+        assert not source_unchanged(cursor, RAW_CSV, "hash-1")
+
+        incremental_load(cursor, [df], RAW_CSV, "hash-1")
+
+        assert source_unchanged(cursor, RAW_CSV, "hash-1")
+        assert not source_unchanged(cursor, RAW_CSV, "hash-2")
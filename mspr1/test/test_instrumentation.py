@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from mspr1.Database import Database
+from mspr1.bulk_loader import bulk_load
+from mspr1.covid_mspr1 import create_tables, extract, main, transform
+from mspr1.instrumentation import (
+    records, save_metrics, stage, start_run, timed)
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+
+
+@pytest.fixture
+def cursor():
+    """Curseur dans un schéma jetable : rien n'est jamais commité."""
+    db = Database()
+    cursor = db.get_cursor()
+    cursor.execute("CREATE SCHEMA etl_test; SET LOCAL search_path TO etl_test")
+    create_tables(cursor)
+    yield cursor
+    db.connection.rollback()
+    cursor.close()
+    db.close()
+
+
+class TestInstrumentation:
+    @pytest.mark.etl
+    def test_repeated_stage_is_accumulated(self):
+        start_run()
+
+        for rows in (3, 4):
+            with stage("clean", rows=rows):
+                pass
+        list(timed("extract", [[1, 2], [3]]))
+
+        by_stage = {record["stage"]: record for record in records()}
+        assert by_stage["clean"]["calls"] == 2
+        assert by_stage["clean"]["rows"] == 7
+        assert by_stage["extract"]["rows"] == 3
+        assert by_stage["extract"]["wall_seconds"] >= 0
+        assert by_stage["extract"]["peak_rss_mb"] > 0
+
+    @pytest.mark.etl
+    def test_cli_writes_one_json_line_per_stage(self, tmp_path):
+        output = tmp_path / "metrics.jsonl"
+
+        main(["--input", RAW_CSV, "--skip-load", "--no-cache",
+              "--metrics", str(output)])
+
+        lines = [json.loads(line) for line in output.read_text().splitlines()]
+        assert [line["stage"] for line in lines] == [
+            "extract", "clean", "impute", "dedupe", "compact_dtypes"]
+        assert len({line["run_id"] for line in lines}) == 1
+        assert lines[0]["rows"] == 209
+
+    @pytest.mark.etl
+    def test_load_is_measured_per_table(self, cursor):
+        start_run()
+
+        bulk_load(cursor, transform(extract(RAW_CSV)))
+        saved = save_metrics(cursor)
+
+        cursor.execute("SELECT stage, rows FROM etl_metrics ORDER BY position")
+        stages = dict(cursor.fetchall())
+        assert saved == len(stages)
+        assert stages["load.copy"] == 208
+        for table in ("countries", "health_statistics",
+                      "testing_statistics"):
+            assert stages[f"load.{table}"] == 208
+        assert "load.worldometer" not in stages
@@ -0,0 +1,89 @@
+import psycopg2
+import pytest
+
+from database import readiness
+from database.readiness import wait_for_postgres
+from mspr1.covid_mspr1 import checkpostgres
+
+
+class FlakyDatabase:
+    """Fabrique de connexion qui échoue failures fois avant de répondre."""
+    calls = 0
+    failures = 0
+
+    def __init__(self):
+        type(self).calls += 1
+        if type(self).calls <= self.failures:
+            raise psycopg2.OperationalError("connection refused")
+        self.connection = FakeConnection()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def cursor(self):
+        return FakeCursor()
+
+    def commit(self):
+        pass
+
+
+class FakeCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, query):
+        assert query == "SELECT 1;"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Horloge simulée : time.sleep() avance le temps sans attendre."""
+    delays = []
+    clock = [0.0]
+
+    def sleep(delay):
+        delays.append(delay)
+        clock[0] += delay
+
+    monkeypatch.setattr(readiness.time, "sleep", sleep)
+    monkeypatch.setattr(readiness.time, "monotonic", lambda: clock[0])
+    FlakyDatabase.calls = 0
+    return delays
+
+
+class TestReadiness:
+    @pytest.mark.etl
+    def test_backoff_doubles_from_tens_of_milliseconds(self, sleeps):
+        FlakyDatabase.failures = 4
+
+        db = wait_for_postgres(FlakyDatabase, timeout=60)
+
+        assert not db.closed
+        assert FlakyDatabase.calls == 5
+        assert sleeps == [0.05, 0.1, 0.2, 0.4]
+
+    @pytest.mark.etl
+    def test_gives_up_after_deadline(self, sleeps):
+        FlakyDatabase.failures = 1000
+
+        with pytest.raises(psycopg2.OperationalError, match="0.5s"):
+            wait_for_postgres(FlakyDatabase, timeout=0.5)
+
+        # Le dernier délai est raccourci pour ne pas dépasser l'échéance
+        assert sleeps == [0.05, 0.1, 0.2, pytest.approx(0.15)]
+
+    @pytest.mark.etl
+    def test_etl_gets_an_open_connection(self):
+        connection = checkpostgres(timeout=5)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                assert cursor.fetchone()[0] == 1
+        finally:
+            connection.close()
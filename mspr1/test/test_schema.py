@@ -0,0 +1,171 @@
+import pandas as pd
+import pytest
+
+from mspr1.Database import Database
+from mspr1.bulk_loader import bulk_load
+from mspr1.covid_mspr1 import (
+    CASCADE_FOREIGN_KEYS, REGION_GROUPING, REGION_TOTAL_COLUMNS,
+    create_read_model, create_region_totals, create_tables, extract,
+    migrate_cascade_deletes, transform)
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+
+
+@pytest.fixture
+def cursor():
+    """Curseur dans un schéma jetable : rien n'est jamais commité."""
+    db = Database()
+    cursor = db.get_cursor()
+    cursor.execute("CREATE SCHEMA schema_test; "
+                   "SET LOCAL search_path TO schema_test")
+    create_tables(cursor)
+    yield cursor
+    db.connection.rollback()
+    cursor.close()
+    db.close()
+
+
+def delete_rules(cursor):
+    cursor.execute("""
+        SELECT conname, confdeltype FROM pg_constraint
+        WHERE conname = ANY(%s)
+          AND connamespace = 'schema_test'::regnamespace
+    """, (list(CASCADE_FOREIGN_KEYS.values()),))
+    return dict(cursor.fetchall())
+
+
+def add_country(cursor, country="Testland"):
+    cursor.execute("""
+        INSERT INTO countries (country, continent, who_region, population)
+        VALUES (%s, 'Testinent', 'TestRegion', 1) RETURNING id
+    """, (country,))
+    return cursor.fetchone()[0]
+
+
+def read_model(cursor):
+    cursor.execute("""
+        SELECT country, population, total_cases, total_tests
+        FROM worldometer ORDER BY country
+    """)
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+class TestCascadeDeletes:
+    @pytest.mark.etl
+    def test_existing_foreign_keys_are_migrated(self, cursor):
+        for table, constraint in CASCADE_FOREIGN_KEYS.items():
+            cursor.execute(f"""
+                ALTER TABLE {table} DROP CONSTRAINT {constraint},
+                ADD CONSTRAINT {constraint} FOREIGN KEY (country_id)
+                    REFERENCES countries(id)""")
+        assert set(delete_rules(cursor).values()) == {"a"}
+
+        migrate_cascade_deletes(cursor)
+        migrate_cascade_deletes(cursor)
+
+        assert set(delete_rules(cursor).values()) == {"c"}
+
+    @pytest.mark.etl
+    def test_statistics_are_deleted_with_their_country(self, cursor):
+        country_id = add_country(cursor)
+        cursor.execute("INSERT INTO health_statistics VALUES "
+                       "(DEFAULT, %s, 1, 1, 1, 1)", (country_id,))
+        cursor.execute("INSERT INTO testing_statistics VALUES "
+                       "(DEFAULT, %s, 1)", (country_id,))
+
+        cursor.execute("DELETE FROM countries WHERE id = %s", (country_id,))
+
+        for table in CASCADE_FOREIGN_KEYS:
+            cursor.execute(f"SELECT count(*) FROM {table}")
+            assert cursor.fetchone()[0] == 0
+
+
+class TestReadModel:
+    @pytest.mark.etl
+    def test_worldometer_follows_every_write(self, cursor):
+        country_id = add_country(cursor)
+        assert read_model(cursor) == [("Testland", 1, None, None)]
+
+        cursor.execute("INSERT INTO health_statistics VALUES "
+                       "(DEFAULT, %s, 10, 1, 1, 1)", (country_id,))
+        cursor.execute("INSERT INTO testing_statistics VALUES "
+                       "(DEFAULT, %s, 20)", (country_id,))
+        cursor.execute("UPDATE countries SET population = 2, "
+                       "country = 'Testland 2' WHERE id = %s", (country_id,))
+        cursor.execute("UPDATE health_statistics SET total_cases = 11")
+        assert read_model(cursor) == [("Testland 2", 2, 11, 20)]
+
+        cursor.execute("DELETE FROM testing_statistics")
+        assert read_model(cursor) == [("Testland 2", 2, 11, None)]
+
+        cursor.execute("DELETE FROM countries")
+        assert read_model(cursor) == []
+
+    @pytest.mark.etl
+    def test_drifted_worldometer_is_rebuilt(self, cursor):
+        add_country(cursor)
+        cursor.execute("DROP INDEX worldometer_country_key")
+        cursor.execute("""
+            INSERT INTO worldometer (continent, who_region, country,
+                                     population)
+            VALUES ('Old', 'Old', 'Testland', 99), ('Old', 'Old', 'Gone', 1)
+        """)
+
+        create_read_model(cursor)
+        create_read_model(cursor)
+
+        assert read_model(cursor) == [("Testland", 1, None, None)]
+
+
+def region_totals(cursor):
+    cursor.execute("SELECT * FROM region_totals ORDER BY 1, 2")
+    return [tuple(row) for row in cursor.fetchall()]
+
+
+class TestRegionTotals:
+    @pytest.mark.etl
+    def test_totals_follow_loads_updates_and_deletes(self, cursor):
+        bulk_load(cursor, transform(extract(RAW_CSV)))
+        cursor.execute("UPDATE health_statistics SET total_cases = 1 "
+                       "WHERE country_id IN (SELECT id FROM countries "
+                       "WHERE continent = 'Europe')")
+        cursor.execute("UPDATE countries SET who_region = 'Europe' "
+                       "WHERE country = 'France'")
+        cursor.execute("DELETE FROM countries WHERE continent = 'Africa'")
+        maintained = region_totals(cursor)
+
+        # Recalcul complet, comme à la création de la table
+        cursor.execute("DROP TABLE region_totals")
+        create_region_totals(cursor)
+
+        assert maintained == region_totals(cursor)
+        assert ("all", "") in {row[:2] for row in maintained}
+        assert ("continent", "Africa") not in {row[:2] for row in maintained}
+
+    @pytest.mark.etl
+    def test_totals_match_group_by_after_large_load(self, cursor):
+        """Plusieurs milliers de lignes chargées, modifiées et supprimées en
+        quelques instructions : les totaux suivent sans recalcul par
+        ligne."""
+        clean = transform(extract(RAW_CSV))
+        df = pd.concat([
+            clean.assign(country=clean["country"].astype(str) + f" {copy}")
+            for copy in range(25)])
+        assert len(df) > 5000
+
+        bulk_load(cursor, df)
+        cursor.execute("UPDATE health_statistics "
+                       "SET total_deaths = total_deaths + 1")
+        cursor.execute("DELETE FROM countries WHERE country LIKE '% 1_'")
+
+        cursor.execute(f"""
+            SELECT {REGION_GROUPING}, count(*),
+                   {", ".join(f"COALESCE(sum({column}), 0)"
+                              for column in REGION_TOTAL_COLUMNS)}
+            FROM worldometer
+            GROUP BY GROUPING SETS ((continent), (who_region), ())
+            ORDER BY 1, 2
+        """)
+        expected = [tuple(row) for row in cursor.fetchall()]
+        assert expected[0][2] == len(clean) * 15
+        assert region_totals(cursor) == expected
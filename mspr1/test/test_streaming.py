@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mspr1.covid_mspr1 import (_drop_seen_duplicates, _no_hashes, extract,
+                               transform, transform_chunks)
+from mspr1.imputation import MedianInputs, compute_medians
+
+RAW_CSV = "data/worldometer_data_raw.csv"
+
+
+class TestStreaming:
+    @pytest.mark.etl
+    @pytest.mark.parametrize("chunksize", [1, 16, 1000])
+    def test_chunks_match_in_memory_transform(self, chunksize):
+        expected = transform(extract(RAW_CSV))
+
+        chunks = list(transform_chunks(RAW_CSV, chunksize))
+
+        assert all(len(chunk) <= chunksize for chunk in chunks)
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks).astype(expected.dtypes.to_dict()), expected)
+
+    @pytest.mark.etl
+    def test_duplicates_across_chunks_are_dropped(self, tmp_path):
+        """Les doublons répartis sur plusieurs morceaux sont supprimés
+        comme avec drop_duplicates() sur tout le fichier."""
+        raw = pd.read_csv(RAW_CSV)
+        # Ces lignes ne diffèrent que par une colonne supprimée au nettoyage
+        variant = raw.head(30).assign(NewCases=123456)
+        path = tmp_path / "raw.csv"
+        pd.concat([raw, raw.head(50), variant]).to_csv(path, index=False)
+
+        expected = transform(extract(path))
+        result = pd.concat(transform_chunks(path, 40))
+
+        pd.testing.assert_frame_equal(
+            result.astype(expected.dtypes.to_dict()), expected)
+        assert len(result) == len(transform(extract(RAW_CSV)))
+
+    @pytest.mark.etl
+    def test_seen_hashes_stay_sorted_and_unique(self):
+        df = pd.DataFrame({"a": [3, 1, 3, 2], "b": ["x", "y", "x", "z"]})
+        seen = _no_hashes()
+
+        first, seen = _drop_seen_duplicates(df.iloc[:3], seen)
+        second, seen = _drop_seen_duplicates(df.iloc[1:], seen)
+
+        assert first.index.tolist() == [0, 1]
+        assert second.index.tolist() == [3]
+        assert seen.dtype == np.uint64 and len(seen) == 3
+        assert (np.diff(seen) > 0).all()
+
+    @pytest.mark.etl
+    @pytest.mark.parametrize("chunksize", [7, 1000])
+    def test_median_inputs_match_compute_medians(self, chunksize):
+        raw = extract(RAW_CSV)
+        inputs = MedianInputs()
+        for start in range(0, len(raw), chunksize):
+            inputs.add(raw.iloc[start:start + chunksize])
+
+        expected = compute_medians(raw)
+        medians = inputs.medians()
+
+        assert medians["europe_active_cases"] == \
+            expected["europe_active_cases"]
+        pd.testing.assert_frame_equal(medians["continent"],
+                                      expected["continent"])
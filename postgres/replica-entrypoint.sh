@@ -0,0 +1,25 @@
+#!/bin/sh
+# Démarrage du réplica en lecture (profil replica de docker-compose) : au
+# premier lancement, copie du primaire avec pg_basebackup -R (fichier
+# standby.signal et connexion au primaire), puis PostgreSQL en hot standby
+# qui rejoue le WAL du primaire en continu.
+set -e
+
+PGDATA=${PGDATA:-/var/lib/postgresql/data}
+
+if [ ! -s "$PGDATA/PG_VERSION" ]; then
+    echo "Attente du primaire"
+    until pg_isready -h db -U "$POSTGRES_USER" -q; do
+        sleep 1
+    done
+
+    echo "Copie du primaire (pg_basebackup)"
+    PGPASSWORD="$POSTGRES_PASSWORD" pg_basebackup -h db -U "$POSTGRES_USER" \
+        -D "$PGDATA" -R -X stream
+    chown -R postgres:postgres "$PGDATA"
+    chmod 700 "$PGDATA"
+fi
+
+# Le répertoire de données existe : l'entrypoint de l'image démarre
+# directement PostgreSQL, sans initdb
+exec docker-entrypoint.sh postgres
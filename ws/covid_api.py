@@ -1,3 +1,4 @@
+import asyncio
 import os
 import jwt
 import psycopg2
@@ -5,26 +6,46 @@ import numpy as np
 import pandas as pd
 import pathlib
 import json
+import time
+from contextlib import asynccontextmanager
 
 
-from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi import (
+    FastAPI, HTTPException, Depends, Query, Request, Response)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 
 from ws.config.translation import TRANSLATIONS
 from ws.business_layer.covid_entry_validator import CovidEntryValidator
+from .models.country_list import CountryList
 from .models.covid_entry_patch import CovidEntryPatch
 from pydantic import BaseModel
 from passlib.context import CryptContext
 from datetime import datetime, timedelta, UTC
 from dotenv import load_dotenv
-from database.Database import Database
+from database.Database import Database, close_pool, get_pool
+from database.async_pool import (
+    acquire, async_pool_stats, close_async_pool, get_async_pool)
+from database.prepared import prepared_statements
+from database.readiness import wait_for_postgres
+from database.replicas import replica_router
 from ws.models.covid_prediction_input import CovidPredictionInput
 from ws.models.covid_prediction_input_v2 import CovidPredictionInputV2
 from ws.services.model_service import get_model, get_model_v2
+from ws.services.bulk_entries import parse_entries, validate_entries
+from ws.services.compression import CompressionMiddleware
+from ws.services.export import EXPORT_FORMATS, export_chunks
+from ws.services.json_response import ORJSONResponse
+from ws.services.response_cache import (
+    dataset_etag, listen_for_changes, not_modified, response_cache)
+from ws.services.covid_repository import (
+    DEFAULT_PAGE_SIZE, INTEGRITY_ERRORS, MAX_PAGE_SIZE,
+    AsyncpgCovidRepository, Psycopg2CovidRepository, decode_cursor)
+from typing import Literal, Optional
+from starlette.concurrency import run_in_threadpool
 
 
 # Charger les variables d'environnement
@@ -34,8 +55,28 @@ SECRET_KEY = os.getenv("SECRET_KEY", "supersecretkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Initialisation de FastAPI
-app = FastAPI()
+# Pilote des routes de données : asyncpg (par défaut) ou psycopg2
+DB_DRIVER = os.getenv("DB_DRIVER", "asyncpg")
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Attendre PostgreSQL avant d'accepter des requêtes (SELECT 1 avec
+    # attente exponentielle, délai global DB_READY_TIMEOUT). La connexion
+    # est rendue au pool, qui est ainsi prêt pour la première requête.
+    wait_for_postgres(Database).close()
+    if DB_DRIVER == "asyncpg":
+        await get_async_pool()
+    # Invalidation du cache des réponses par les autres processus et l'ETL
+    listener = asyncio.create_task(listen_for_changes())
+    yield
+    listener.cancel()
+    await close_async_pool()
+    close_pool()
+
+
+# Initialisation de FastAPI : les réponses JSON sont sérialisées par orjson
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 static_dir = BASE_DIR / "../mspr1/machine_learning/static"
@@ -63,6 +104,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compression brotli ou gzip (selon Accept-Encoding) des réponses d'au
+# moins COMPRESSION_MIN_SIZE octets
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.getenv("COMPRESSION_MIN_SIZE", 1024)),
+)
+
 # Configuration du hachage des mots de passe
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -94,7 +142,7 @@ class CovidEntry(BaseModel):
     total_tests: int
 
 
-# Connexion à la BDD
+# Connexion à la BDD, empruntée au pool et rendue en fin de requête
 def get_db():
     db = Database()
     cursor = db.get_cursor()
@@ -109,6 +157,98 @@ def get_db():
         db.close()
 
 
+_psycopg2_slots = {}
+
+
+def psycopg2_slots():
+    """Limite les emprunts au pool psycopg2 depuis les routes async.
+
+    L'attente d'une connexion libre se fait dans la boucle d'évènements et
+    non dans un thread : sinon les threads bloqués en attente empêchent les
+    requêtes qui détiennent une connexion d'exécuter leurs requêtes SQL.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _psycopg2_slots:
+        _psycopg2_slots.clear()
+        _psycopg2_slots[loop] = asyncio.Semaphore(get_pool().max_size)
+    return _psycopg2_slots[loop]
+
+
+# Accès aux données COVID pour les routes async, selon DB_DRIVER. Après le
+# commit, le cache des réponses est invalidé pour les pays modifiés et
+# prend la nouvelle version des données. Avec transaction=False chaque
+# requête est validée seule (autocommit) : pour les routes qui n'en
+# exécutent qu'une, cela évite les allers-retours de BEGIN et COMMIT.
+# Avec readonly=True (routes de lecture), la connexion vient d'un réplica à
+# jour d'au moins min_version s'il y en a un, sinon du primaire.
+@asynccontextmanager
+async def covid_repository(transaction=True, readonly=False,
+                           min_version=None):
+    if DB_DRIVER == "psycopg2":
+        async with psycopg2_slots():
+            db = await run_in_threadpool(Database, readonly, min_version)
+            try:
+                # Un réplica a déjà une transaction ouverte (lecture de sa
+                # version) : le mode n'est changé que si besoin
+                if db.connection.autocommit == transaction:
+                    db.connection.autocommit = not transaction
+                repository = Psycopg2CovidRepository(db.get_cursor())
+                yield repository
+                if transaction:
+                    await run_in_threadpool(db.connection.commit)
+            except BaseException:
+                if transaction:
+                    await run_in_threadpool(db.connection.rollback)
+                raise
+            finally:
+                db.connection.autocommit = False
+                await run_in_threadpool(db.close)
+    else:
+        async with acquire(readonly, min_version) as connection:
+            repository = AsyncpgCovidRepository(connection)
+            if transaction:
+                async with connection.transaction():
+                    yield repository
+            else:
+                yield repository
+
+    if repository.changed:
+        response_cache.invalidate(repository.changed, repository.version)
+
+
+async def get_covid_repository():
+    async with covid_repository() as repository:
+        yield repository
+
+
+# Pour les routes d'écriture en une seule requête (POST, PATCH, DELETE)
+async def get_single_statement_repository():
+    async with covid_repository(transaction=False) as repository:
+        yield repository
+
+
+# Version des données pour l'ETag : celle suivie par le cache des réponses,
+# sinon (écoute de CHANGES_CHANNEL interrompue) lue en base
+async def current_dataset_version():
+    if response_cache.version is not None:
+        return response_cache.version
+    async with covid_repository() as repository:
+        return await repository.dataset_version()
+
+
+# Requêtes des routes d'authentification, préparées une fois par connexion
+SELECT_USER_EXISTS = """
+    SELECT id FROM t_users
+    WHERE username = $1 OR email = $2
+"""
+
+SELECT_USER_LOGIN = """
+    SELECT id, password_hash
+    FROM t_users
+    WHERE username = $1
+"""
+
+
 # Générer un token JWT
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
@@ -119,8 +259,8 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-# Vérifier le token JWT
-def get_current_user(token: str = Depends(oauth2_scheme)):
+# Vérifier le token JWT (async : pas de passage par le pool de threads)
+async def get_current_user(token: str = Depends(oauth2_scheme)):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         return payload["sub"]
@@ -134,10 +274,9 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
 @app.post("/api/user", tags=["authentication"], status_code=201)
 def register_user(user: UserCreate, cursor=Depends(get_db)):
     try:
-        cursor.execute("""
-                       SELECT id FROM t_users
-                       WHERE username = %s OR email = %s""",
-                       (user.username, user.email))
+        prepared_statements.execute(
+            cursor, "user_exists", SELECT_USER_EXISTS,
+            (user.username, user.email))
         if cursor.fetchone():
             raise HTTPException(
                 status_code=400,
@@ -165,12 +304,8 @@ def login_user(
     form_data: OAuth2PasswordRequestForm = Depends(),
         cursor=Depends(get_db)):
     try:
-        cursor.execute("""
-                       SELECT id,
-                       password_hash
-                       FROM t_users
-                       WHERE username = %s""",
-                       (form_data.username,))
+        prepared_statements.execute(
+            cursor, "user_login", SELECT_USER_LOGIN, (form_data.username,))
         user = cursor.fetchone()
         if not user or not pwd_context.verify(
             form_data.password,
@@ -185,129 +320,165 @@ def login_user(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Route GET pour récupérer toutes les entrées (nécessite authentification)
+# Route GET paginée (nécessite authentification) : les pays sont triés par
+# nom et next est le curseur à passer dans after pour la page suivante. Les
+# lectures renvoient un ETag (version des données) et une 304 sans requête
+# SQL ni sérialisation quand If-None-Match correspond.
 @app.get("/covid", tags=["data"])
-def get_all_entries(
-    cursor=Depends(get_db),
+async def get_all_entries(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    continent: Optional[str] = None,
+    who_region: Optional[str] = None,
         current_user: str = Depends(get_current_user)):
-    cursor.execute("""
-        SELECT c.country, c.continent, c.who_region, c.population,
-               h.total_cases, h.total_deaths,
-               h.total_recovered, h.serious_critical,
-               t.total_tests
-        FROM countries c
-        LEFT JOIN health_statistics h ON c.id = h.country_id
-        LEFT JOIN testing_statistics t ON c.id = t.country_id
-    """)
-    data = cursor.fetchall()
+    version = await current_dataset_version()
+    etag = dataset_etag(version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    key = ("page", limit, after, continent, who_region)
+    cached = response_cache.get(key)
+    if cached is not None:
+        cached.headers["ETag"] = etag
+        return cached
 
-    if not data:
+    try:
+        after_country = decode_cursor(after) if after else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    generation = response_cache.generation
+    async with covid_repository(readonly=True,
+                                min_version=version) as repository:
+        data, next_cursor = await repository.page(
+            limit, after_country,
+            {"continent": continent, "who_region": who_region})
+
+    if not data and after is None:
         raise HTTPException(status_code=404, detail="No data found")
 
-    return {"data": [dict(row) for row in data]}
+    response = response_cache.store(
+        key, {"data": data, "next": next_cursor}, generation)
+    response.headers["ETag"] = etag
+    return response
+
+
+async def _export_stream(export_format, version):
+    async with covid_repository(readonly=True,
+                                min_version=version) as repository:
+        async for chunk in export_chunks(repository.export(), export_format):
+            yield chunk
+
+
+# Export complet des données (NDJSON ou CSV), envoyé au fil de la lecture
+# d'un curseur côté serveur. Déclarée avant /covid/{country}.
+@app.get("/covid/export", tags=["data"])
+async def export_entries(
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+        current_user: str = Depends(get_current_user)):
+    version = await current_dataset_version()
+    etag = dataset_etag(version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        _export_stream(format, version), media_type=media_type,
+        headers={
+            "ETag": etag,
+            "Content-Disposition": f'attachment; filename="covid.{extension}"',
+        })
+
+
+# Totaux et taux par continent ou région OMS, lus dans une table
+# pré-agrégée : la taille de la réponse ne dépend pas du nombre de pays.
+# Déclarée avant /covid/{country}.
+@app.get("/covid/aggregate", tags=["data"])
+async def get_aggregates(
+    request: Request,
+    group_by: Literal["continent", "who_region"] = "continent",
+        current_user: str = Depends(get_current_user)):
+    version = await current_dataset_version()
+    etag = dataset_etag(version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    key = ("aggregate", group_by)
+    cached = response_cache.get(key)
+    if cached is not None:
+        cached.headers["ETag"] = etag
+        return cached
+
+    generation = response_cache.generation
+    async with covid_repository(readonly=True,
+                                min_version=version) as repository:
+        groups, total = await repository.aggregates(group_by)
+
+    response = response_cache.store(key, {
+        "group_by": group_by, "groups": groups, "total": total}, generation)
+    response.headers["ETag"] = etag
+    return response
 
 
 # Route GET pour récupérer une entrée par pays
 @app.get("/covid/{country}", tags=["data"])
-def get_entry_by_country(
+async def get_entry_by_country(
     country: str,
-    cursor=Depends(get_db),
+    request: Request,
         current_user: str = Depends(get_current_user)):
-    cursor.execute("""
-        SELECT c.country, c.continent, c.who_region, c.population,
-               h.total_cases, h.total_deaths, h.total_recovered,
-               h.serious_critical, t.total_tests
-        FROM countries c
-        LEFT JOIN health_statistics h ON c.id = h.country_id
-        LEFT JOIN testing_statistics t ON c.id = t.country_id
-        WHERE c.country = %s
-    """, (country,))
-    data = cursor.fetchone()
+    version = await current_dataset_version()
+    etag = dataset_etag(version)
+    unchanged = not_modified(request, etag)
+    if unchanged is not None:
+        return unchanged
+
+    key = ("country", country)
+    cached = response_cache.get(key)
+    if cached is not None:
+        cached.headers["ETag"] = etag
+        return cached
+
+    generation = response_cache.generation
+    async with covid_repository(readonly=True,
+                                min_version=version) as repository:
+        data = await repository.entry(country)
 
     if not data:
         raise HTTPException(
             status_code=404,
             detail=f"Aucune donnée trouvée pour le pays '{country}'")
 
-    return {
+    response = response_cache.store(key, {
         "message": f"Données récupérées avec succès pour le pays '{country}'",
-        "data": dict(data)
-    }
+        "data": data
+    }, generation)
+    response.headers["ETag"] = etag
+    return response
 
 
 # Route POST pour ajouter une entrée (nécessite authentification)
 @app.post("/covid", tags=["data"])
-def add_entry(
+async def add_entry(
     entry: CovidEntry,
-    cursor=Depends(get_db),
+    repository=Depends(get_single_statement_repository),
         current_user: str = Depends(get_current_user)):
     CovidEntryValidator.validate_non_negative_fields(entry)
     try:
-        cursor.execute("BEGIN;")
-
-        # Insert or update country
-        cursor.execute("""
-            INSERT INTO countries (country, continent, who_region, population)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (country) DO UPDATE
-            SET continent = EXCLUDED.continent,
-                who_region = EXCLUDED.who_region,
-                population = EXCLUDED.population
-            RETURNING id;
-        """, (
-            entry.country,
-            entry.continent,
-            entry.who_region,
-            entry.population))
-
-        country_id_row = cursor.fetchone()
-        if country_id_row is None:
-            cursor.execute("""
-                           SELECT id
-                           FROM countries
-                           WHERE country = %s;""",
-                           (entry.country,))
-            country_id_row = cursor.fetchone()
-        country_id = country_id_row[0]
-
-        # Insert or update health_statistics
-        cursor.execute("""
-            INSERT INTO health_statistics
-            (country_id, total_cases,
-            total_deaths,
-            total_recovered,
-            serious_critical)
-            VALUES (%s, %s, %s, %s, %s)
-            ON CONFLICT (country_id) DO UPDATE
-            SET total_cases = EXCLUDED.total_cases,
-                total_deaths = EXCLUDED.total_deaths,
-                total_recovered = EXCLUDED.total_recovered,
-                serious_critical = EXCLUDED.serious_critical;
-        """, (
-            country_id,
-            entry.total_cases,
-            entry.total_deaths,
-            entry.total_recovered,
-            entry.serious_critical))
-
-        # Insert or update testing_statistics
-        cursor.execute("""
-            INSERT INTO testing_statistics (country_id, total_tests)
-            VALUES (%s, %s)
-            ON CONFLICT (country_id) DO UPDATE
-            SET total_tests = EXCLUDED.total_tests;
-        """, (country_id, entry.total_tests))
+        # Insertion ou mise à jour du pays et de ses statistiques, en une
+        # seule requête
+        await repository.upsert(entry)
 
-        cursor.connection.commit()
-
-    except psycopg2.IntegrityError as e:
-        cursor.connection.rollback()
+    except INTEGRITY_ERRORS as e:
         raise HTTPException(
             status_code=400,
             detail=f"Données invalides : {str(e)}")
 
     except Exception as e:
-        cursor.connection.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Erreur d'insertion : {str(e)}")
@@ -315,97 +486,99 @@ def add_entry(
     return {"message": "Entry added successfully"}
 
 
+# Route POST pour ajouter ou mettre à jour un lot d'entrées : tableau JSON
+# ou NDJSON (Content-Type application/x-ndjson). Les entrées invalides sont
+# signalées une à une ; les autres sont écrites en une seule requête et une
+# seule transaction.
+@app.post("/covid/bulk", tags=["data"])
+async def add_entries(
+    request: Request,
+        current_user: str = Depends(get_current_user)):
+    start = time.perf_counter()
+    items = parse_entries(await request.body(),
+                          request.headers.get("content-type", ""))
+    entries, errors = validate_entries(items, CovidEntry)
+
+    if entries:
+        try:
+            async with covid_repository() as repository:
+                await repository.upsert_many(entries)
+        except INTEGRITY_ERRORS as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Données invalides : {str(e)}")
+
+    elapsed = time.perf_counter() - start
+    return {
+        "message": f"{len(entries)} entrées écrites, {len(errors)} rejetées",
+        "written": len(entries),
+        "errors": errors,
+        "seconds": round(elapsed, 6),
+        "rows_per_second": round(len(entries) / elapsed, 1),
+    }
+
+
 # Route PATCH pour modifier une entrée
 @app.patch("/covid/{country}", tags=["data"])
-def partial_update_entry(
+async def partial_update_entry(
     country: str,
     entry: CovidEntryPatch,
-    cursor=Depends(get_db),
+    repository=Depends(get_single_statement_repository),
         current_user: str = Depends(get_current_user)):
 
-    cursor.execute("SELECT id FROM countries WHERE country = %s", (country,))
-    result = cursor.fetchone()
-    if not result:
+    updated_data = await repository.patch(
+        country, entry.dict(exclude_unset=True))
+    if updated_data is None:
         raise HTTPException(status_code=404, detail="Country not found")
-    country_id = result["id"]
-
-    data = entry.dict(exclude_unset=True)
-    for key, value in data.items():
-        if key in ["continent", "who_region", "population"]:
-            cursor.execute(f"""UPDATE countries
-                           SET {key} = %s WHERE id = %s""",
-                           (value, country_id))
-        elif key in ["total_cases",
-                     "total_deaths",
-                     "total_recovered",
-                     "serious_critical"]:
-            cursor.execute(f"""UPDATE health_statistics
-                           SET {key} = %s WHERE country_id = %s""",
-                           (value, country_id))
-        elif key == "total_tests":
-            cursor.execute("""UPDATE testing_statistics
-                           SET total_tests = %s WHERE country_id = %s""",
-                           (value, country_id))
-
-    cursor.connection.commit()
-
-    # Récupérer les données mises à jour
-    cursor.execute("""
-        SELECT c.country, c.continent, c.who_region, c.population,
-               h.total_cases, h.total_deaths,
-               h.total_recovered, h.serious_critical,
-               t.total_tests
-        FROM countries c
-        LEFT JOIN health_statistics h ON c.id = h.country_id
-        LEFT JOIN testing_statistics t ON c.id = t.country_id
-        WHERE c.id = %s
-    """, (country_id,))
-    updated_data = cursor.fetchone()
 
     return {
         "message": (
             f"Entry partially updated successfully for country '{country}'"
             ),
-        "data": dict(updated_data)
+        "data": updated_data
+    }
+
+
+# Route DELETE pour supprimer un lot de pays en une requête (tâches de
+# nettoyage) ; les pays inconnus sont signalés dans not_found
+@app.delete("/covid", tags=["data"])
+async def delete_entries(
+    countries: CountryList,
+    repository=Depends(get_single_statement_repository),
+        current_user: str = Depends(get_current_user)):
+    try:
+        deleted = await repository.delete_many(countries.countries)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Erreur lors de la suppression : {str(e)}")
+
+    found = set(deleted)
+    return {
+        "message": f"{len(deleted)} entrées supprimées",
+        "deleted": deleted,
+        "not_found": sorted(set(countries.countries) - found),
     }
 
 
 # La route pour supprimer une entrée
 @app.delete("/covid/{country}", tags=["data"])
-def delete_entry(country: str,
-                 cursor=Depends(get_db),
-                 current_user: str = Depends(get_current_user)):
+async def delete_entry(country: str,
+                       repository=Depends(get_single_statement_repository),
+                       current_user: str = Depends(get_current_user)):
     try:
-        # On récupérer d'abord l'ID du pays
-        cursor.execute("""SELECT id
-                       FROM countries WHERE country = %s""", (country,))
-        result = cursor.fetchone()
-
-        if not result:
-            raise HTTPException(status_code=404, detail="Country not found")
-
-        country_id = result["id"]
-
-        # Puis, on supprimes les entrées dépendantes
-        cursor.execute("""DELETE
-                       FROM testing_statistics
-                       WHERE country_id = %s""", (country_id,))
-        cursor.execute("""DELETE
-                       FROM health_statistics
-                       WHERE country_id = %s""", (country_id,))
-        cursor.execute("""DELETE
-                       FROM countries
-                       WHERE id = %s""", (country_id,))
-
-        cursor.connection.commit()
-        return {"message": f"Entry for '{country}' deleted successfully"}
-
+        # Le pays et ses statistiques (ON DELETE CASCADE) sont supprimés
+        # en une requête
+        deleted = await repository.delete(country)
     except Exception as e:
-        cursor.connection.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Erreur lors de la suppression : {str(e)}")
-        
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Country not found")
+    return {"message": f"Entry for '{country}' deleted successfully"}
+
 
 @app.post("/covid/predict", tags=["prediction"])
 def predict_deaths(entry: CovidPredictionInput,
@@ -477,10 +650,19 @@ def list_residual(current_user: str = Depends(get_current_user)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Access error to graphics : {str(e)}")
     
+# L'ETag des métriques vient de la date de modification et de la taille du
+# fichier : une 304 évite de le relire
 @app.get("/metrics", tags=["visualization"])
-def get_metrics(current_user: str = Depends(get_current_user)):
+def get_metrics(request: Request, response: Response,
+                current_user: str = Depends(get_current_user)):
     metrics_path = os.path.join(os.path.dirname(__file__), "../mspr1/machine_learning/static/metrics.json")
     try:
+        stat = os.stat(metrics_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        unchanged = not_modified(request, etag)
+        if unchanged is not None:
+            return unchanged
+        response.headers["ETag"] = etag
         with open(metrics_path, "r") as f:
             metrics = json.load(f)
         return {"metrics": metrics}
@@ -492,9 +674,13 @@ def get_metrics(current_user: str = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Error reading metrics: {str(e)}")
 
 
+@app.get("/monitoring/db-pool", tags=["monitoring"])
+def get_db_pool_stats(current_user: str = Depends(get_current_user)):
+    return {"pool": get_pool().stats(), "async_pool": async_pool_stats(),
+            "replicas": replica_router().stats()}
 
 
-        
-        
-      
-  
+# Appels et durées des requêtes fréquentes (registre des requêtes préparées)
+@app.get("/monitoring/statements", tags=["monitoring"])
+def get_statement_stats(current_user: str = Depends(get_current_user)):
+    return {"driver": DB_DRIVER, "statements": prepared_statements.stats()}
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, Field
+
+from ws.services.bulk_entries import MAX_BULK_ENTRIES
+
+
+class CountryList(BaseModel):
+    countries: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BULK_ENTRIES,
+        description="Names of the countries",
+        json_schema_extra={"example": ["France", "Spain"]}
+    )
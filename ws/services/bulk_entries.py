@@ -0,0 +1,79 @@
+import json
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from ws.business_layer.covid_entry_validator import CovidEntryValidator
+
+# Nombre maximal d'entrées par appel de POST /covid/bulk
+MAX_BULK_ENTRIES = 10000
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson")
+
+# Colonnes INT de la base : une valeur trop grande ferait échouer tout le lot
+INT_COLUMNS = ["population", "total_cases", "total_deaths",
+               "total_recovered", "serious_critical", "total_tests"]
+INT_MAX = 2 ** 31 - 1
+
+
+def parse_entries(body, content_type):
+    """Éléments du corps : un tableau JSON, ou une entrée JSON par ligne
+    (NDJSON). Une ligne NDJSON illisible est gardée comme chaîne pour être
+    signalée par validate_entries()."""
+    if content_type.split(";")[0].strip() in NDJSON_MEDIA_TYPES:
+        try:
+            lines = body.decode("utf-8").splitlines()
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400,
+                                detail=f"NDJSON invalide : {str(e)}")
+        items = []
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                items.append(line)
+    else:
+        try:
+            items = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400,
+                                detail=f"JSON invalide : {str(e)}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400,
+                                detail="Le corps doit être un tableau JSON")
+
+    if len(items) > MAX_BULK_ENTRIES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Au plus {MAX_BULK_ENTRIES} entrées par appel")
+    return items
+
+
+def validate_entries(items, model):
+    """Valide chaque élément avec model puis CovidEntryValidator.
+
+    Renvoie les entrées valides et les erreurs, avec la position de
+    l'élément dans le corps.
+    """
+    entries, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            entry = model.model_validate(item)
+            CovidEntryValidator.validate_non_negative_fields(entry)
+            too_large = [column for column in INT_COLUMNS
+                         if getattr(entry, column) > INT_MAX]
+            if too_large:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Le champ '{too_large[0]}' dépasse {INT_MAX}")
+        except ValidationError as e:
+            errors.append({"index": index, "detail": "; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'entrée'} : "
+                f"{error['msg']}" for error in e.errors())})
+        except HTTPException as e:
+            errors.append({"index": index, "detail": e.detail})
+        else:
+            entries.append(entry)
+    return entries, errors
@@ -0,0 +1,192 @@
+import zlib
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli est facultatif : gzip seulement
+    brotli = None
+
+# Encodages proposés, par ordre de préférence à poids égal
+ENCODINGS = ("br", "gzip")
+
+# Types déjà compressés ou diffusés en continu : envoyés tels quels
+EXCLUDED_MEDIA_TYPES = ("image/", "audio/", "video/", "font/",
+                        "application/zip", "application/gzip",
+                        "text/event-stream")
+
+# Au-delà, un morceau est compressé dans le pool de threads pour ne pas
+# bloquer la boucle d'évènements
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+
+def negotiate_encoding(accept_encoding):
+    """Encodage de la réponse d'après Accept-Encoding : "br", "gzip" ou
+    None (réponse non compressée). Un poids q=0 refuse l'encodage ; "br"
+    n'est proposé que si le module brotli est installé."""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding.lower()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in ENCODINGS:
+        if coding == "br" and brotli is None:
+            continue
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class GzipCompressor:
+    def __init__(self, level=6):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED,
+                                            16 + zlib.MAX_WBITS)
+
+    def compress(self, body, final):
+        # Z_SYNC_FLUSH : un morceau de réponse en flux est envoyé sans
+        # attendre la suite
+        return self._compressor.compress(body) + self._compressor.flush(
+            zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class BrotliCompressor:
+    def __init__(self, quality=5):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, body, final):
+        data = self._compressor.process(body)
+        if final:
+            return data + self._compressor.finish()
+        return data + self._compressor.flush()
+
+
+class _CompressionResponder:
+    """Enveloppe send d'une requête : l'en-tête de la réponse est retenu
+    jusqu'au premier morceau du corps, qui décide de la compression."""
+
+    def __init__(self, app, minimum_size, encoding, compressor):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.compressor = compressor
+        self.send = None
+        self.start = None
+        self.passthrough = False
+
+    async def __call__(self, scope, receive, send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def _compress(self, body, final):
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await run_in_threadpool(self.compressor.compress, body,
+                                           final)
+        return self.compressor.compress(body, final)
+
+    async def send_compressed(self, message):
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").lower()
+            self.passthrough = (
+                "content-encoding" in headers
+                or message["status"] in (204, 206, 304)
+                or media_type.startswith(EXCLUDED_MEDIA_TYPES))
+            if self.passthrough:
+                await self.send(message)
+            else:
+                self.start = message
+            return
+
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] != "http.response.body":
+            # Trailers, pathsend... : en-tête non modifié
+            await self._send_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.start is None:
+            # Morceau suivant d'une réponse en flux
+            if self.encoding is not None:
+                message["body"] = await self._compress(body, not more_body)
+            await self.send(message)
+            return
+
+        if len(body) < self.minimum_size and not more_body:
+            # Petite réponse : envoyée telle quelle
+            self.encoding = None
+            await self._send_start()
+            await self.send(message)
+            return
+
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if self.encoding is not None:
+            message["body"] = await self._compress(body, not more_body)
+            headers["Content-Encoding"] = self.encoding
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(message["body"]))
+            # Un ETag fort désigne une représentation exacte : il devient
+            # faible, If-None-Match utilisant la comparaison faible
+            etag = headers.get("etag")
+            if etag and etag.startswith('"'):
+                headers["ETag"] = f"W/{etag}"
+        await self._send_start()
+        await self.send(message)
+
+    async def _send_start(self):
+        if self.start is not None:
+            start, self.start = self.start, None
+            await self.send(start)
+
+
+class CompressionMiddleware:
+    """Compression brotli ou gzip négociée avec Accept-Encoding, pour les
+    réponses d'au moins minimum_size octets (et les réponses en flux).
+
+    Middleware ASGI autonome (aucune API interne de Starlette). Les niveaux
+    par défaut privilégient la vitesse : les réponses sont compressées à
+    chaque envoi.
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6,
+                 brotli_quality=5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            compressor = BrotliCompressor(self.brotli_quality)
+        elif encoding == "gzip":
+            compressor = GzipCompressor(self.gzip_level)
+        else:
+            compressor = None
+        responder = _CompressionResponder(self.app, self.minimum_size,
+                                          encoding, compressor)
+        await responder(scope, receive, send)
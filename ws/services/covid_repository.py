@@ -0,0 +1,509 @@
+import base64
+import binascii
+import re
+
+import asyncpg
+import psycopg2
+from starlette.concurrency import run_in_threadpool
+
+from database.notifications import (
+    NOTIFY_CHANGES_ASYNCPG, SELECT_VERSION, bump_version_query,
+    notify_changes)
+from database.prepared import prepared_statements
+
+
+# Erreurs d'intégrité des deux pilotes (contrainte, clé étrangère...)
+INTEGRITY_ERRORS = (psycopg2.IntegrityError,
+                    asyncpg.IntegrityConstraintViolationError)
+
+# Colonnes modifiables par table, pour le PATCH
+PATCH_COLUMNS = {
+    "countries": ["continent", "who_region", "population"],
+    "health_statistics": ["total_cases", "total_deaths",
+                          "total_recovered", "serious_critical"],
+    "testing_statistics": ["total_tests"],
+}
+
+# Les lectures passent par worldometer, modèle de lecture dénormalisé (une
+# ligne par pays, index unique sur country) que des triggers tiennent à
+# jour à chaque écriture sur les tables normalisées
+SELECT_ENTRIES = """
+    SELECT country, continent, who_region, population,
+           total_cases, total_deaths, total_recovered, serious_critical,
+           total_tests
+    FROM worldometer
+"""
+
+SELECT_ENTRY = SELECT_ENTRIES + " WHERE country = $1"
+
+# Colonnes de SELECT_ENTRIES, dans l'ordre (en-tête de l'export CSV)
+ENTRY_COLUMNS = ["country", "continent", "who_region", "population",
+                 "total_cases", "total_deaths", "total_recovered",
+                 "serious_critical", "total_tests"]
+
+# Lignes lues à la fois par le curseur côté serveur de l'export
+EXPORT_BATCH_SIZE = 1000
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Filtres de GET /covid, appliqués dans la requête SQL
+PAGE_FILTERS = {"continent": "continent", "who_region": "who_region"}
+
+# Alias des tables normalisées dans la requête de _patch_query
+TABLE_ALIASES = {"countries": "c", "health_statistics": "h",
+                 "testing_statistics": "t"}
+
+# Upsert d'une entrée en une seule requête : le pays inséré ou mis à jour
+# alimente les statistiques et l'incrémentation de la version par son id.
+# Paramètres dans l'ordre de ENTRY_COLUMNS.
+UPSERT_ENTRY = f"""
+    WITH upserted AS (
+        INSERT INTO countries (country, continent, who_region, population)
+        VALUES ($1, $2, $3, $4)
+        ON CONFLICT (country) DO UPDATE
+        SET continent = EXCLUDED.continent,
+            who_region = EXCLUDED.who_region,
+            population = EXCLUDED.population
+        RETURNING id, country
+    ),
+    health AS (
+        INSERT INTO health_statistics
+        (country_id, total_cases, total_deaths, total_recovered,
+         serious_critical)
+        SELECT id, $5::int, $6::int, $7::int, $8::int FROM upserted
+        ON CONFLICT (country_id) DO UPDATE
+        SET total_cases = EXCLUDED.total_cases,
+            total_deaths = EXCLUDED.total_deaths,
+            total_recovered = EXCLUDED.total_recovered,
+            serious_critical = EXCLUDED.serious_critical
+    ),
+    testing AS (
+        INSERT INTO testing_statistics (country_id, total_tests)
+        SELECT id, $9::int FROM upserted
+        ON CONFLICT (country_id) DO UPDATE
+        SET total_tests = EXCLUDED.total_tests
+    )
+    {bump_version_query("upserted.country", " FROM upserted")}
+"""
+
+# Upsert d'un lot d'entrées en une seule requête : chaque colonne arrive
+# sous forme de tableau, dans l'ordre de ENTRY_COLUMNS
+UPSERT_ENTRIES = """
+    WITH input AS (
+        SELECT * FROM unnest(
+            $1::varchar[], $2::varchar[], $3::varchar[], $4::int[],
+            $5::int[], $6::int[], $7::int[], $8::int[], $9::int[])
+        AS t(country, continent, who_region, population, total_cases,
+             total_deaths, total_recovered, serious_critical, total_tests)
+    ),
+    upserted AS (
+        INSERT INTO countries (country, continent, who_region, population)
+        SELECT country, continent, who_region, population FROM input
+        ON CONFLICT (country) DO UPDATE
+        SET continent = EXCLUDED.continent,
+            who_region = EXCLUDED.who_region,
+            population = EXCLUDED.population
+        RETURNING id, country
+    ),
+    health AS (
+        INSERT INTO health_statistics
+        (country_id, total_cases, total_deaths, total_recovered,
+         serious_critical)
+        SELECT u.id, i.total_cases, i.total_deaths, i.total_recovered,
+               i.serious_critical
+        FROM input i JOIN upserted u USING (country)
+        ON CONFLICT (country_id) DO UPDATE
+        SET total_cases = EXCLUDED.total_cases,
+            total_deaths = EXCLUDED.total_deaths,
+            total_recovered = EXCLUDED.total_recovered,
+            serious_critical = EXCLUDED.serious_critical
+    )
+    INSERT INTO testing_statistics (country_id, total_tests)
+    SELECT u.id, i.total_tests
+    FROM input i JOIN upserted u USING (country)
+    ON CONFLICT (country_id) DO UPDATE
+    SET total_tests = EXCLUDED.total_tests
+"""
+
+# Suppression de pays en une requête : les statistiques suivent par
+# ON DELETE CASCADE. Comme pour _notify(), un seul pays supprimé est nommé
+# dans la notification ; pour plusieurs, les autres processus invalident
+# tout. Rien n'est incrémenté si aucun pays n'est supprimé.
+DELETE_COUNTRIES = f"""
+    WITH deleted AS (
+        DELETE FROM countries WHERE country = ANY($1::varchar[])
+        RETURNING country
+    ),
+    notified AS (
+        SELECT CASE WHEN count(*) = 1 THEN min(country) ELSE '' END
+            AS country
+        FROM deleted HAVING count(*) > 0
+    ),
+    bumped AS ({bump_version_query("notified.country", " FROM notified")})
+    SELECT deleted.country, bumped.version
+    FROM deleted CROSS JOIN bumped
+"""
+
+
+# Totaux par groupe (region_totals, tenue à jour par trigger) et taux
+# dérivés ; la ligne "all" est le total de tous les pays
+SELECT_AGGREGATES = """
+    SELECT group_by, group_value AS name, countries, population,
+           total_cases, total_deaths, total_recovered, serious_critical,
+           total_tests,
+           round(total_deaths::numeric / NULLIF(total_cases, 0), 6)::float8
+               AS case_fatality_rate,
+           round(total_tests * 1000000.0 / NULLIF(population, 0), 1)::float8
+               AS tests_per_million,
+           round(total_recovered::numeric / NULLIF(total_cases, 0), 6)::float8
+               AS recovery_ratio
+    FROM region_totals
+    WHERE group_by = $1 OR group_by = 'all'
+    ORDER BY group_value
+"""
+
+
+def encode_cursor(country):
+    """Curseur opaque de pagination : le dernier pays de la page."""
+    return base64.urlsafe_b64encode(country.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Inverse de encode_cursor() ; ValueError si le curseur est invalide."""
+    try:
+        return base64.b64decode(cursor.encode(), altchars=b"-_",
+                                validate=True).decode()
+    except (binascii.Error, UnicodeError):
+        raise ValueError(f"Curseur invalide : {cursor!r}")
+
+
+def _page_query(limit, after=None, filters=None):
+    """Nom, texte et paramètres de la requête d'une page triée par pays
+    (pagination par clé). Le nom dépend des conditions utilisées : une
+    requête préparée par combinaison.
+
+    Une ligne de plus que limit est demandée pour savoir s'il reste des
+    pays après la page.
+    """
+    conditions, args, used = [], [], []
+    if after is not None:
+        args.append(after)
+        conditions.append(f"country > ${len(args)}")
+        used.append("after")
+    for name, value in (filters or {}).items():
+        if value is not None:
+            args.append(value)
+            conditions.append(f"{PAGE_FILTERS[name]} = ${len(args)}")
+            used.append(name)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    args.append(limit + 1)
+    return ("_".join(["covid_page", *used]),
+            f"{SELECT_ENTRIES}{where} ORDER BY country LIMIT ${len(args)}",
+            args)
+
+
+def _split_page(rows, limit):
+    """Renvoie les lignes de la page et le curseur de la suivante."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(rows[-1]["country"])
+
+
+def _split_aggregates(rows):
+    """Renvoie les groupes et le total (None sans aucun pays)."""
+    groups, total = [], None
+    for row in rows:
+        if row.pop("group_by") == "all":
+            row.pop("name")
+            total = row
+        else:
+            groups.append(row)
+    return groups, total
+
+
+def _pyformat(query):
+    """Requête asyncpg ($1, $2...) au format psycopg2 (%s).
+
+    Les paramètres doivent apparaître une seule fois, dans l'ordre.
+    """
+    return re.sub(r"\$\d+", "%s", query)
+
+
+def _patch_query(country, data):
+    """PATCH en une seule requête : recherche du pays, un UPDATE par table
+    concernée, incrémentation de la version et entrée modifiée.
+
+    Les CTE modifiant les tables ne sont pas visibles du SELECT final : les
+    valeurs modifiées sont reprises de leur RETURNING (colonnes NOT NULL).
+    Les noms de colonnes viennent de PATCH_COLUMNS, jamais de la requête.
+    Aucune ligne n'est renvoyée si le pays n'existe pas. Sans colonne à
+    modifier, l'entrée est seulement lue : la version n'est pas incrémentée
+    (new_version vaut NULL) et le cache n'est pas invalidé.
+    """
+    args = [country]
+    ctes = ["target AS (SELECT id, country FROM countries "
+            "WHERE country = $1)"]
+    updated = {}
+    for table, columns in PATCH_COLUMNS.items():
+        assignments = []
+        for column in columns:
+            if column in data:
+                args.append(data[column])
+                assignments.append(f"{column} = ${len(args)}")
+        if not assignments:
+            continue
+        key = "id" if table == "countries" else "country_id"
+        updated[table] = f"updated_{table}"
+        ctes.append(
+            f"updated_{table} AS (UPDATE {table} "
+            f"SET {', '.join(assignments)} FROM target "
+            f"WHERE {table}.{key} = target.id RETURNING {table}.*)")
+    if updated:
+        ctes.append("bumped AS ("
+                    f"{bump_version_query('target.country', ' FROM target')})")
+
+    selected = []
+    for column in ENTRY_COLUMNS:
+        table = next((table for table, columns in PATCH_COLUMNS.items()
+                      if column in columns), "countries")
+        current = f"{TABLE_ALIASES[table]}.{column}"
+        if table in updated:
+            current = f"COALESCE({updated[table]}.{column}, {current})"
+        selected.append(f"{current} AS {column}")
+    joins = "".join(f" LEFT JOIN {alias} ON TRUE"
+                    for alias in updated.values())
+    if updated:
+        new_version = "bumped.version"
+        joins = f" CROSS JOIN bumped{joins}"
+    else:
+        new_version = "NULL::bigint"
+
+    return (f"WITH {', '.join(ctes)} "
+            f"SELECT {', '.join(selected)}, {new_version} AS new_version "
+            "FROM target JOIN countries c ON c.id = target.id "
+            "LEFT JOIN health_statistics h ON h.country_id = target.id "
+            "LEFT JOIN testing_statistics t ON t.country_id = target.id"
+            f"{joins}", args)
+
+
+def _entry_values(entry):
+    return [getattr(entry, column) for column in ENTRY_COLUMNS]
+
+
+def _bulk_values(entries):
+    """Colonnes de UPSERT_ENTRIES. Un pays ne peut être modifié qu'une fois
+    par requête : en cas de doublon, la dernière entrée l'emporte."""
+    entries = list({entry.country: entry for entry in entries}.values())
+    return [list(column) for column in zip(*map(_entry_values, entries))]
+
+
+def _record_deletions(repository, rows):
+    """Garde la version et les pays supprimés par DELETE_COUNTRIES ;
+    renvoie ces pays."""
+    countries = [row["country"] for row in rows]
+    if countries:
+        repository.version = rows[0]["version"]
+        repository.changed.update(countries)
+    return countries
+
+
+class AsyncpgCovidRepository:
+    """Accès aux données COVID sur une connexion asyncpg.
+
+    La transaction est gérée par l'appelant (dépendance FastAPI). Chaque
+    modification incrémente la version des données et est notifiée sur
+    CHANGES_CHANNEL ; les pays modifiés sont ajoutés à changed et la
+    nouvelle version est gardée dans version, pour invalider le cache des
+    réponses après le commit.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.changed = set()
+        self.version = None
+
+    async def _notify(self, *countries):
+        # Un seul pays est nommé dans la notification ; pour plusieurs, les
+        # autres processus invalident tout
+        payload = countries[0] if len(countries) == 1 else ""
+        self.version = await self.connection.fetchval(
+            NOTIFY_CHANGES_ASYNCPG, payload)
+        self.changed.update(countries)
+
+    async def dataset_version(self):
+        return await prepared_statements.run_async(
+            "dataset_version", self.connection.fetchval, SELECT_VERSION)
+
+    async def page(self, limit, after=None, filters=None):
+        name, query, args = _page_query(limit, after, filters)
+        rows = await prepared_statements.run_async(
+            name, self.connection.fetch, query, *args)
+        return _split_page([dict(row) for row in rows], limit)
+
+    async def export(self, batch_size=EXPORT_BATCH_SIZE):
+        """Toutes les entrées triées par pays, par lots, lues avec un
+        curseur côté serveur (la transaction doit être ouverte)."""
+        batch = []
+        async for row in self.connection.cursor(
+                SELECT_ENTRIES + " ORDER BY country", prefetch=batch_size):
+            batch.append(dict(row))
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def aggregates(self, group_by):
+        rows = await prepared_statements.run_async(
+            "covid_aggregates", self.connection.fetch, SELECT_AGGREGATES,
+            group_by)
+        return _split_aggregates([dict(row) for row in rows])
+
+    async def entry(self, country):
+        row = await prepared_statements.run_async(
+            "covid_entry", self.connection.fetchrow, SELECT_ENTRY, country)
+        return dict(row) if row else None
+
+    async def upsert(self, entry):
+        self.version = await prepared_statements.run_async(
+            "covid_upsert", self.connection.fetchval, UPSERT_ENTRY,
+            *_entry_values(entry))
+        self.changed.add(entry.country)
+
+    async def upsert_many(self, entries):
+        values = _bulk_values(entries)
+        await self.connection.execute(UPSERT_ENTRIES, *values)
+        await self._notify(*values[0])
+
+    async def patch(self, country, data):
+        query, args = _patch_query(country, data)
+        row = await self.connection.fetchrow(query, *args)
+        if row is None:
+            return None
+        row = dict(row)
+        version = row.pop("new_version")
+        if version is not None:
+            self.version = version
+            self.changed.add(country)
+        return row
+
+    async def delete_many(self, countries):
+        """Supprime les pays et renvoie ceux qui existaient."""
+        rows = await prepared_statements.run_async(
+            "covid_delete", self.connection.fetch, DELETE_COUNTRIES,
+            countries)
+        return _record_deletions(self, rows)
+
+    async def delete(self, country):
+        return bool(await self.delete_many([country]))
+
+
+class Psycopg2CovidRepository:
+    """Même interface sur un curseur psycopg2 (DB_DRIVER=psycopg2).
+
+    Les appels bloquants sont exécutés dans le pool de threads de Starlette.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.changed = set()
+        self.version = None
+
+    def _notify(self, *countries):
+        self.version = notify_changes(
+            self.cursor, countries[0] if len(countries) == 1 else "")
+        self.changed.update(countries)
+
+    def _execute(self, query, args=(), name=None):
+        # Les requêtes nommées sont préparées une fois par connexion
+        if name is None:
+            self.cursor.execute(_pyformat(query), args)
+        else:
+            prepared_statements.execute(self.cursor, name, query, args)
+
+    def _fetchall(self, query, args=(), name=None):
+        self._execute(query, args, name)
+        return [dict(row) for row in self.cursor.fetchall()]
+
+    def _fetchone(self, query, args=(), name=None):
+        self._execute(query, args, name)
+        row = self.cursor.fetchone()
+        return dict(row) if row else None
+
+    def _open_export(self):
+        # Curseur nommé : les lignes restent sur le serveur jusqu'au fetchmany
+        cursor = self.cursor.connection.cursor(name="covid_export")
+        cursor.execute(SELECT_ENTRIES + " ORDER BY country")
+        return cursor
+
+    def _upsert(self, entry):
+        self.version = self._fetchone(
+            UPSERT_ENTRY, _entry_values(entry), "covid_upsert")["version"]
+        self.changed.add(entry.country)
+
+    def _upsert_many(self, entries):
+        values = _bulk_values(entries)
+        self.cursor.execute(_pyformat(UPSERT_ENTRIES), values)
+        self._notify(*values[0])
+
+    def _patch(self, country, data):
+        row = self._fetchone(*_patch_query(country, data))
+        if row is None:
+            return None
+        version = row.pop("new_version")
+        if version is not None:
+            self.version = version
+            self.changed.add(country)
+        return row
+
+    def _delete_many(self, countries):
+        return _record_deletions(self, self._fetchall(
+            DELETE_COUNTRIES, (countries,), "covid_delete"))
+
+    async def dataset_version(self):
+        row = await run_in_threadpool(
+            self._fetchone, SELECT_VERSION, (), "dataset_version")
+        return row["version"]
+
+    async def page(self, limit, after=None, filters=None):
+        name, query, args = _page_query(limit, after, filters)
+        rows = await run_in_threadpool(self._fetchall, query, args, name)
+        return _split_page(rows, limit)
+
+    async def export(self, batch_size=EXPORT_BATCH_SIZE):
+        cursor = await run_in_threadpool(self._open_export)
+        try:
+            while True:
+                rows = await run_in_threadpool(cursor.fetchmany, batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+        finally:
+            await run_in_threadpool(cursor.close)
+
+    async def aggregates(self, group_by):
+        rows = await run_in_threadpool(
+            self._fetchall, SELECT_AGGREGATES, (group_by,),
+            "covid_aggregates")
+        return _split_aggregates(rows)
+
+    async def entry(self, country):
+        return await run_in_threadpool(
+            self._fetchone, SELECT_ENTRY, (country,), "covid_entry")
+
+    async def upsert(self, entry):
+        await run_in_threadpool(self._upsert, entry)
+
+    async def upsert_many(self, entries):
+        await run_in_threadpool(self._upsert_many, entries)
+
+    async def patch(self, country, data):
+        return await run_in_threadpool(self._patch, country, data)
+
+    async def delete_many(self, countries):
+        return await run_in_threadpool(self._delete_many, countries)
+
+    async def delete(self, country):
+        return bool(await self.delete_many([country]))
@@ -0,0 +1,39 @@
+import csv
+import io
+
+import orjson
+
+from ws.services.covid_repository import ENTRY_COLUMNS
+
+# Type MIME et extension de chaque format de GET /covid/export
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def ndjson_chunk(rows):
+    """Une ligne JSON par entrée (bytes UTF-8)."""
+    return b"".join(orjson.dumps(row) + b"\n" for row in rows)
+
+
+def csv_chunk(rows, header=False):
+    """Lignes CSV des entrées, précédées de l'en-tête si header est vrai."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=ENTRY_COLUMNS,
+                            lineterminator="\n")
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_chunks(batches, export_format):
+    """Morceaux de la réponse pour chaque lot de lignes lu en base."""
+    if export_format == "csv":
+        yield csv_chunk([], header=True)
+    async for rows in batches:
+        if export_format == "csv":
+            yield csv_chunk(rows)
+        else:
+            yield ndjson_chunk(rows)
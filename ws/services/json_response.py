@@ -0,0 +1,29 @@
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+
+
+def _default(value):
+    # Types inconnus d'orjson (modèles Pydantic, Decimal...)
+    return jsonable_encoder(value)
+
+
+def dumps(content):
+    """Sérialise content en JSON (bytes) avec orjson.
+
+    Les lignes lues en base (dict de str, int, float, None) sont encodées
+    sans passer par jsonable_encoder, qui parcourt chaque valeur en Python ;
+    seuls les types inconnus d'orjson lui sont confiés.
+    """
+    return orjson.dumps(
+        content, default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ORJSONResponse(Response):
+    """Réponse JSON sérialisée par dumps() (classe par défaut de l'API)."""
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+from collections import OrderedDict
+
+import asyncpg
+from fastapi import Response
+
+from database.async_pool import connect_kwargs
+from database.notifications import (
+    CHANGES_CHANNEL, SELECT_VERSION, parse_notification)
+from ws.services.json_response import dumps
+
+
+class ResponseCache:
+    """Cache LRU des réponses JSON sérialisées des routes de lecture.
+
+    Les clés commencent par "country" (GET /covid/{country}), "page"
+    (GET /covid) ou "aggregate" (GET /covid/aggregate). Une modification
+    d'un pays invalide son entrée et toutes les réponses qui ne concernent
+    pas un seul pays, qui peuvent en dépendre.
+
+    version est la version des données (dataset_version) suivie par
+    l'écoute de CHANGES_CHANNEL, ou None quand l'écoute n'est pas active :
+    rien n'est alors mis en cache, les modifications des autres processus
+    pouvant passer inaperçues.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Incrémenté à chaque invalidation : une réponse calculée avant une
+        # invalidation n'est pas mise en cache
+        self.generation = 0
+        self.version = None
+
+    def get(self, key):
+        """Réponse en cache pour key, ou None."""
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                return None
+            self._entries.move_to_end(key)
+        return Response(content=body, media_type="application/json")
+
+    def store(self, key, content, generation):
+        """Sérialise content et le met en cache si aucune invalidation n'a
+        eu lieu depuis generation. Renvoie la réponse à envoyer."""
+        body = dumps(content)
+        with self._lock:
+            if (self.max_entries and self.version is not None
+                    and generation == self.generation):
+                self._entries[key] = body
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return Response(content=body, media_type="application/json")
+
+    def invalidate(self, countries=None, version=None):
+        """Invalide les pays donnés et les réponses sur plusieurs pays, ou
+        tout si countries est None. version est la version des données
+        après la modification."""
+        with self._lock:
+            self.generation += 1
+            if version is not None and self.version is not None:
+                self.version = max(self.version, version)
+            if countries is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                if key[0] != "country" or key[1] in countries:
+                    del self._entries[key]
+
+    def reset(self, version=None):
+        """Vide le cache et suit les données à partir de version (None :
+        plus de suivi)."""
+        with self._lock:
+            self.generation += 1
+            self.version = version
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+response_cache = ResponseCache(int(os.getenv("RESPONSE_CACHE_SIZE", 1024)))
+
+
+async def listen_for_changes(cache=response_cache, retry_delay=1.0):
+    """Invalide le cache sur les NOTIFY des autres processus (et de l'ETL).
+
+    Tant que l'écoute est interrompue des notifications peuvent être
+    perdues : le suivi de la version est suspendu et le cache est vidé à
+    chaque (re)connexion.
+    """
+    def on_notification(connection, pid, channel, payload):
+        version, country = parse_notification(payload)
+        cache.invalidate({country} if country else None, version)
+
+    while True:
+        connection = None
+        try:
+            connection = await asyncpg.connect(**connect_kwargs())
+            closed = asyncio.Event()
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(CHANGES_CHANNEL, on_notification)
+            # Version lue après le LISTEN : aucune modification ultérieure
+            # n'est manquée
+            cache.reset(await connection.fetchval(SELECT_VERSION))
+            await closed.wait()
+        except (OSError, asyncpg.PostgresError) as e:
+            print(f"⚠️ Écoute de {CHANGES_CHANNEL} interrompue : {e}",
+                  flush=True)
+        finally:
+            # Aussi à l'arrêt de l'écoute (tâche annulée)
+            cache.reset()
+            if connection is not None and not connection.is_closed():
+                await connection.close()
+        await asyncio.sleep(retry_delay)
+
+
+def dataset_etag(version):
+    """ETag fort des réponses construites à partir des données."""
+    return f'"v{version}"'
+
+
+def not_modified(request, etag):
+    """Réponse 304 si If-None-Match correspond à etag, sinon None.
+
+    If-None-Match utilise la comparaison faible (RFC 9110) : le préfixe W/
+    est ignoré.
+    """
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return None
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
@@ -0,0 +1,158 @@
+import gzip
+from decimal import Decimal
+
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+from database.Database import Database
+from ws.covid_api import app
+from ws.services import compression
+from ws.services.compression import CompressionMiddleware, negotiate_encoding
+from ws.services.json_response import dumps
+
+
+@pytest.fixture(scope="module")
+def client():
+    client = TestClient(app)
+    client.post("/api/user", json={
+        "username": "testuser_compression",
+        "email": "testuser_compression@test.com",
+        "password": "Test123456"
+    })
+    token = client.post("/api/login", data={
+        "username": "testuser_compression",
+        "password": "Test123456"
+    }).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+    yield client
+
+    with Database() as cursor:
+        cursor.execute(
+            "DELETE FROM t_users WHERE username = 'testuser_compression'")
+
+
+def raw_get(client, url, accept_encoding):
+    """Réponse sans décompression par le client, et son corps brut."""
+    with client.stream("GET", url, headers={
+            "Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+class TestNegotiateEncoding:
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", "br"),
+        ("gzip", "gzip"),
+        ("br;q=0.5, gzip", "gzip"),
+        ("br;q=0, gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+        ("gzip;q=oops, br;q=0", None),
+    ])
+    def test_negotiate_encoding(self, header, expected):
+        if expected == "br":
+            pytest.importorskip("brotli")
+        assert negotiate_encoding(header) == expected
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", "gzip"),
+        ("br", None),
+        ("*", "gzip"),
+    ])
+    def test_without_brotli_falls_back_to_gzip(self, monkeypatch, header,
+                                               expected):
+        monkeypatch.setattr(compression, "brotli", None)
+
+        assert negotiate_encoding(header) == expected
+
+
+class TestJSONSerialization:
+    def test_dumps_matches_standard_json(self):
+        content = {"data": [{"country": "Côte d'Ivoire", "population": 1,
+                             "rate": 0.5, "total_tests": None}],
+                   "next": None}
+
+        assert orjson.loads(dumps(content)) == content
+
+    def test_dumps_falls_back_to_jsonable_encoder(self):
+        assert orjson.loads(dumps({"value": Decimal("1.5")})) == {
+            "value": 1.5}
+
+
+class TestCompression:
+    @pytest.mark.covid
+    @pytest.mark.parametrize("encoding", ["br", "gzip"])
+    def test_large_response_is_compressed(self, client, encoding):
+        decompress = (pytest.importorskip("brotli").decompress
+                      if encoding == "br" else gzip.decompress)
+        expected = client.get("/covid?limit=1000").content
+
+        response, body = raw_get(client, "/covid?limit=1000", encoding)
+
+        assert response.headers["Content-Encoding"] == encoding
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert int(response.headers["Content-Length"]) == len(body)
+        assert len(body) < len(expected)
+        assert decompress(body) == expected
+
+    @pytest.mark.covid
+    def test_compressed_response_has_weak_etag_and_revalidates(self, client):
+        response, _ = raw_get(client, "/covid?limit=1000", "gzip")
+        etag = response.headers["ETag"]
+
+        assert etag.startswith('W/"')
+        response = client.get("/covid?limit=1000",
+                              headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    @pytest.mark.covid
+    def test_without_accept_encoding_response_is_identity(self, client):
+        response, body = raw_get(client, "/covid?limit=1000", "identity")
+
+        assert "Content-Encoding" not in response.headers
+        assert response.headers["ETag"].startswith('"')
+        assert orjson.loads(body)["data"]
+
+    @pytest.mark.covid
+    def test_small_response_is_not_compressed(self, client):
+        response, _ = raw_get(client, "/covid?limit=1", "br")
+
+        assert "Content-Encoding" not in response.headers
+
+    @pytest.mark.covid
+    def test_streamed_export_is_compressed(self, client):
+        brotli = pytest.importorskip("brotli")
+        expected = client.get("/covid/export").content
+
+        response, body = raw_get(client, "/covid/export", "br")
+
+        assert response.headers["Content-Encoding"] == "br"
+        assert brotli.decompress(body) == expected
+
+    @pytest.mark.covid
+    def test_without_brotli_response_is_gzip(self, client, monkeypatch):
+        monkeypatch.setattr(compression, "brotli", None)
+
+        response, body = raw_get(client, "/covid?limit=1000", "br, gzip")
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert orjson.loads(gzip.decompress(body))["data"]
+
+    def test_encoded_response_is_sent_unchanged(self):
+        body = gzip.compress(b"x" * 4096)
+
+        async def encoded(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-encoding", b"gzip"),
+                                    (b"content-length",
+                                     str(len(body)).encode())]})
+            await send({"type": "http.response.body", "body": body})
+
+        client = TestClient(CompressionMiddleware(encoded))
+        with client.stream("GET", "/", headers={
+                "Accept-Encoding": "br"}) as response:
+            raw = b"".join(response.iter_raw())
+
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert raw == body
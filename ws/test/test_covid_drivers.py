@@ -0,0 +1,324 @@
+import asyncio
+import csv
+import io
+import json
+
+import asyncpg
+import pytest
+from fastapi.testclient import TestClient
+
+from database.async_pool import connect_kwargs
+from ws import covid_api
+from ws.covid_api import app, get_db
+from ws.services.covid_repository import AsyncpgCovidRepository
+
+PAYLOAD = {
+    "country": "Testland Drivers",
+    "continent": "Testinent",
+    "who_region": "TestRegion",
+    "population": 123456,
+    "total_cases": 1000,
+    "total_deaths": 50,
+    "total_recovered": 900,
+    "serious_critical": 10,
+    "total_tests": 5000
+}
+
+
+@pytest.fixture(params=["asyncpg", "psycopg2"])
+def client(request, monkeypatch):
+    """Client de l'API avec chacun des deux pilotes des routes de données."""
+    monkeypatch.setattr(covid_api, "DB_DRIVER", request.param)
+    with TestClient(app) as client:
+        yield client
+
+    db_gen = get_db()
+    cursor = next(db_gen)
+    cursor.execute("""DELETE FROM testing_statistics WHERE country_id IN (
+                          SELECT id FROM countries
+                          WHERE country LIKE 'Testland Drivers%')""")
+    cursor.execute("""DELETE FROM health_statistics WHERE country_id IN (
+                          SELECT id FROM countries
+                          WHERE country LIKE 'Testland Drivers%')""")
+    cursor.execute(
+        "DELETE FROM countries WHERE country LIKE 'Testland Drivers%'")
+    cursor.execute("DELETE FROM t_users WHERE username = 'testuser_drivers'")
+    cursor.connection.commit()
+    db_gen.close()
+
+
+def auth_headers(client):
+    client.post("/api/user", json={
+        "username": "testuser_drivers",
+        "email": "testuser_drivers@test.com",
+        "password": "Test123456"
+    })
+    token = client.post("/api/login", data={
+        "username": "testuser_drivers",
+        "password": "Test123456"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class TestCovidDrivers:
+    @pytest.mark.covid
+    def test_entry_lifecycle(self, client):
+        headers = auth_headers(client)
+
+        assert client.post("/covid", json=PAYLOAD,
+                           headers=headers).status_code == 200
+
+        response = client.patch("/covid/Testland Drivers",
+                                json={"population": 42, "total_tests": 7},
+                                headers=headers)
+        assert response.status_code == 200
+        data = response.json()["data"]
+        assert data["population"] == 42
+        assert data["total_tests"] == 7
+        assert data["total_cases"] == 1000
+
+        response = client.get("/covid/Testland Drivers", headers=headers)
+        assert response.json()["data"] == data
+
+        response = client.delete("/covid/Testland Drivers", headers=headers)
+        assert response.status_code == 200
+        response = client.get("/covid/Testland Drivers", headers=headers)
+        assert response.status_code == 404
+
+    @pytest.mark.covid
+    def test_patch_returns_every_table_after_update(self, client):
+        headers = auth_headers(client)
+        client.post("/covid", json=PAYLOAD, headers=headers)
+
+        response = client.patch("/covid/Testland Drivers", json={
+            "continent": "Nouveau", "total_deaths": 51,
+            "serious_critical": 11, "total_tests": 5001}, headers=headers)
+
+        expected = {**PAYLOAD, "continent": "Nouveau", "total_deaths": 51,
+                    "serious_critical": 11, "total_tests": 5001}
+        assert response.json()["data"] == expected
+        assert client.get("/covid/Testland Drivers",
+                          headers=headers).json()["data"] == expected
+
+    @pytest.mark.covid
+    def test_empty_patch_does_not_change_the_version(self, client):
+        headers = auth_headers(client)
+        client.post("/covid", json=PAYLOAD, headers=headers)
+        etag = client.get("/covid/Testland Drivers",
+                          headers=headers).headers["ETag"]
+
+        response = client.patch("/covid/Testland Drivers", json={},
+                                headers=headers)
+
+        assert response.status_code == 200
+        assert response.json()["data"] == PAYLOAD
+        assert client.get("/covid/Testland Drivers", headers={
+            **headers, "If-None-Match": etag}).status_code == 304
+        assert client.patch("/covid/Nowhereland", json={},
+                            headers=headers).status_code == 404
+
+    @pytest.mark.covid
+    def test_unknown_country_is_not_found(self, client):
+        headers = auth_headers(client)
+
+        assert client.patch("/covid/Nowhereland", json={"population": 1},
+                            headers=headers).status_code == 404
+        assert client.delete("/covid/Nowhereland",
+                             headers=headers).status_code == 404
+
+    @pytest.mark.covid
+    def test_pages_follow_the_next_cursor(self, client):
+        headers = auth_headers(client)
+
+        first = client.get("/covid", params={"limit": 3},
+                           headers=headers).json()
+        second = client.get("/covid", params={"limit": 3,
+                                              "after": first["next"]},
+                            headers=headers).json()
+
+        countries = [entry["country"]
+                     for entry in first["data"] + second["data"]]
+        assert len(first["data"]) == 3
+        assert countries == sorted(countries)
+        assert len(set(countries)) == 6
+
+    @pytest.mark.covid
+    def test_filters_are_applied(self, client):
+        headers = auth_headers(client)
+
+        response = client.get("/covid", params={"continent": "Europe",
+                                                "limit": 1000},
+                              headers=headers)
+
+        data = response.json()["data"]
+        assert data
+        assert {entry["continent"] for entry in data} == {"Europe"}
+        assert response.json()["next"] is None
+
+    @pytest.mark.covid
+    def test_invalid_cursor_is_rejected(self, client):
+        headers = auth_headers(client)
+
+        response = client.get("/covid", params={"after": "%%%"},
+                              headers=headers)
+        assert response.status_code == 400
+
+    @pytest.mark.covid
+    def test_export_matches_the_paginated_route(self, client):
+        headers = auth_headers(client)
+        entries = client.get("/covid", params={"limit": 1000},
+                             headers=headers).json()["data"]
+
+        response = client.get("/covid/export", headers=headers)
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [json.loads(line)
+                for line in response.text.splitlines()] == entries
+
+        response = client.get("/covid/export", params={"format": "csv"},
+                              headers=headers)
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert [row["country"] for row in rows] == [
+            entry["country"] for entry in entries]
+        assert rows[0]["population"] == str(entries[0]["population"])
+
+    @pytest.mark.covid
+    def test_export_rejects_unknown_format(self, client):
+        headers = auth_headers(client)
+
+        response = client.get("/covid/export", params={"format": "xml"},
+                              headers=headers)
+        assert response.status_code == 422
+
+    @pytest.mark.covid
+    def test_bulk_upsert_reports_invalid_rows(self, client):
+        headers = auth_headers(client)
+        second = {**PAYLOAD, "country": "Testland Drivers 2"}
+        body = [PAYLOAD, {**PAYLOAD, "total_cases": -1}, second,
+                {"country": "Testland Drivers 3"},
+                {**PAYLOAD, "population": 2 ** 40}]
+
+        response = client.post("/covid/bulk", json=body, headers=headers)
+
+        assert response.status_code == 200
+        result = response.json()
+        assert result["written"] == 2
+        assert [error["index"] for error in result["errors"]] == [1, 3, 4]
+        assert "total_cases" in result["errors"][0]["detail"]
+        assert result["rows_per_second"] > 0
+        for entry in (PAYLOAD, second):
+            data = client.get(f"/covid/{entry['country']}",
+                              headers=headers).json()["data"]
+            assert data == entry
+        assert client.get("/covid/Testland Drivers 3",
+                          headers=headers).status_code == 404
+
+    @pytest.mark.covid
+    def test_bulk_ndjson_updates_existing_rows(self, client):
+        headers = auth_headers(client)
+        client.post("/covid", json=PAYLOAD, headers=headers)
+        lines = [{**PAYLOAD, "population": 1}, {**PAYLOAD, "population": 2}]
+        body = "\n".join(json.dumps(line) for line in lines) + "\n{oops\n"
+
+        response = client.post(
+            "/covid/bulk", content=body,
+            headers={**headers, "Content-Type": "application/x-ndjson"})
+
+        assert response.json()["written"] == 2
+        assert response.json()["errors"][0]["index"] == 2
+        data = client.get("/covid/Testland Drivers",
+                          headers=headers).json()["data"]
+        assert data["population"] == 2
+
+    @pytest.mark.covid
+    def test_bulk_rejects_a_body_that_is_not_an_array(self, client):
+        headers = auth_headers(client)
+
+        response = client.post("/covid/bulk", json=PAYLOAD, headers=headers)
+        assert response.status_code == 400
+
+    @pytest.mark.covid
+    def test_batch_delete_reports_unknown_countries(self, client):
+        headers = auth_headers(client)
+        second = {**PAYLOAD, "country": "Testland Drivers 2"}
+        client.post("/covid/bulk", json=[PAYLOAD, second], headers=headers)
+
+        response = client.request("DELETE", "/covid", headers=headers, json={
+            "countries": ["Testland Drivers", "Testland Drivers 2",
+                          "Nowhereland"]})
+
+        assert response.status_code == 200
+        assert sorted(response.json()["deleted"]) == [
+            "Testland Drivers", "Testland Drivers 2"]
+        assert response.json()["not_found"] == ["Nowhereland"]
+        for entry in (PAYLOAD, second):
+            assert client.get(f"/covid/{entry['country']}",
+                              headers=headers).status_code == 404
+
+    @pytest.mark.covid
+    def test_batch_delete_requires_countries(self, client):
+        headers = auth_headers(client)
+
+        response = client.request("DELETE", "/covid", headers=headers,
+                                  json={"countries": []})
+        assert response.status_code == 422
+
+    @pytest.mark.covid
+    def test_aggregates_follow_writes(self, client):
+        headers = auth_headers(client)
+
+        def aggregate():
+            return client.get("/covid/aggregate",
+                              params={"group_by": "continent"},
+                              headers=headers).json()
+
+        before = aggregate()
+        client.post("/covid", json=PAYLOAD, headers=headers)
+        client.patch("/covid/Testland Drivers", json={"total_deaths": 100},
+                     headers=headers)
+        after = aggregate()
+
+        groups = {group["name"]: group for group in after["groups"]}
+        assert groups["Testinent"]["countries"] == 1
+        assert groups["Testinent"]["total_deaths"] == 100
+        assert groups["Testinent"]["case_fatality_rate"] == 0.1
+        assert groups["Testinent"]["tests_per_million"] == round(
+            5000 * 1e6 / 123456, 1)
+        assert after["total"]["countries"] == before["total"]["countries"] + 1
+        assert after["total"]["countries"] == sum(
+            group["countries"] for group in after["groups"])
+
+        client.delete("/covid/Testland Drivers", headers=headers)
+        assert aggregate() == before
+
+    @pytest.mark.covid
+    def test_aggregates_by_who_region(self, client):
+        headers = auth_headers(client)
+
+        response = client.get("/covid/aggregate",
+                              params={"group_by": "who_region"},
+                              headers=headers)
+
+        names = [group["name"] for group in response.json()["groups"]]
+        assert "Europe" in names and names == sorted(names)
+        assert client.get("/covid/aggregate", params={"group_by": "country"},
+                          headers=headers).status_code == 422
+
+
+class TestExportBatches:
+    @pytest.mark.covid
+    def test_rows_are_read_in_batches(self):
+        async def batches():
+            connection = await asyncpg.connect(**connect_kwargs())
+            try:
+                async with connection.transaction():
+                    repository = AsyncpgCovidRepository(connection)
+                    return [batch async for batch
+                            in repository.export(batch_size=50)]
+            finally:
+                await connection.close()
+
+        sizes = [len(batch) for batch in asyncio.run(batches())]
+        assert len(sizes) > 1
+        assert set(sizes[:-1]) == {50}
+        assert 0 < sizes[-1] <= 50
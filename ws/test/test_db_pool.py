@@ -0,0 +1,81 @@
+import psycopg2
+import pytest
+from fastapi.testclient import TestClient
+
+from database.Database import connect
+from database.pool import ConnectionPool, PoolTimeout
+from ws.covid_api import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(connect, min_size=1, max_size=2, timeout=0.1)
+    yield pool
+    pool.closeall()
+
+
+class TestConnectionPool:
+    @pytest.mark.pool
+    def test_returned_connection_is_reused(self, pool):
+        first = pool.getconn()
+        pool.putconn(first)
+        second = pool.getconn()
+
+        assert second is first
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["in_use"] == 1
+
+    @pytest.mark.pool
+    def test_old_connection_is_recycled(self, pool):
+        first = pool.getconn()
+        pool.max_lifetime = 0
+        pool.putconn(first)
+
+        second = pool.getconn()
+
+        assert second is not first
+        assert first.closed
+        assert pool.stats()["recycled"] == 1
+
+    @pytest.mark.pool
+    def test_dead_connection_is_replaced_on_checkout(self, pool):
+        pool.ping_after = 0
+        victim = pool.getconn()
+        pid = victim.get_backend_pid()
+        pool.putconn(victim)
+
+        with connect() as admin, admin.cursor() as cursor:
+            cursor.execute("SELECT pg_terminate_backend(%s)", (pid,))
+
+        connection = pool.getconn()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            assert cursor.fetchone()[0] == 1
+        assert connection is not victim
+        assert pool.stats()["discarded"] == 1
+
+    @pytest.mark.pool
+    def test_aborted_transaction_is_rolled_back_on_return(self, pool):
+        connection = pool.getconn()
+        with pytest.raises(psycopg2.Error):
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 / 0")
+        pool.putconn(connection)
+
+        assert pool.getconn() is connection
+
+    @pytest.mark.pool
+    def test_exhausted_pool_times_out(self, pool):
+        pool.getconn()
+        pool.getconn()
+
+        with pytest.raises(PoolTimeout):
+            pool.getconn()
+        assert pool.stats()["timeouts"] == 1
+
+    @pytest.mark.pool
+    def test_stats_endpoint_requires_auth(self):
+        response = client.get("/monitoring/db-pool")
+        assert response.status_code == 401
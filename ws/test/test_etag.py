@@ -0,0 +1,121 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from database.Database import Database
+from database.notifications import notify_changes, parse_notification
+from ws.covid_api import app
+from ws.services.response_cache import ResponseCache
+
+COUNTRY = "Testland ETag"
+
+
+def login(client):
+    client.post("/api/user", json={
+        "username": "testuser_etag",
+        "email": "testuser_etag@test.com",
+        "password": "Test123456"
+    })
+    token = client.post("/api/login", data={
+        "username": "testuser_etag",
+        "password": "Test123456"
+    }).json()["access_token"]
+    client.headers["Authorization"] = f"Bearer {token}"
+
+
+@pytest.fixture(params=["listening", "not_listening"])
+def client(request):
+    """Client avec l'écoute des notifications (version suivie en mémoire)
+    ou sans (version lue en base à chaque requête)."""
+    if request.param == "listening":
+        with TestClient(app) as client:
+            yield from _with_country(client)
+    else:
+        yield from _with_country(TestClient(app))
+
+    with Database() as cursor:
+        cursor.execute("DELETE FROM t_users WHERE username = 'testuser_etag'")
+
+
+def _with_country(client):
+    login(client)
+    client.post("/covid", json={
+        "country": COUNTRY, "continent": "Testinent",
+        "who_region": "TestRegion", "population": 1,
+        "total_cases": 1, "total_deaths": 1, "total_recovered": 1,
+        "serious_critical": 1, "total_tests": 1})
+    yield client
+    client.delete(f"/covid/{COUNTRY}")
+
+
+class TestETag:
+    @pytest.mark.covid
+    def test_matching_etag_returns_304_without_body(self, client):
+        response = client.get(f"/covid/{COUNTRY}")
+        etag = response.headers["ETag"]
+
+        response = client.get(f"/covid/{COUNTRY}",
+                              headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    @pytest.mark.covid
+    def test_write_changes_the_etag(self, client):
+        etag = client.get("/covid").headers["ETag"]
+
+        client.patch(f"/covid/{COUNTRY}", json={"population": 2})
+        response = client.get("/covid", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    @pytest.mark.covid
+    def test_etl_notification_changes_the_etag(self, client):
+        etag = client.get(f"/covid/{COUNTRY}").headers["ETag"]
+
+        with Database() as cursor:
+            notify_changes(cursor)
+
+        # La notification arrive de façon asynchrone à l'écoute
+        for _ in range(500):
+            response = client.get(f"/covid/{COUNTRY}",
+                                  headers={"If-None-Match": etag})
+            if response.status_code == 200:
+                break
+        assert response.status_code == 200
+
+    @pytest.mark.covid
+    def test_weak_and_listed_etags_match(self, client):
+        # ETag fort : sans compression (sinon il est déjà faible)
+        etag = client.get("/covid", headers={
+            "Accept-Encoding": "identity"}).headers["ETag"]
+
+        response = client.get("/covid", headers={
+            "If-None-Match": f'"other", W/{etag}'})
+
+        assert response.status_code == 304
+
+    @pytest.mark.visualization
+    def test_metrics_etag(self, client):
+        etag = client.get("/metrics").headers["ETag"]
+
+        response = client.get("/metrics", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    @pytest.mark.covid
+    def test_notification_payload(self):
+        assert parse_notification("42:France") == (42, "France")
+        assert parse_notification("43:") == (43, None)
+
+    @pytest.mark.covid
+    def test_version_only_moves_forward_while_tracked(self):
+        cache = ResponseCache()
+        cache.invalidate({"France"}, version=5)
+        assert cache.version is None
+
+        cache.reset(version=10)
+        cache.invalidate({"France"}, version=12)
+        cache.invalidate({"Spain"}, version=11)
+        assert cache.version == 12
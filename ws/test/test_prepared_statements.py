@@ -0,0 +1,131 @@
+import psycopg2.errors
+import pytest
+from fastapi.testclient import TestClient
+
+from database.Database import connect
+from database.prepared import PreparedStatements
+from ws.covid_api import app
+
+QUERY = "SELECT $1::int + $2::int"
+
+
+@pytest.fixture
+def connection():
+    connection = connect()
+    yield connection
+    connection.close()
+
+
+def add(statements, cursor, a, b):
+    statements.execute(cursor, "test_add", QUERY, (a, b))
+    return cursor.fetchone()[0]
+
+
+class TestPreparedStatements:
+    @pytest.mark.pool
+    def test_statement_is_prepared_once_per_connection(self, connection):
+        statements = PreparedStatements()
+        with connection.cursor() as cursor:
+            assert add(statements, cursor, 1, 2) == 3
+            assert add(statements, cursor, 3, 4) == 7
+
+            cursor.execute("SELECT count(*) FROM pg_prepared_statements "
+                           "WHERE name = 'test_add'")
+            assert cursor.fetchone()[0] == 1
+
+        stats = statements.stats()["test_add"]
+        assert stats["calls"] == 2
+        assert stats["prepares"] == 1
+        assert stats["mean_ms"] >= 0
+
+    @pytest.mark.pool
+    def test_new_connection_prepares_again(self, connection):
+        statements = PreparedStatements()
+        with connection.cursor() as cursor:
+            add(statements, cursor, 1, 1)
+        connection.close()
+
+        with connect() as other, other.cursor() as cursor:
+            assert add(statements, cursor, 2, 2) == 4
+        other.close()
+
+        assert statements.stats()["test_add"]["prepares"] == 2
+
+    @pytest.mark.pool
+    def test_forgotten_statement_is_prepared_again(self, connection):
+        statements = PreparedStatements()
+        with connection.cursor() as cursor:
+            add(statements, cursor, 1, 1)
+            connection.commit()
+            cursor.execute("DEALLOCATE ALL")
+            connection.commit()
+
+            # Aucune transaction ouverte : nouvelle préparation et
+            # nouvelle exécution
+            assert add(statements, cursor, 5, 5) == 10
+            assert statements.stats()["test_add"]["prepares"] == 2
+
+    @pytest.mark.pool
+    def test_other_statements_survive_single_deallocate(self, connection):
+        statements = PreparedStatements()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            add(statements, cursor, 1, 1)
+            statements.execute(cursor, "test_one", "SELECT $1::int", (3,))
+            cursor.execute("DEALLOCATE test_add")
+
+            assert add(statements, cursor, 2, 2) == 4
+            # test_one est toujours préparée : pas de nouveau PREPARE
+            statements.execute(cursor, "test_one", "SELECT $1::int", (7,))
+            assert cursor.fetchone()[0] == 7
+
+        stats = statements.stats()
+        assert stats["test_add"]["prepares"] == 2
+        assert stats["test_one"]["prepares"] == 1
+
+    @pytest.mark.pool
+    def test_forgotten_statement_in_transaction_raises(self, connection):
+        statements = PreparedStatements()
+        with connection.cursor() as cursor:
+            add(statements, cursor, 1, 1)
+            cursor.execute("DEALLOCATE ALL")
+
+            with pytest.raises(psycopg2.errors.InvalidSqlStatementName):
+                add(statements, cursor, 1, 1)
+            connection.rollback()
+
+            # Préparée à nouveau à l'appel suivant
+            assert add(statements, cursor, 2, 3) == 5
+
+    @pytest.mark.pool
+    def test_name_is_bound_to_one_query(self, connection):
+        statements = PreparedStatements()
+        with connection.cursor() as cursor:
+            add(statements, cursor, 1, 1)
+            with pytest.raises(ValueError):
+                statements.execute(cursor, "test_add", "SELECT 1")
+            with pytest.raises(ValueError):
+                statements.execute(cursor, "test add", "SELECT 1")
+
+    @pytest.mark.pool
+    def test_stats_endpoint_lists_login_statement(self):
+        client = TestClient(app)
+        client.post("/api/user", json={
+            "username": "testuser_prepared",
+            "email": "testuser_prepared@test.com",
+            "password": "Test123456"
+        })
+        token = client.post("/api/login", data={
+            "username": "testuser_prepared",
+            "password": "Test123456"
+        }).json()["access_token"]
+
+        response = client.get("/monitoring/statements", headers={
+            "Authorization": f"Bearer {token}"})
+
+        assert response.status_code == 200
+        assert response.json()["statements"]["user_login"]["calls"] >= 1
+        with connect() as cleanup, cleanup.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM t_users WHERE username = 'testuser_prepared'")
+        cleanup.close()
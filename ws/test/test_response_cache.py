@@ -0,0 +1,119 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from database.Database import Database
+from database.notifications import notify_changes
+from ws.covid_api import app
+from ws.services.response_cache import ResponseCache, response_cache
+
+COUNTRY = "Testland Cache"
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        client.post("/api/user", json={
+            "username": "testuser_cache",
+            "email": "testuser_cache@test.com",
+            "password": "Test123456"
+        })
+        token = client.post("/api/login", data={
+            "username": "testuser_cache",
+            "password": "Test123456"
+        }).json()["access_token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        client.post("/covid", json={
+            "country": COUNTRY, "continent": "Testinent",
+            "who_region": "TestRegion", "population": 1,
+            "total_cases": 1, "total_deaths": 1, "total_recovered": 1,
+            "serious_critical": 1, "total_tests": 1})
+        yield client
+        client.delete(f"/covid/{COUNTRY}")
+
+    with Database() as cursor:
+        cursor.execute("DELETE FROM t_users WHERE username = 'testuser_cache'")
+
+
+def set_population_without_notify(population):
+    with Database() as cursor:
+        cursor.execute("UPDATE countries SET population = %s "
+                       "WHERE country = %s", (population, COUNTRY))
+
+
+class TestResponseCache:
+    @pytest.mark.covid
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.reset(version=1)
+        for key in ("a", "b"):
+            cache.store(("country", key), {}, cache.generation)
+
+        cache.get(("country", "a"))
+        cache.store(("country", "c"), {}, cache.generation)
+
+        assert cache.get(("country", "a")) is not None
+        assert cache.get(("country", "b")) is None
+
+    @pytest.mark.covid
+    def test_country_change_invalidates_its_entry_and_pages(self):
+        cache = ResponseCache()
+        cache.reset(version=1)
+        for key in [("country", "France"), ("country", "Spain"),
+                    ("page", 100, None, None, None)]:
+            cache.store(key, {}, cache.generation)
+
+        cache.invalidate({"France"})
+
+        assert cache.get(("country", "France")) is None
+        assert cache.get(("page", 100, None, None, None)) is None
+        assert cache.get(("country", "Spain")) is not None
+
+    @pytest.mark.covid
+    def test_response_computed_before_invalidation_is_not_stored(self):
+        cache = ResponseCache()
+        cache.reset(version=1)
+        generation = cache.generation
+
+        cache.invalidate({"France"})
+        cache.store(("country", "France"), {"stale": True}, generation)
+
+        assert cache.get(("country", "France")) is None
+
+    @pytest.mark.covid
+    def test_nothing_is_cached_while_not_listening(self):
+        cache = ResponseCache()
+
+        cache.store(("country", "France"), {}, cache.generation)
+
+        assert cache.get(("country", "France")) is None
+
+    @pytest.mark.covid
+    def test_reads_are_cached_and_api_writes_invalidate(self, client):
+        assert client.get(f"/covid/{COUNTRY}").json()["data"][
+            "population"] == 1
+
+        set_population_without_notify(2)
+        assert client.get(f"/covid/{COUNTRY}").json()["data"][
+            "population"] == 1
+
+        client.patch(f"/covid/{COUNTRY}", json={"total_tests": 3})
+        data = client.get(f"/covid/{COUNTRY}").json()["data"]
+        assert data["population"] == 2
+        assert data["total_tests"] == 3
+
+    @pytest.mark.covid
+    def test_notify_from_another_process_invalidates(self, client):
+        client.get(f"/covid/{COUNTRY}")
+        set_population_without_notify(5)
+
+        with Database() as cursor:
+            notify_changes(cursor, COUNTRY)
+
+        deadline = time.monotonic() + 5
+        while response_cache.get(("country", COUNTRY)) is not None:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert client.get(f"/covid/{COUNTRY}").json()["data"][
+            "population"] == 5